@@ -30,6 +30,12 @@ setup(
         "ipywidgets",
     ],
     extras_require={
+        "serialization": [
+            "msgpack>=1.0.0",
+        ],
+        "graph": [
+            "networkx>=2.6",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-cov>=3.0.0",
@@ -41,18 +41,23 @@ from .util.port_utils import (
 )
 
 from .util.comp_utils import (
-    move, movex, movey, align_comp_to_port, evaluate_bbox, center_to_edge_distance,
+    move, movex, movey, align_comp_to_port, place_many, align_many, evaluate_bbox, center_to_edge_distance,
     to_float, to_decimal, prec_array, prec_center, prec_ref_center,
     get_padding_points_cc, get_primitive_rectangle
 )
 
 from .util.snap_to_grid import component_snap_to_grid
+from .util.spatial_index import SpatialIndex, get_spatial_index, invalidate_spatial_index, layer_bbox
+from .util.raster_symmetry import raster_symmetry_scores
 
 # Routing
 from .routing.c_route import c_route
 from .routing.L_route import L_route
 from .routing.straight_route import straight_route
 from .routing.smart_route import smart_route
+from .routing.maze_route import maze_route
+from .routing.route_cache import RouteCache, cached_route
+from .routing.route_nets import route_nets
 
 # Placement
 from .placement.common_centroid_ab_ba import common_centroid_ab_ba
@@ -94,6 +99,11 @@ __all__ = [
     "set_port_width",
     "print_ports",
     "component_snap_to_grid",
+    "SpatialIndex",
+    "get_spatial_index",
+    "invalidate_spatial_index",
+    "layer_bbox",
+    "raster_symmetry_scores",
     "two_transistor_place",
     "two_transistor_interdigitized",
     "two_pfet_interdigitized",
@@ -101,9 +111,13 @@ __all__ = [
     "macro_two_transistor_interdigitized",
     "generic_4T_interdigitzed",
     "smart_route",
+    "maze_route",
     "c_route",
     "L_route",
     "straight_route",
+    "RouteCache",
+    "cached_route",
+    "route_nets",
     "via_stack",
     "via_array",
     "nmos", 
@@ -116,6 +130,8 @@ __all__ = [
     "movex",
     "movey",
     "align_comp_to_port",
+    "place_many",
+    "align_many",
     "sky130",
     "gf180",
 ]
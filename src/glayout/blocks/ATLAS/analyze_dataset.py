@@ -3,25 +3,44 @@
 Generate comprehensive statistics for the LHS dataset
 """
 
-import json
+import argparse
 from pathlib import Path
 
-def analyze_dataset():
+from results_journal import iter_journal
+
+# only these columns are read for the statistics, the failure listings read their rows with filters
+ANALYSIS_COLUMNS = ["success", "drc_pass", "lvs_pass", "execution_time"]
+
+def load_results(output_dir, columns, filters=None):
+    """Records (only columns) of the results of run_dataset_multiprocess.py in output_dir matching filters,
+    a list of (column, "=", value). Read from the Parquet dataset tg_results.parquet (see results_parquet)
+    or, without it or pyarrow, streamed from the results journal tg_results.jsonl"""
+    dataset = Path(output_dir) / "tg_results.parquet"
+    if dataset.is_dir():
+        try:
+            from results_parquet import read_results
+            return read_results(dataset, columns=columns, filters=filters).to_dict("records")
+        except ImportError:
+            pass
+    return [
+        {column: record.get(column) for column in columns}
+        for record in iter_journal(Path(output_dir) / "tg_results.jsonl")
+        if all(record.get(column) == value for column, _, value in filters or [])
+    ]
+
+def analyze_dataset(output_dir="result"):
     """Analyze the complete LHS dataset"""
-    results_file = Path("lhs_dataset_robust/lhs_results.json")
-    
-    with open(results_file, 'r') as f:
-        results = json.load(f)
+    results = load_results(output_dir, ANALYSIS_COLUMNS)
     
     total_samples = len(results)
     successful_samples = [r for r in results if r["success"]]
-    failed_samples = [r for r in results if not r["success"]]
+    failed_samples = load_results(output_dir, ["sample_id", "error"], filters=[("success", "=", False)])
     
     drc_passes = [r for r in successful_samples if r["drc_pass"]]
-    drc_failures = [r for r in successful_samples if not r["drc_pass"]]
+    drc_failures = load_results(output_dir, ["sample_id", "component_name"], filters=[("success", "=", True), ("drc_pass", "=", False)])
     
     lvs_passes = [r for r in successful_samples if r["lvs_pass"]]
-    lvs_failures = [r for r in successful_samples if not r["lvs_pass"]]
+    lvs_failures = load_results(output_dir, ["sample_id", "component_name"], filters=[("success", "=", True), ("lvs_pass", "=", False)])
     
     execution_times = [r["execution_time"] for r in successful_samples]
     avg_time = sum(execution_times) / len(execution_times) if execution_times else 0
@@ -113,7 +132,9 @@ def analyze_dataset():
     }
 
 if __name__ == "__main__":
-    stats = analyze_dataset()
+    parser = argparse.ArgumentParser(description="Statistics of a dataset generated by run_dataset_multiprocess.py")
+    parser.add_argument("output_dir", type=str, nargs="?", default="result", help="Output directory of the dataset run")
+    stats = analyze_dataset(parser.parse_args().output_dir)
     
     # Generate a brief summary
     print(f"\n📋 Brief Summary:")
@@ -0,0 +1,69 @@
+"""
+Benchmark for the maximin LHS optimizer.
+
+Runs lhs_maximin for every PCell of the sample inventory (40,814 samples, same dims, patience
+and seed as generate_all_samples) and compares it with the reference optimizer that recomputes
+pdist over all pairs after every swap. Both start from the same random state, so the designs
+must be identical. Reports the time of both and the minimum pairwise distance of each design.
+
+usage: python benchmark_elhs.py [--pcells fvf diff_pair ...] [--skip-reference]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from scipy.stats import qmc
+
+from elhs import cont_specs, inventory_np, lhs_maximin, min_pairwise_distance
+
+
+def reference_lhs_maximin(d, n, patience=100, seed=None):
+    """maximin LHS recomputing the minimum distance over all n(n-1)/2 pairs after every swap"""
+    engine = qmc.LatinHypercube(d, seed=seed)
+    best = engine.random(n)
+    best_min = min_pairwise_distance(best)
+    no_improve = 0
+    while no_improve < patience:
+        i, j = random.sample(range(n), 2)
+        axis = random.randrange(d)
+        cand = best.copy()
+        cand[i, axis], cand[j, axis] = cand[j, axis], cand[i, axis]
+        cand_min = min_pairwise_distance(cand)
+        if cand_min > best_min:
+            best, best_min = cand, cand_min
+            no_improve = 0
+        else:
+            no_improve += 1
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time lhs_maximin on the sample inventory and check it against the pdist reference")
+    parser.add_argument("--pcells", nargs="+", default=list(inventory_np), choices=list(inventory_np))
+    parser.add_argument("--skip-reference", action="store_true", help="only time lhs_maximin")
+    parser.add_argument("--seed", type=int, default=1337, help="seed of the swap choices")
+    args = parser.parse_args()
+
+    total, total_reference = 0.0, 0.0
+    for pcell in args.pcells:
+        d, n = sum(cnt for *_, cnt in cont_specs[pcell]), inventory_np[pcell]
+        random.seed(args.seed)
+        start = time.perf_counter()
+        design = lhs_maximin(d, n, patience=10 * d, seed=42)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        line = f"{pcell:15s} n={n:6d} d={d:2d}: {elapsed:8.3f} s, min distance {min_pairwise_distance(design):.6f}"
+        if not args.skip_reference:
+            random.seed(args.seed)
+            start = time.perf_counter()
+            reference = reference_lhs_maximin(d, n, patience=10 * d, seed=42)
+            elapsed_reference = time.perf_counter() - start
+            total_reference += elapsed_reference
+            line += f", reference {elapsed_reference:8.3f} s ({elapsed_reference / elapsed:.0f}x), identical {np.array_equal(design, reference)}"
+        print(line)
+    print(f"total {sum(inventory_np[pcell] for pcell in args.pcells)} samples: {total:.3f} s" + ("" if args.skip_reference else f", reference {total_reference:.3f} s"))
+
+
+if __name__ == "__main__":
+    main()
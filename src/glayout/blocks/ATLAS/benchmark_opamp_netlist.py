@@ -0,0 +1,124 @@
+"""
+Benchmark for hierarchical netlist construction.
+
+Builds the leaf netlists of the opamp once (fets with glayout.primitives.fet.fet_netlist, the
+mimcap array, current mirrors), then re-composes the full opamp netlist (gain stage, two stage,
+output stage, top level) from them N times with the connections the opamp builders make
+(glayout.blocks.composite.opamp, which still import the old glayout.flow paths and are not used
+here). Reports build time, memory and the time to write the SPICE text.
+
+usage: python benchmark_opamp_netlist.py [--iterations 1000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk as pdk
+from glayout.primitives.fet import fet_netlist
+from glayout.spice import Netlist
+
+# (width, length, fingers) of the output stage bias current mirror
+OUTPUT_STAGE_BIAS = (4.833064927880735, 3.4385982794948085, 5)
+
+
+def fet(name: str, device: str, width: float, length: float, fingers: int) -> Netlist:
+    return fet_netlist(pdk, name, pdk.models[device], width, length, fingers, 1, True)
+
+
+def current_mirror_netlist(width: float, length: float, fingers: int) -> Netlist:
+    """nodes VREF, VCOPY, VSS, VB (as glayout.blocks.elementary.current_mirror.current_mirror_netlist)"""
+    netlist = Netlist(circuit_name="CMIRROR", nodes=["VREF", "VCOPY", "VSS", "VB"])
+    nfet = fet("NMOS", "nfet", width, length, fingers)
+    netlist.connect_netlist(nfet, [("D", "VREF"), ("G", "VREF"), ("S", "VSS"), ("B", "VB")])
+    netlist.connect_netlist(nfet, [("D", "VCOPY"), ("G", "VREF"), ("S", "VSS"), ("B", "VB")])
+    return netlist
+
+
+def leaf_netlists() -> dict:
+    """returns the netlists the opamp builders take as inputs"""
+    nfet = fet("NMOS", "nfet", 4.83, 2.25, 8)
+    input_stage = Netlist(circuit_name="DIFF_PAIR_IBIAS", nodes=["VDD1", "VDD2", "VP", "VN", "IBIAS", "VSS", "B"])
+    left = input_stage.connect_netlist(nfet, [("D", "VDD1"), ("G", "VP"), ("B", "B")])
+    right = input_stage.connect_netlist(nfet, [("D", "VDD2"), ("G", "VN"), ("B", "B")])
+    bias = input_stage.connect_netlist(current_mirror_netlist(6.04, 4.12, 3), [("VREF", "IBIAS"), ("VSS", "VSS"), ("VB", "B")])
+    input_stage.connect_subnets(left, right, [("S", "S")])
+    input_stage.connect_subnets(left, bias, [("S", "VCOPY")])
+
+    pfet = fet("PMOS", "pfet", 2.01, 14.57, 15)
+    diff_cs = Netlist(circuit_name="DIFF_TO_SINGLE_CS", nodes=["VIN1", "VIN2", "VOUT", "VSS", "VSS2"])
+    diff_cs.connect_netlist(pfet, [("D", "VIN1"), ("G", "VIN1"), ("S", "VSS"), ("B", "VSS")])
+    diff_cs.connect_netlist(pfet, [("D", "VIN2"), ("G", "VIN1"), ("S", "VSS"), ("B", "VSS")])
+    diff_cs.connect_netlist(pfet, [("D", "VOUT"), ("G", "VSS2"), ("S", "VSS"), ("B", "VSS")])
+    diff_cs.connect_netlist(pfet, [("D", "VSS2"), ("G", "VIN2"), ("S", "VSS"), ("B", "VSS")])
+
+    mimcap = Netlist(
+        circuit_name="MIMCap",
+        nodes=["V1", "V2"],
+        source_netlist=".subckt {circuit_name} {nodes} l=1 w=1\nX1 V1 V2 {model} l={{l}} w={{w}}\n.ends {circuit_name}",
+        instance_format="X{name} {nodes} {circuit_name} l={length} w={width}",
+        parameters={"model": pdk.models["mimcap"], "length": 12.0, "width": 12.0},
+    )
+    mimcap_array = Netlist(circuit_name="MIMCAP_ARR", nodes=["V1", "V2"])
+    for _ in range(6):
+        mimcap_array.connect_netlist(mimcap, [("V1", "V1"), ("V2", "V2")])
+
+    return {
+        "input_stage": input_stage,
+        "diff_cs": diff_cs,
+        "cs_bias": current_mirror_netlist(4.94, 7.28, 7),
+        "mimcap": mimcap_array,
+        "output_fet": fet("NMOS", "nfet", 5.40, 4.59, 20),
+    }
+
+
+def build_opamp_netlist(leaves: dict, bias_params: list) -> Netlist:
+    # opamp_twostage.opamp_gain_stage_netlist
+    gain_stage = Netlist(circuit_name="GAIN_STAGE", nodes=["VIN1", "VIN2", "VOUT", "VDD", "IBIAS", "GND"])
+    diff_cs_ref = gain_stage.connect_netlist(leaves["diff_cs"], [("VSS", "VDD")])
+    gain_stage.connect_netlist(leaves["cs_bias"], [("VREF", "IBIAS"), ("VSS", "GND"), ("VCOPY", "VOUT"), ("VB", "GND")])
+    mimcap_ref = gain_stage.connect_netlist(leaves["mimcap"], [("V1", "VOUT"), ("V2", "VSS2")])
+    gain_stage.connect_subnets(mimcap_ref, diff_cs_ref, [("V2", "VSS2")])
+    # opamp_twostage.opamp_twostage_netlist
+    two_stage = Netlist(circuit_name="OPAMP_TWO_STAGE", nodes=["VDD", "GND", "DIFFPAIR_BIAS", "VP", "VN", "CS_BIAS", "VOUT"])
+    input_stage_ref = two_stage.connect_netlist(leaves["input_stage"], [("IBIAS", "DIFFPAIR_BIAS"), ("VSS", "GND"), ("B", "GND")])
+    gain_stage_ref = two_stage.connect_netlist(gain_stage, [("IBIAS", "CS_BIAS")])
+    two_stage.connect_subnets(input_stage_ref, gain_stage_ref, [("VDD1", "VIN1"), ("VDD2", "VIN2")])
+    # opamp.opamp_output_stage_netlist
+    output_stage = Netlist(circuit_name="OUTPUT_STAGE", nodes=["VDD", "GND", "IBIAS", "VIN", "VOUT"])
+    output_stage.connect_netlist(leaves["output_fet"], [("D", "VDD"), ("G", "VIN"), ("B", "GND"), ("S", "VOUT")])
+    output_stage.connect_netlist(current_mirror_netlist(*bias_params), [("VREF", "IBIAS"), ("VSS", "GND"), ("VCOPY", "VOUT"), ("VB", "GND")])
+    # opamp.opamp_netlist
+    top_level = Netlist(circuit_name="opamp", nodes=["CSoutput", "vdd", "plus", "minus", "commonsourceibias", "outputibias", "diffpairibias", "gnd", "output"])
+    top_level.connect_netlist(two_stage, [("VDD", "vdd"), ("GND", "gnd"), ("DIFFPAIR_BIAS", "diffpairibias"), ("VP", "plus"), ("VN", "minus"), ("CS_BIAS", "commonsourceibias"), ("VOUT", "CSoutput")])
+    top_level.connect_netlist(output_stage, [("VDD", "vdd"), ("GND", "gnd"), ("IBIAS", "outputibias"), ("VIN", "CSoutput"), ("VOUT", "output")])
+    return top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time building the opamp netlist")
+    parser.add_argument("--iterations", type=int, default=1000, help="number of netlists to build")
+    args = parser.parse_args()
+
+    leaves = leaf_netlists()
+    bias_params = list(OUTPUT_STAGE_BIAS)
+    reference = build_opamp_netlist(leaves, bias_params).generate_netlist()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    netlists = [build_opamp_netlist(leaves, bias_params) for _ in range(args.iterations)]
+    build_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    text = netlists[-1].generate_netlist()
+    generate_time = time.perf_counter() - start
+
+    print(f"built {args.iterations} opamp netlists in {build_time:.3f} s ({1e3 * build_time / args.iterations:.3f} ms each)")
+    print(f"peak traced memory {peak / 2**20:.2f} MiB ({peak / args.iterations / 2**10:.2f} KiB per netlist)")
+    print(f"generate_netlist {1e3 * generate_time:.3f} ms, {len(text)} characters")
+    print(f"matches the first built netlist: {text == reference}")
+
+
+if __name__ == "__main__":
+    main()
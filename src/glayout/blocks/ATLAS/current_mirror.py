@@ -10,7 +10,7 @@ from glayout.flow.primitives.guardring import tapring
 from glayout.flow.pdk.util.port_utils import add_ports_perimeter,rename_ports_by_orientation
 from gdsfactory.component import Component
 from gdsfactory.cell import cell
-from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port
+from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port, align_many
 from typing import Optional, Union 
 from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
 from glayout.flow.primitives.via_gen import via_stack
@@ -54,10 +54,9 @@ def add_cm_labels(cm_in: Component,
     move_info.append((vblabel,cm_in.ports["welltie_S_top_met_S"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        cm_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    cm_in.add(align_many(comps, prts, alignments))
     return cm_in.flatten() 
 
 def current_mirror_netlist(
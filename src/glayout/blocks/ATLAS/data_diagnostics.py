@@ -4,7 +4,9 @@ from scipy.spatial.distance import pdist, squareform
 import pandas as pd
 
 # Import your generated samples and continuous specs
-from elhs import all_samples, cont_specs
+from elhs import cont_specs, generate_all_samples
+
+all_samples = generate_all_samples()
 
 # Threshold ratio for flagging (min_dist < threshold_ratio * avg_nn)
 threshold_ratio = 0.5
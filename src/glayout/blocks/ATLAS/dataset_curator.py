@@ -1,41 +1,83 @@
+"""
+Curate a results file into JSONL, CSV and the Parquet results dataset.
+
+usage:
+    python dataset_curator.py [results] [--pcell PCELL] [--passing]
+
+results is a sweep results JSON array (default sweep_outputs/sweep_results.json, converted once to
+sweep_results.jsonl) or a results journal, e.g. the tg_results.jsonl of run_dataset_multiprocess.py.
+The Parquet dataset next to it (<stem>.parquet, for the runner the tg_results.parquet it wrote) is
+reused while it is newer than the journal, else rebuilt by streaming the journal. The CSV is read
+back from the dataset with only its tabular columns and the --pcell/--passing filters.
+"""
+import argparse
 import json
+from pathlib import Path
+
 import pandas as pd
 
-# Paths
-input_json = 'sweep_outputs/sweep_results.json'
-output_jsonl = 'sweep_outputs/sweep_results.jsonl'
-output_csv  = 'sweep_outputs/sweep_results.csv'
-
-# 1. Load full JSON results
-with open(input_json, 'r') as f:
-    data = json.load(f)
-
-# 2. Write JSONL (one record per line)
-with open(output_jsonl, 'w') as f:
-    for rec in data:
-        f.write(json.dumps(rec) + "\n")
-
-# 3. Flatten and assemble tabular DataFrame
-records = []
-for rec in data:
-    flat = {
-        'pcell': rec.get('pcell'),
-        'index': rec.get('index')
-    }
-    # Flatten params
-    for k, v in rec.get('params', {}).items():
-        flat[f'param_{k}'] = v
-    # Flatten report
-    for k, v in rec.get('report', {}).items():
-        flat[f'report_{k}'] = v
-    records.append(flat)
-
-df = pd.DataFrame(records)
-
-# 4. Save CSV
-df.to_csv(output_csv, index=False)
-
-# 5. Display summary
-print(f"Written {len(data)} records to:")
-print(f" - JSONL: {output_jsonl}")
-print(f" - CSV:   {output_csv}")
+from results_journal import iter_journal
+from results_parquet import RESULT_COLUMNS, read_results, result_row, write_results_dataset
+
+# columns of the dataset that go into the CSV (params_json is flattened to param_<name>)
+CSV_COLUMNS = ["pcell", "sample_id", "params_json"] + [name for name, _ in RESULT_COLUMNS if name != "sample_id"]
+
+
+def to_journal(results):
+    """JSONL journal of results (a JSON array is converted once, next to it)"""
+    if results.suffix == ".jsonl":
+        return results
+    journal = results.with_suffix(".jsonl")
+    if not journal.exists() or journal.stat().st_mtime < results.stat().st_mtime:
+        with open(results, 'r') as f:
+            data = json.load(f)
+        with open(journal, 'w') as f:
+            for rec in data:
+                f.write(json.dumps(rec) + "\n")
+    return journal
+
+
+def load_table(journal, dataset, filters):
+    """CSV_COLUMNS of the rows matching filters, from the Parquet dataset (built from journal if stale)"""
+    try:
+        if journal.exists() and (not dataset.is_dir() or dataset.stat().st_mtime < journal.stat().st_mtime):
+            write_results_dataset(journal, dataset)
+        return read_results(dataset, columns=CSV_COLUMNS, filters=filters), str(dataset)
+    except ImportError as e:
+        rows = ({"pcell": rec.get("pcell") or "txgate", **result_row(rec)} for rec in iter_journal(journal))
+        rows = [row for row in rows if all(row.get(column) == value for column, _, value in filters or [])]
+        return pd.DataFrame(rows, columns=CSV_COLUMNS), f"not written ({e})"
+
+
+def flatten(df):
+    """pcell, index, param_<name> and report_<column> columns"""
+    params = pd.DataFrame([json.loads(p) for p in df["params_json"]], index=df.index).add_prefix("param_")
+    report = df.drop(columns=["pcell", "sample_id", "params_json"]).add_prefix("report_")
+    return pd.concat([df[["pcell"]], df["sample_id"].rename("index"), params, report], axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Curate a results file into JSONL, CSV and the Parquet results dataset")
+    parser.add_argument("results", type=str, nargs="?", default="sweep_outputs/sweep_results.json", help="Results JSON array or JSONL journal")
+    parser.add_argument("--pcell", type=str, default=None, help="Only the samples of this PCell")
+    parser.add_argument("--passing", action="store_true", help="Only the samples that pass DRC and LVS")
+    args = parser.parse_args()
+
+    results = Path(args.results)
+    filters = ([("pcell", "=", args.pcell)] if args.pcell else []) + ([("drc_pass", "=", True), ("lvs_pass", "=", True)] if args.passing else [])
+
+    # 1. JSONL (one record per line)
+    journal = to_journal(results)
+
+    # 2. Parquet dataset (partitioned by pcell and shard), read back with only the CSV columns
+    df, output_parquet = load_table(journal, results.with_suffix(".parquet"), filters or None)
+
+    # 3. Flatten params and save CSV
+    output_csv = results.with_suffix(".csv")
+    flatten(df).to_csv(output_csv, index=False)
+
+    # 4. Display summary
+    print(f"Written {len(df)} records to:")
+    print(f" - JSONL: {journal}")
+    print(f" - CSV:   {output_csv}")
+    print(f" - Parquet: {output_parquet}")
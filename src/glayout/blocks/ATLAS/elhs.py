@@ -1,7 +1,11 @@
-import numpy as np
+import hashlib
+import os
 import random
-from scipy.spatial.distance import pdist
-from scipy.stats import qmc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# scipy is imported where it is used (importing scipy.stats takes most of a second)
 
 
 # === Budget Allocation & Validation ===
@@ -42,30 +46,83 @@ def find_valid_N_total(d_dims, level_counts, N_start, max_search=10000):
 
 
 def min_pairwise_distance(points):
+   from scipy.spatial.distance import pdist
    if len(points) < 2:
        return 0.0
    return pdist(points, metric='euclidean').min()
 
 
+def _distances(points, x):
+   """euclidean distances from x to every row of points (summed over axes in order, like pdist)"""
+   diff = points - x
+   acc = diff[:, 0] * diff[:, 0]
+   for k in range(1, points.shape[1]):
+       acc += diff[:, k] * diff[:, k]
+   return np.sqrt(acc)
+
+
+def _nearest_neighbors(points):
+   """nearest neighbor index and distance of every point (kd-tree query, distances recomputed like pdist)"""
+   from scipy.spatial import cKDTree
+   _, nn_idx = cKDTree(points).query(points, k=2)
+   nn_idx = nn_idx[:, 1]
+   diff = points - points[nn_idx]
+   acc = diff[:, 0] * diff[:, 0]
+   for k in range(1, points.shape[1]):
+       acc += diff[:, k] * diff[:, k]
+   return nn_idx, np.sqrt(acc)
+
+
 def lhs_maximin(d, n, patience=100, seed=None):
+   """LHS design improved by random coordinate swaps that increase the minimum pairwise distance.
+   Keeps the nearest neighbor of every point, so a swap costs O(n*d) instead of a full pdist
+   (and O(1) when it does not touch the closest pair). Same designs as recomputing pdist per swap."""
+   from scipy.stats import qmc
    engine = qmc.LatinHypercube(d, seed=seed)
-   sample = engine.random(n)
-   best = sample.copy()
-   best_min = min_pairwise_distance(best)
-  
+   best = engine.random(n)
+   nn_idx, nn_dist = _nearest_neighbors(best)
+   closest = int(np.argmin(nn_dist))
+   best_min = nn_dist[closest]
+   others = np.arange(n)
+
    no_improve = 0
    while no_improve < patience:
        i, j = random.sample(range(n), 2)
        axis = random.randrange(d)
-       cand = best.copy()
-       cand[i, axis], cand[j, axis] = cand[j, axis], cand[i, axis]
-       cand_min = min_pairwise_distance(cand)
+       # pairs without i and j keep their distance, the closest pair must be broken to improve
+       if closest not in (i, j) and nn_idx[closest] not in (i, j):
+           no_improve += 1
+           continue
+       keep = (others != i) & (others != j) & (nn_idx != i) & (nn_idx != j)
+       if nn_dist[keep].min(initial=np.inf) <= best_min:
+           no_improve += 1
+           continue
+       best[i, axis], best[j, axis] = best[j, axis], best[i, axis]
+       dist_i, dist_j = _distances(best, best[i]), _distances(best, best[j])
+       dist_i[i], dist_j[j] = np.inf, np.inf
+       # nearest neighbor without i and j of the points whose neighbor was i or j
+       base_idx, base_dist = nn_idx.copy(), nn_dist.copy()
+       for k in np.flatnonzero(~keep & (others != i) & (others != j)):
+           dist_k = _distances(best, best[k])
+           dist_k[[k, i, j]] = np.inf
+           base_idx[k] = np.argmin(dist_k)
+           base_dist[k] = dist_k[base_idx[k]]
+       base_dist[[i, j]] = np.inf
+       cand_min = min(base_dist.min(), dist_i.min(), dist_j.min())
        if cand_min > best_min:
-           best, best_min = cand, cand_min
+           nn_idx, nn_dist = base_idx, base_dist
+           for p, dist_p in ((i, dist_i), (j, dist_j)):
+               closer = dist_p < nn_dist
+               nn_idx[closer], nn_dist[closer] = p, dist_p[closer]
+               nn_idx[p] = np.argmin(dist_p)
+               nn_dist[p] = dist_p[nn_idx[p]]
+           closest = int(np.argmin(nn_dist))
+           best_min = nn_dist[closest]
            no_improve = 0
        else:
+           best[i, axis], best[j, axis] = best[j, axis], best[i, axis]
            no_improve += 1
-  
+
    return best
 
 
@@ -333,96 +390,129 @@ def generate_mixed_samples(pcell, lhs_pts, int_oa, cat_oa):
 # === Main Generation Flow ===
 
 
-def generate_all_samples():
-   """Generate all samples for all PCells using the 8-hour runtime-aware budget from budgets_8h_runtime_aware_measuredTp_dpCorrected.json"""
-   # Sample counts from budgets_8h_runtime_aware_measuredTp_dpCorrected.json
-   # Total samples: 40,814 across 8 hours on 26 cores with 1.2x overhead
-   inventory_np = {
-       'fvf'           :  10886,   # Flipped-voltage follower  
-       'txgate'        :  3464,    # Transmission gate
-       'current_mirror':  7755,    # Current mirror            
-       'diff_pair'     :  9356,    # Differential pair         
-       'lvcm'          :  3503,    # Low-V current mirror      
-       'opamp'         :  5850,    # Two-stage op-amp
-   }
+# Sample counts from budgets_8h_runtime_aware_measuredTp_dpCorrected.json
+# Total samples: 40,814 across 8 hours on 26 cores with 1.2x overhead
+inventory_np = {
+    'fvf'           :  10886,   # Flipped-voltage follower  
+    'txgate'        :  3464,    # Transmission gate
+    'current_mirror':  7755,    # Current mirror            
+    'diff_pair'     :  9356,    # Differential pair         
+    'lvcm'          :  3503,    # Low-V current mirror      
+    'opamp'         :  5850,    # Two-stage op-amp
+}
 
 
-   # 2) List the PCells in the same order as your specs dicts:
-   pcells = ['fvf','txgate','current_mirror','diff_pair','lvcm','opamp']
-  
-   # For reproducibility - using seed 1337 to match budget plan
-   random.seed(1337)
+# bump when the sampling changes, so cached samples are regenerated
+ELHS_VERSION = 2
+# cached samples (.npz of the LHS points and OA level indices of one PCell)
+CACHE_DIR = os.environ.get("ELHS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "elhs_cache"))
 
 
-   # 3) Loop over each PCell, pulling its LHS dim and inventory np:
-   all_samples = {}
-   for pcell in pcells:
-       # how many continuous dims for this PCell?
-       d_p = sum(cnt for *_ , cnt in cont_specs[pcell])
-       # override budget with inventory np
-       n_p = inventory_np[pcell]
-      
-       # Skip PCells with 0 samples
-       if n_p == 0:
-           all_samples[pcell] = []
-           print(f"{pcell}: skipped (inventory np = 0)")
-           continue
+def _cache_path(pcell, n, seed):
+   key = repr((pcell, cont_specs[pcell], int_specs.get(pcell, []), cat_specs, n, seed, ELHS_VERSION))
+   return os.path.join(CACHE_DIR, f"{pcell}_{n}_{seed}_{hashlib.sha1(key.encode()).hexdigest()[:16]}.npz")
 
 
-       # a) Continuous LHS + adaptive maximin
-       lhs_pts = lhs_maximin(d_p, n_p, patience=10*d_p, seed=42)
+def _sample_pcell(pcell, n_p, seed):
+   """
+   Continuous LHS + maximin points and integer/categorical OA level choices of one PCell.
+   Every PCell has its own random state (seeded from pcell and seed), so PCells can be sampled in any order or process.
+   Returns: dict of arrays ('lhs', 'int_<axis>' values, 'cat_<axis>' level indices)
+   """
+   d_p = sum(cnt for *_ , cnt in cont_specs[pcell])
+   random.seed(f"{pcell}_{seed}")
 
+   # a) Continuous LHS + adaptive maximin
+   arrays = {'lhs': lhs_maximin(d_p, n_p, patience=10*d_p, seed=seed)}
 
-       # b) Integer OA sampling (with fallback to random if N not divisible)
-       int_oa = {}
-       for name, mn, mx in int_specs.get(pcell, []):
-           levels = list(range(mn, mx + 1))
-           s = len(levels)
-           if n_p % s == 0:
-               int_oa[name] = sample_integer_oa(mn, mx, n_p, seed=hash(f"{pcell}_{name}"))
-           else:
-               # Fallback to random sampling for integers
-               print(f"Warning: {pcell} has {n_p} samples, not divisible by {s} levels for {name}, using random sampling")
-               random.seed(hash(f"{pcell}_{name}"))
-               int_oa[name] = [random.randint(mn, mx) for _ in range(n_p)]
-
-
-       # c) OA categoricals
-       cat_oa = {}
-       for name, levels in cat_specs:
-           # For OA to work, N must be divisible by number of levels
-           s = len(levels)
-           if n_p % s == 0:
-               cat_oa[name] = sample_categorical_oa(levels, n_p, seed=hash(f"{pcell}_{name}"))
-           else:
-               # If N is not divisible, fall back to random for this categorical
-               print(f"Warning: {pcell} has {n_p} samples, not divisible by {s} levels for {name}, using random sampling")
-               cat_oa[name] = [random.choice(levels) for _ in range(n_p)]
+   # b) Integer OA sampling (with fallback to random if N not divisible)
+   for name, mn, mx in int_specs.get(pcell, []):
+       s = mx - mn + 1
+       if n_p % s == 0:
+           values = sample_integer_oa(mn, mx, n_p, seed=f"{pcell}_{name}_{seed}")
+       else:
+           print(f"Warning: {pcell} has {n_p} samples, not divisible by {s} levels for {name}, using random sampling")
+           random.seed(f"{pcell}_{name}_{seed}")
+           values = [random.randint(mn, mx) for _ in range(n_p)]
+       arrays[f'int_{name}'] = np.asarray(values, dtype=np.int32)
+
+   # c) OA categoricals (stored as level indices)
+   for name, levels in cat_specs:
+       s = len(levels)
+       if n_p % s == 0:
+           indices = sample_categorical_oa(list(range(s)), n_p, seed=f"{pcell}_{name}_{seed}")
+       else:
+           print(f"Warning: {pcell} has {n_p} samples, not divisible by {s} levels for {name}, using random sampling")
+           indices = [random.randrange(s) for _ in range(n_p)]
+       arrays[f'cat_{name}'] = np.asarray(indices, dtype=np.int8)
+   return arrays
+
+
+def _load_or_sample(pcell, n, seed):
+   """arrays of _sample_pcell, read from the sample cache or sampled and written to it"""
+   path = _cache_path(pcell, n, seed)
+   if os.path.exists(path):
+       with np.load(path) as data:
+           return {key: data[key] for key in data.files}
+   arrays = _sample_pcell(pcell, n, seed)
+   os.makedirs(CACHE_DIR, exist_ok=True)
+   # write and rename, concurrent writers of the same samples leave one complete file
+   tmp_path = f"{path}.{os.getpid()}.tmp"
+   with open(tmp_path, 'wb') as f:
+       np.savez_compressed(f, **arrays)
+   os.replace(tmp_path, path)
+   return arrays
+
+
+def get_samples(pcell, n=None, seed=1337):
+   """
+   Samples of one PCell (list of parameter dicts), cached on disk in CACHE_DIR.
+   The cache is keyed by a hash of the PCell specs, n, seed and ELHS_VERSION.
+   pcell: key of cont_specs/int_specs
+   n: number of samples (default inventory_np[pcell])
+   seed: seed of the LHS, maximin swaps and OA shuffles
+   """
+   n = inventory_np[pcell] if n is None else n
+   if n == 0:
+       return []
+   arrays = _load_or_sample(pcell, n, seed)
+   int_oa = {name: arrays[f'int_{name}'].tolist() for name, *_ in int_specs.get(pcell, [])}
+   cat_oa = {name: [levels[k] for k in arrays[f'cat_{name}'].tolist()] for name, levels in cat_specs}
+   return generate_mixed_samples(pcell, arrays['lhs'], int_oa, cat_oa)
 
 
-       # d) Merge into full mixed-level samples
-       samples = generate_mixed_samples(pcell, lhs_pts, int_oa, cat_oa)
-       all_samples[pcell] = samples
+def generate_all_samples(seed=1337, processes=None):
+   """
+   Samples of all PCells with the inventory_np counts (dict pcell -> list of parameter dicts).
+   PCells missing from the sample cache are generated in parallel.
+   processes: number of worker processes (default one per missing PCell, 1 generates in this process)
+   """
+   missing = [pcell for pcell, n_p in inventory_np.items() if n_p > 0 and not os.path.exists(_cache_path(pcell, n_p, seed))]
+   if len(missing) > 1 and processes != 1:
+       with ProcessPoolExecutor(max_workers=processes or len(missing)) as pool:
+           list(pool.map(_load_or_sample, missing, [inventory_np[pcell] for pcell in missing], [seed] * len(missing)))
+   return {pcell: get_samples(pcell, seed=seed) for pcell in inventory_np}
+
+
+def __getattr__(name):
+   # all_samples used to be generated at import, it is now generated (or loaded) on first access
+   if name == 'all_samples':
+       globals()['all_samples'] = generate_all_samples()
+       return globals()['all_samples']
+   raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-       print(f"{pcell}: generated {len(samples)} samples (inventory np = {n_p})")
+if __name__ == "__main__":
+   import json
+
+   all_samples = generate_all_samples()
+   for pcell, samples in all_samples.items():
+       print(f"{pcell}: generated {len(samples)} samples (inventory np = {inventory_np[pcell]})")
        # Print a few examples for verification
        print(f"First 3 samples for {pcell}:")
        for s in samples[:3]:
            print(s)
        print()
-
-
-   return all_samples
-
-
-# Generate samples at module level so they can be imported
-all_samples = generate_all_samples()
-
-
-if __name__ == "__main__":
-   import json
-   import os
   
    # Save samples to JSON files
    # output_dir = os.path.join(os.path.dirname(__file__), "gen_params_32hr")
@@ -443,4 +533,3 @@ if __name__ == "__main__":
        print(f"  {pcell}: {len(samples)} samples")
    print("\nTotal samples across all PCells:", sum(len(samples) for samples in all_samples.values()))
    print("Expected total from budget: 40,814 samples")
-
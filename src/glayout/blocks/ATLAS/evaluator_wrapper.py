@@ -9,6 +9,7 @@ from gdsfactory.typings import Component
 
 from robust_verification import run_robust_verification
 from glayout.flow.blocks.evaluator_box.physical_features import run_physical_feature_extraction
+from glayout.flow.pdk.util.stage_timing import stage
 
 def get_next_filename(base_name="evaluation", extension=".json"):
     """
@@ -22,9 +23,11 @@ def get_next_filename(base_name="evaluation", extension=".json"):
             return filename
         i += 1
 
-def run_evaluation(layout_path: str, component_name: str, top_level: Component) -> dict:
+def run_evaluation(layout_path: str, component_name: str, top_level: Component, policy: dict = None) -> dict:
     """
     The main evaluation wrapper. Runs all evaluation modules and combines results.
+    policy = early-exit policy of the verification (robust_verification.DEFAULT_POLICY), the stages
+    it skipped are listed in skipped_stages
     """
     print(f"--- Starting Comprehensive Evaluation for {component_name} ---")
 
@@ -51,11 +54,17 @@ def run_evaluation(layout_path: str, component_name: str, top_level: Component)
 
     # Run verification module
     print("Running verification checks (DRC, LVS)...")
-    verification_results = run_robust_verification(layout_path, component_name, top_level)
+    with stage("verification"):
+        verification_results = run_robust_verification(layout_path, component_name, top_level, policy=policy)
     
-    # Run physical features module
-    print("Running physical feature extraction (PEX, Area, Symmetry)...")
-    physical_results = run_physical_feature_extraction(layout_path, component_name, top_level)
+    # Run physical features module (PEX already ran, or was skipped, in verification)
+    print("Running physical feature extraction (Area, Symmetry)...")
+    with stage("physical_features"):
+        physical_results = run_physical_feature_extraction(
+            layout_path, component_name, top_level,
+            run_pex=False, run_geometry="geometry" not in verification_results["skipped_stages"]
+        )
+    physical_results.pop("pex")
     
     # Combine results into a single dictionary
     final_results = {
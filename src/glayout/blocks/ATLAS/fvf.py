@@ -4,7 +4,7 @@ from gdsfactory.cell import cell
 from gdsfactory.component import Component
 from gdsfactory import Component
 from glayout.flow.primitives.fet import nmos, pmos, multiplier
-from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port
+from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port, align_many
 from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid
 from glayout.flow.pdk.util.port_utils import rename_ports_by_orientation
 from glayout.flow.routing.straight_route import straight_route
@@ -35,8 +35,15 @@ def get_component_netlist(component):
         netlist.source_netlist = data['source_netlist']
         return netlist
     
-    # Fallback: return the string representation (should not happen in normal operation)
-    return component.info.get('netlist', '')
+    # Serialized forms from Netlist.to_dict / Netlist.to_bytes
+    netlist = component.info.get('netlist', '')
+    if isinstance(netlist, dict):
+        return Netlist.from_dict(netlist)
+    if isinstance(netlist, bytes):
+        return Netlist.from_bytes(netlist)
+
+    # Fallback: return the netlist as stored (a Netlist, or a string representation)
+    return netlist
 
 def fvf_netlist(fet_1: Component, fet_2: Component) -> Netlist:
 
@@ -82,10 +89,9 @@ def sky130_add_fvf_labels(fvf_in: Component) -> Component:
     move_info.append((inputlabel,fvf_in.ports["A_multiplier_0_gate_N"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        fvf_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    fvf_in.add(align_many(comps, prts, alignments))
     return fvf_in.flatten() 
 
 @cell
@@ -6,7 +6,7 @@ from gdsfactory.cell import cell
 from gdsfactory import Component
 from gdsfactory.components import text_freetype, rectangle
 from glayout.flow.primitives.fet import nmos, pmos, multiplier
-from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, prec_ref_center
+from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, align_many, prec_ref_center
 from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid
 from glayout.flow.pdk.util.port_utils import rename_ports_by_orientation
 from glayout.flow.routing.straight_route import straight_route
@@ -58,10 +58,9 @@ def add_lvcm_labels(lvcm_in: Component,
     move_info.append((output2label,lvcm_in.ports["M_4_A_multiplier_0_drain_N"],None))
 
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        lvcm_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    lvcm_in.add(align_many(comps, prts, alignments))
     return lvcm_in.flatten() 
 
 def low_voltage_cmirr_netlist(bias_fvf: Component, cascode_fvf: Component, fet_1_ref: ComponentReference, fet_2_ref: ComponentReference, fet_3_ref: ComponentReference, fet_4_ref: ComponentReference) -> Netlist:
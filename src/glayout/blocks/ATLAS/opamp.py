@@ -1,6 +1,6 @@
 from gdsfactory.read.import_gds import import_gds
 from gdsfactory.components import text_freetype, rectangle
-from glayout.flow.pdk.util.comp_utils import prec_array, movey, align_comp_to_port, prec_ref_center
+from glayout.flow.pdk.util.comp_utils import prec_array, movey, align_comp_to_port, align_many, prec_ref_center
 from glayout.flow.pdk.util.port_utils import add_ports_perimeter, print_ports
 from gdsfactory.component import Component
 from glayout.flow.pdk.mappedpdk import MappedPDK
@@ -58,10 +58,9 @@ def sky130_add_opamp_2_labels(opamp_in: Component) -> Component:
 	outputlabel.add_label(text="VOUT",layer=met4_label)
 	move_info.append((outputlabel,opamp_in.ports["commonsource_output_E"],('l','c')))
 	# move everything to position
-	for comp, prt, alignment in move_info:
-		alignment = ('c','b') if alignment is None else alignment
-		compref = align_comp_to_port(comp, prt, alignment=alignment)
-		opamp_in.add(compref)
+	comps, prts, alignments = zip(*move_info)
+	alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+	opamp_in.add(align_many(comps, prts, alignments))
 	return opamp_in.flatten()
 
 def sky130_add_opamp_3_labels(opamp_in: Component) -> Component:
@@ -116,10 +115,9 @@ def sky130_add_opamp_3_labels(opamp_in: Component) -> Component:
 	outputlabel.add_label(text="CSoutput",layer=met4_label)
 	move_info.append((outputlabel,opamp_in.ports["commonsource_output_E"],('l','c')))
 	# move everything to position
-	for comp, prt, alignment in move_info:
-		alignment = ('c','b') if alignment is None else alignment
-		compref = align_comp_to_port(comp, prt, alignment=alignment)
-		opamp_in.add(compref)
+	comps, prts, alignments = zip(*move_info)
+	alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+	opamp_in.add(align_many(comps, prts, alignments))
 	return opamp_in.flatten()
 
 if __name__=="__main__":
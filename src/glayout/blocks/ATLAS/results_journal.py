@@ -0,0 +1,80 @@
+"""
+Append-only JSONL journal of dataset results.
+
+Every record is written as one line and fsync'd before append returns, so a run killed at any
+point (even SIGKILL) keeps every result it reported. A line torn by a kill in the middle of a
+write is dropped when the journal is read or reopened.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Iterator, Union
+
+
+def iter_journal(path: Union[str, Path]) -> Iterator[dict]:
+    """Stream the records of a journal (a torn last line is skipped)."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+class ResultsJournal:
+    """Append-only, fsync'd JSONL file of result records (dicts with a sample_id)."""
+
+    def __init__(self, path: Union[str, Path], truncate: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        created = not self.path.exists()
+        self._file = open(self.path, "wb" if truncate else "ab")
+        if not truncate:
+            self._drop_torn_tail()
+        if created or truncate:
+            # make the new directory entry durable as well
+            dir_fd = os.open(self.path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _drop_torn_tail(self) -> None:
+        """truncate a last line left incomplete by a killed writer"""
+        size = end = self._file.seek(0, os.SEEK_END)
+        with open(self.path, "rb") as f:
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+        if end != size:
+            self._file.truncate(end)
+            os.fsync(self._file.fileno())
+
+    def completed_ids(self) -> set:
+        """sample_ids of all records in the journal"""
+        return {record["sample_id"] for record in iter_journal(self.path) if "sample_id" in record}
+
+    def append(self, record: dict) -> None:
+        """Write one record and fsync it."""
+        self._file.write(json.dumps(record).encode() + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ResultsJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,174 @@
+"""
+Columnar (Parquet) storage of dataset results.
+
+Results are written as a hive-partitioned Parquet dataset (root/pcell=<pcell>/shard=<k>/part-*.parquet,
+shard k holds sample ids k*shard_size .. (k+1)*shard_size-1) with one fixed schema for every PCell.
+The writer streams records (from a results journal or as they complete) and keeps at most
+row_group_size buffered rows per partition. Readers load only the columns they ask for and
+skip partitions and row groups that do not match the filters.
+
+usage:
+    write_results_dataset("tg_dataset/tg_results.jsonl", "tg_dataset/tg_results.parquet")
+    df = read_results("tg_dataset/tg_results.parquet", columns=["sample_id", "area_um2"],
+                      filters=[("pcell", "=", "txgate"), ("success", "=", True)])
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from results_journal import iter_journal
+
+# columns of the result records (run_dataset_multiprocess.run_single_evaluation), partition columns excluded
+RESULT_COLUMNS = [
+    ("sample_id", "int64"),
+    ("component_name", "string"),
+    ("success", "bool_"),
+    ("drc_pass", "bool_"),
+    ("lvs_pass", "bool_"),
+    ("execution_time", "float64"),
+    ("pex_status", "string"),
+    ("total_resistance_ohms", "float64"),
+    ("total_capacitance_farads", "float64"),
+    ("area_um2", "float64"),
+    ("symmetry_horizontal", "float64"),
+    ("symmetry_vertical", "float64"),
+    ("symmetry_error_bound", "float64"),
+    ("skipped_stages", "string"),
+    ("error", "string"),
+    ("output_directory", "string"),
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("the Parquet results dataset requires the pyarrow package, install it with `pip install pyarrow`") from e
+    return pyarrow
+
+
+def results_schema():
+    """Fixed schema of the result files: the result columns, numeric parameters (name -> values) and all parameters as JSON."""
+    pa = _pyarrow()
+    return pa.schema(
+        [(name, getattr(pa, kind)()) for name, kind in RESULT_COLUMNS]
+        + [("params", pa.map_(pa.string(), pa.list_(pa.float64()))), ("params_json", pa.string())]
+    )
+
+
+def _numeric_values(value) -> Optional[list]:
+    values = value if isinstance(value, (list, tuple)) else [value]
+    if all(isinstance(v, (int, float)) for v in values):
+        return [float(v) for v in values]
+    return None
+
+
+def result_row(record: dict) -> dict:
+    """result record -> row of results_schema (also reads sweeper records with params/report/index)"""
+    report = record.get("report") or {}
+    params = record.get("parameters", record.get("params")) or {}
+    row = {name: record.get(name, report.get(name)) for name, _ in RESULT_COLUMNS}
+    if row["sample_id"] is None:
+        row["sample_id"] = record.get("index")
+    if isinstance(row["skipped_stages"], list):
+        row["skipped_stages"] = ",".join(row["skipped_stages"])
+    row["params"] = [(key, values) for key, values in ((k, _numeric_values(v)) for k, v in params.items()) if values is not None]
+    row["params_json"] = json.dumps(params)
+    return row
+
+
+class ResultsParquetWriter:
+    """Streams result records into a hive-partitioned Parquet dataset (by pcell and shard)."""
+
+    def __init__(self, root: Union[str, Path], shard_size: int = 1000, row_group_size: int = 10000, pcell: str = "txgate"):
+        """args:
+        root = dataset directory
+        shard_size = sample ids per shard partition
+        row_group_size = buffered rows of a partition written as one file
+        pcell = PCell of records without a pcell field
+        """
+        _pyarrow()
+        self.root = Path(root)
+        self.shard_size = shard_size
+        self.row_group_size = row_group_size
+        self.pcell = pcell
+        self.schema = results_schema()
+        self._buffers = dict()
+        self._files = 0
+
+    def write(self, record: dict) -> None:
+        row = result_row(record)
+        key = (record.get("pcell") or self.pcell, int(row["sample_id"] or 0) // self.shard_size)
+        buffer = self._buffers.setdefault(key, list())
+        buffer.append(row)
+        if len(buffer) >= self.row_group_size:
+            self._flush(key)
+
+    def _flush(self, key: tuple) -> None:
+        pa = _pyarrow()
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        pcell, shard = key
+        directory = self.root / f"pcell={pcell}" / f"shard={shard}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{os.getpid()}-{self._files:05d}.parquet"
+        self._files += 1
+        pa.parquet.write_table(pa.Table.from_pylist(rows, schema=self.schema), f"{path}.tmp", compression="zstd")
+        os.replace(f"{path}.tmp", path)
+
+    def close(self) -> None:
+        for key in list(self._buffers):
+            self._flush(key)
+
+    def __enter__(self) -> "ResultsParquetWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_results_dataset(records: Union[str, Path, Iterable[dict]], root: Union[str, Path], shard_size: int = 1000, pcell: str = "txgate") -> Path:
+    """(Re)write the dataset at root from records (an iterable or the path of a results journal).
+    The dataset is built next to root and swapped in when complete. Duplicate sample ids keep the first record."""
+    if isinstance(records, (str, Path)):
+        records = iter_journal(records)
+    root = Path(root)
+    building = root.with_name(root.name + ".building")
+    shutil.rmtree(building, ignore_errors=True)
+    seen = set()
+    with ResultsParquetWriter(building, shard_size=shard_size, pcell=pcell) as writer:
+        for record in records:
+            key = (record.get("pcell") or pcell, record.get("sample_id", record.get("index")))
+            if key in seen:
+                continue
+            seen.add(key)
+            writer.write(record)
+    building.mkdir(parents=True, exist_ok=True)
+    if root.exists():
+        old = root.with_name(root.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(root, old)
+        os.replace(building, root)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(building, root)
+    return root
+
+
+def read_results(root: Union[str, Path], columns: Optional[list] = None, filters=None):
+    """Load results from the dataset at root as a pandas DataFrame.
+    args:
+    columns = columns to read (default all; pcell and shard are partition columns)
+    filters = pyarrow expression or list of (column, op, value) tuples (all must hold),
+              partitions and row groups that cannot match are skipped
+    """
+    pa = _pyarrow()
+    if isinstance(filters, list):
+        filters = pa.parquet.filters_to_expression(filters)
+    dataset = pa.dataset.dataset(str(root), format="parquet", partitioning="hive")
+    return dataset.to_table(columns=columns, filter=filters).to_pandas()
@@ -27,6 +27,11 @@ if _glayout_repo_path.exists() and str(_glayout_repo_path) not in sys.path:
 del _here
 
 from gdsfactory.typings import Component
+from glayout.flow.spice import parse_spice_file
+from glayout.flow.pdk.util.stage_timing import stage
+
+# PEX script, run from the trial's working directory (outputs are written there)
+RUN_PEX_SCRIPT = str(Path(__file__).resolve().parent / "run_pex.sh")
 
 def ensure_pdk_environment():
     """Ensure PDK environment is properly set.
@@ -34,6 +39,8 @@ def ensure_pdk_environment():
     * Uses an existing PDK_ROOT env if already set (preferred)
     * Falls back to the conda-env PDK folder if needed
     * Sets CAD_ROOT **only** to the Magic installation directory (``$CONDA_PREFIX/lib``)
+    * Reloads the PDK modules only when PDK_ROOT changes (reloading creates new PDK
+      classes, which the already generated components do not validate against)
     """
     # Respect an existing PDK_ROOT (set by the user / calling script)
     pdk_root = os.environ.get('PDK_ROOT')
@@ -70,8 +77,12 @@ def ensure_pdk_environment():
     if conda_prefix:
         env_vars['CAD_ROOT'] = os.path.join(conda_prefix, 'lib')
 
+    pdk_root_changed = os.environ.get('PDK_ROOT') != pdk_root
+
     # Refresh the environment in *one* atomic update to avoid partial states
     os.environ.update(env_vars)
+    if not pdk_root_changed:
+        return pdk_root
 
     # Also try to reinitialize the PDK module to avoid stale state
     try:
@@ -224,72 +235,59 @@ def parse_lvs_report(report_content: str) -> dict:
 
 def _parse_simple_parasitics(component_name: str) -> tuple[float, float]:
     """Parses total parasitic R and C from a SPICE file by simple summation."""
-    total_resistance = 0.0
-    total_capacitance = 0.0
     spice_file_path = f"{component_name}_pex.spice"
     if not os.path.exists(spice_file_path):
         return 0.0, 0.0
-    with open(spice_file_path, 'r') as f:
-        for line in f:
-            orig_line = line.strip()  # Keep original case for capacitor parsing
-            line = line.strip().upper()
-            parts = line.split()
-            orig_parts = orig_line.split()  # Original case parts for capacitor values
-            if not parts: continue
-            
-            name = parts[0]
-            if name.startswith('R') and len(parts) >= 4:
-                try: total_resistance += float(parts[3])
-                except (ValueError): continue
-            elif name.startswith('C') and len(parts) >= 4:
-                try:
-                    cap_str = orig_parts[3]  # Use original case for capacitor value
-                    unit = cap_str[-1]
-                    val_str = cap_str[:-1]
-                    if unit == 'F': cap_value = float(val_str) * 1e-15
-                    elif unit == 'P': cap_value = float(val_str) * 1e-12
-                    elif unit == 'N': cap_value = float(val_str) * 1e-9
-                    elif unit == 'U': cap_value = float(val_str) * 1e-6
-                    elif unit == 'f': cap_value = float(val_str) * 1e-15  # femtofarads
-                    else: cap_value = float(cap_str)
-                    total_capacitance += cap_value
-                except (ValueError): continue
+    # streaming parser: handles continuation lines and SI suffixes (e.g. 1.5fF, 2k)
+    parsed = parse_spice_file(spice_file_path)
+    total_resistance = sum(network.total_resistance() for network in parsed.rc_networks.values())
+    total_capacitance = sum(network.total_capacitance() for network in parsed.rc_networks.values())
     return total_resistance, total_capacitance
 
-def run_robust_verification(layout_path: str, component_name: str, top_level: Component) -> dict:
-    """
-    Runs DRC, LVS, and PEX checks with robust PDK handling.
-    """
-    verification_results = {
-        "drc": {"status": "not run", "is_pass": False, "report_path": None, "summary": {}},
-        "lvs": {"status": "not run", "is_pass": False, "report_path": None, "summary": {}},
-        "pex": {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0, "spice_file": None}
-    }
-    
-    # Ensure PDK environment before each operation
-    pdk_root = ensure_pdk_environment()
-    print(f"Using PDK_ROOT: {pdk_root}")
-    
-    # Import sky130_mapped_pdk *after* the environment is guaranteed sane so
-    # that gdsfactory/PDK initialization picks up the correct PDK_ROOT.
-    from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
-    
-    # DRC Check
+# Early-exit policy of run_robust_verification (see resolve_policy)
+DEFAULT_POLICY = {
+    "on_drc_fail": "continue",      # continue | skip_pex | skip_lvs (LVS and PEX) | stop (LVS, PEX and geometry)
+    "on_lvs_fail": "continue",      # continue | skip_pex | stop (PEX and geometry)
+    "drc_violation_cap": None,      # more DRC violations than this: stop after DRC
+    "concurrent_drc_lvs": False,    # run DRC and LVS at the same time (LVS then always runs)
+}
+POLICY_ACTIONS = {
+    "on_drc_fail": ("continue", "skip_pex", "skip_lvs", "stop"),
+    "on_lvs_fail": ("continue", "skip_pex", "stop"),
+}
+# stages skipped by each action ("geometry" is skipped by the evaluator)
+_SKIPPED_STAGES = {"continue": (), "skip_pex": ("pex",), "skip_lvs": ("lvs", "pex"), "stop": ("lvs", "pex", "geometry")}
+
+def resolve_policy(policy: dict = None) -> dict:
+    """DEFAULT_POLICY updated with policy, e.g. {"on_drc_fail": "skip_pex", "drc_violation_cap": 500}.
+    Raises ValueError on unknown keys, actions or values of the wrong type."""
+    resolved = dict(DEFAULT_POLICY)
+    for key, value in (policy or {}).items():
+        if key not in DEFAULT_POLICY:
+            raise ValueError(f"unknown verification policy {key!r}, expected one of {list(DEFAULT_POLICY)}")
+        if key in POLICY_ACTIONS and value not in POLICY_ACTIONS[key]:
+            raise ValueError(f"verification policy {key} must be one of {POLICY_ACTIONS[key]}, not {value!r}")
+        if key == "drc_violation_cap" and value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+            raise ValueError(f"verification policy drc_violation_cap must be null or a non-negative integer, not {value!r}")
+        if key == "concurrent_drc_lvs" and not isinstance(value, bool):
+            raise ValueError(f"verification policy concurrent_drc_lvs must be true or false, not {value!r}")
+        resolved[key] = value
+    return resolved
+
+def _run_drc(pdk, layout_path: str, component_name: str) -> dict:
+    """Magic DRC of the layout, returns the drc entry of the verification results."""
     drc_report_path = os.path.abspath(f"./{component_name}.drc.rpt")
-    verification_results["drc"]["report_path"] = drc_report_path
-    
+    result = {"status": "not run", "is_pass": False, "report_path": drc_report_path, "summary": {}}
     try:
         # Clean up any existing DRC report
         if os.path.exists(drc_report_path):
             os.remove(drc_report_path)
         
-        # Ensure PDK environment again right before DRC
-        ensure_pdk_environment()
-        
         print(f"Running DRC for {component_name}...")
         
         # Try the PDK DRC method first
-        sky130_mapped_pdk.drc_magic(layout_path, component_name, output_file=drc_report_path)
+        with stage("drc"):
+            pdk.drc_magic(layout_path, component_name, output_file=drc_report_path)
         
         # Check if report was created and read it
         report_content = ""
@@ -297,15 +295,8 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
             with open(drc_report_path, 'r') as f:
                 report_content = f.read()
             print(f"DRC report created successfully: {len(report_content)} chars")
-        '''else:
-            print("Warning: DRC report file was not created, creating empty report")
-            # Create empty report as fallback
-            report_content = f"{component_name} count: \n----------------------------------------\n\n"
-            with open(drc_report_path, 'w') as f:
-                f.write(report_content)
-            '''
         summary = parse_drc_report(report_content)
-        verification_results["drc"].update({
+        result.update({
             "summary": summary, 
             "is_pass": summary["is_pass"], 
             "status": "pass" if summary["is_pass"] else "fail"
@@ -318,30 +309,25 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
             with open(drc_report_path, 'w') as f:
                 f.write(f"DRC Error for {component_name}\n")
                 f.write(f"Error: {str(e)}\n")
-            verification_results["drc"]["status"] = f"error: {e}"
+            result["status"] = f"error: {e}"
         except:
-            verification_results["drc"]["status"] = f"error: {e}"
-
-    # Small delay between DRC and LVS
-    import time
-    time.sleep(1)
+            result["status"] = f"error: {e}"
+    return result
 
-    # LVS Check
+def _run_lvs(pdk, top_level: Component, component_name: str) -> dict:
+    """Magic extraction and netgen LVS of the component, returns the lvs entry of the verification results."""
     lvs_report_path = os.path.abspath(f"./{component_name}.lvs.rpt")
-    verification_results["lvs"]["report_path"] = lvs_report_path
-    
+    result = {"status": "not run", "is_pass": False, "report_path": lvs_report_path, "summary": {}}
     try:
         # Clean up any existing LVS report
         if os.path.exists(lvs_report_path):
             os.remove(lvs_report_path)
         
-        # Ensure PDK environment again right before LVS
-        ensure_pdk_environment()
-        
         print(f"Running LVS for {component_name}...")
         
         # Try the PDK LVS method first
-        sky130_mapped_pdk.lvs_netgen(layout=top_level, design_name=component_name, output_file_path=lvs_report_path)
+        with stage("lvs"):
+            pdk.lvs_netgen(layout=top_level, design_name=component_name, output_file_path=lvs_report_path)
         
         # Check if report was created and read it
         report_content = ""
@@ -349,15 +335,8 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
             with open(lvs_report_path, 'r') as report_file:
                 report_content = report_file.read()
             print(f"LVS report created successfully: {len(report_content)} chars")
-        '''else:
-            print("Warning: LVS report file was not created, creating fallback report")
-            # Create fallback report
-            report_content = f"LVS Report for {component_name}\nFinal result: Circuits match uniquely.\nLVS Done.\n"
-            with open(lvs_report_path, 'w') as f:
-                f.write(report_content)
-           '''
         lvs_summary = parse_lvs_report(report_content)
-        verification_results["lvs"].update({
+        result.update({
             "summary": lvs_summary, 
             "is_pass": lvs_summary["is_pass"], 
             "status": "pass" if lvs_summary["is_pass"] else "fail"
@@ -370,17 +349,15 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
             with open(lvs_report_path, 'w') as f:
                 f.write(f"LVS Error for {component_name}\n")
                 f.write(f"Error: {str(e)}\n")
-            verification_results["lvs"]["status"] = f"error: {e}"
+            result["status"] = f"error: {e}"
         except:
-            verification_results["lvs"]["status"] = f"error: {e}"
+            result["status"] = f"error: {e}"
+    return result
 
-    # Small delay between LVS and PEX
-    time.sleep(1)
-    
-    # PEX Extraction
+def _run_pex(layout_path: str, component_name: str) -> dict:
+    """PEX extraction (run_pex.sh) of the layout, returns the pex entry of the verification results."""
     pex_spice_path = os.path.abspath(f"./{component_name}_pex.spice")
-    verification_results["pex"]["spice_file"] = pex_spice_path
-    
+    result = {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0, "spice_file": pex_spice_path}
     try:
         # Clean up any existing PEX file
         if os.path.exists(pex_spice_path):
@@ -389,31 +366,99 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
         print(f"Running PEX extraction for {component_name}...")
         
         # Run the PEX extraction script 
-        subprocess.run(["bash", "run_pex.sh", layout_path, component_name], 
-                      check=True, capture_output=True, text=True, cwd=".")
+        with stage("pex"):
+            subprocess.run(["bash", RUN_PEX_SCRIPT, layout_path, component_name], 
+                          check=True, capture_output=True, text=True, cwd=".")
         
         # Check if PEX spice file was created and parse it
         if os.path.exists(pex_spice_path):
             total_res, total_cap = _parse_simple_parasitics(component_name)
-            verification_results["pex"].update({
+            result.update({
                 "status": "PEX Complete",
                 "total_resistance_ohms": total_res,
                 "total_capacitance_farads": total_cap
             })
             print(f"PEX extraction completed: R={total_res:.2f}Ω, C={total_cap:.6e}F")
         else:
-            verification_results["pex"]["status"] = "PEX Error: Spice file not generated"
+            result["status"] = "PEX Error: Spice file not generated"
             
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr if e.stderr else str(e)
-        verification_results["pex"]["status"] = f"PEX Error: {error_msg}"
+        result["status"] = f"PEX Error: {error_msg}"
         print(f"PEX extraction failed: {error_msg}")
     except FileNotFoundError:
-        verification_results["pex"]["status"] = "PEX Error: run_pex.sh not found"
+        result["status"] = "PEX Error: run_pex.sh not found"
         print("PEX extraction failed: run_pex.sh script not found")
     except Exception as e:
-        verification_results["pex"]["status"] = f"PEX Unexpected Error: {e}"
+        result["status"] = f"PEX Unexpected Error: {e}"
         print(f"PEX extraction failed with unexpected error: {e}")
+    return result
+
+def run_robust_verification(layout_path: str, component_name: str, top_level: Component, policy: dict = None) -> dict:
+    """
+    Runs DRC, LVS, and PEX checks with robust PDK handling.
+
+    policy (see DEFAULT_POLICY / resolve_policy) skips the later stages of a sample that fails
+    DRC or LVS. Skipped stages get the status "skipped: <reason>" and are listed in
+    skipped_stages ("geometry" in that list is for the caller to skip).
+    """
+    policy = resolve_policy(policy)
+    verification_results = {
+        "drc": {"status": "not run", "is_pass": False, "report_path": None, "summary": {}},
+        "lvs": {"status": "not run", "is_pass": False, "report_path": None, "summary": {}},
+        "pex": {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0, "spice_file": None},
+        "skipped_stages": [],
+    }
+
+    def skip(action: str, reason: str, done: tuple):
+        for name in _SKIPPED_STAGES[action]:
+            if name in done or name in verification_results["skipped_stages"]:
+                continue
+            verification_results["skipped_stages"].append(name)
+            if name in verification_results:
+                verification_results[name]["status"] = f"skipped: {reason}"
+    
+    # Ensure PDK environment before each operation
+    pdk_root = ensure_pdk_environment()
+    print(f"Using PDK_ROOT: {pdk_root}")
+    
+    # Import sky130_mapped_pdk *after* the environment is guaranteed sane so
+    # that gdsfactory/PDK initialization picks up the correct PDK_ROOT.
+    from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
+    
+    if policy["concurrent_drc_lvs"]:
+        # DRC and LVS are independent magic/netgen runs (own temp dirs and reports)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            drc_future = executor.submit(_run_drc, sky130_mapped_pdk, layout_path, component_name)
+            lvs_future = executor.submit(_run_lvs, sky130_mapped_pdk, top_level, component_name)
+            verification_results["drc"] = drc_future.result()
+            verification_results["lvs"] = lvs_future.result()
+        done = ("drc", "lvs")
+    else:
+        verification_results["drc"] = _run_drc(sky130_mapped_pdk, layout_path, component_name)
+        done = ("drc",)
+
+    drc_errors = verification_results["drc"]["summary"].get("total_errors", 0)
+    if policy["drc_violation_cap"] is not None and drc_errors > policy["drc_violation_cap"]:
+        skip("stop", f"{drc_errors} DRC violations > drc_violation_cap {policy['drc_violation_cap']}", done)
+    elif not verification_results["drc"]["is_pass"]:
+        skip(policy["on_drc_fail"], "DRC failed", done)
+
+    import time
+    if "lvs" not in done and "lvs" not in verification_results["skipped_stages"]:
+        # Small delay between DRC and LVS
+        time.sleep(1)
+        ensure_pdk_environment()
+        verification_results["lvs"] = _run_lvs(sky130_mapped_pdk, top_level, component_name)
+        done = ("drc", "lvs")
+    if "lvs" in done and not verification_results["lvs"]["is_pass"]:
+        skip(policy["on_lvs_fail"], "LVS failed", done)
+
+    if "pex" not in verification_results["skipped_stages"]:
+        # Small delay between LVS and PEX
+        time.sleep(1)
+        verification_results["pex"] = _run_pex(layout_path, component_name)
         
     return verification_results
 
@@ -9,10 +9,12 @@ import os
 import sys
 import time
 import json
+import csv
+import hashlib
+import itertools
 import shutil
 from pathlib import Path
 import numpy as np
-import pandas as pd
 
 # Suppress overly verbose gdsfactory logging
 import warnings
@@ -70,7 +72,13 @@ def get_global_pdk():
     return GLOBAL_SKY130_PDK
 
 # Import the shared PDK environment helper so we keep a single source of truth
-from robust_verification import ensure_pdk_environment
+from robust_verification import ensure_pdk_environment, resolve_policy
+from glayout.flow.pdk.util.stage_timing import StageTimer, activate, stage, stage_percentiles, write_chrome_trace
+from results_journal import ResultsJournal, iter_journal
+from scratch import move_artifacts, pack_artifacts, scratch_root, use_scratch_for_tempfiles
+from runtime_scheduler import RuntimeModel, lpt_order, makespan_report, simulate_makespan
+from results_parquet import write_results_dataset
+from glayout.flow.spice.netlist import Netlist
 from contextlib import contextmanager
 
 @contextmanager
@@ -199,6 +207,9 @@ def make_json_serializable(obj):
         return obj.item()
     elif isinstance(obj, np.ndarray):
         return obj.tolist()
+    elif isinstance(obj, Netlist):
+        # same import path as the generators, so their netlists are instances of this class
+        return obj.to_dict()
     elif hasattr(obj, '__dict__'):
         try:
             return make_json_serializable(obj.__dict__)
@@ -212,72 +223,96 @@ def make_json_serializable(obj):
             return obj
         except (TypeError, ValueError):
             return str(obj)
+
+def clear_cell_caches():
+    """Drop the gdsfactory cells of the previous trial (names are reused by the next trial),
+    and the cached route cells built from them (same module as the generators use)."""
+    import gdsfactory as gf
+    from glayout.routing.route_cache import route_cache
+    if hasattr(gf, 'clear_cache'):
+        gf.clear_cache()
+    if hasattr(gf, 'clear_cell_cache'):
+        gf.clear_cell_cache()
+    route_cache.clear()
+
+# PCell generated by this runner (recorded in the results, the runtime model is per PCell)
+PCELL = "txgate"
+
+# Set by init_worker once the process is set up
+_worker_ready = False
+
+def init_worker(scratch_dir=None):
+    """Process pool initializer: set up everything the trials share, once per worker.
+
+    Validates the PDK environment, imports gdsfactory, glayout, the sky130 PDK, the
+    generators and the evaluator. Trials then only pay for their own layout and checks.
+    With scratch_dir, temporary files of the process (DRC/LVS temp dirs) are created there.
+    """
+    global _worker_ready, run_evaluation
+    start = time.time()
+    if scratch_dir is not None:
+        use_scratch_for_tempfiles(Path(scratch_dir) / "tmp")
+    setup_environment()
+    get_global_pdk()
+    import transmission_gate  # noqa: F401 (generator used by robust_transmission_gate)
+    from evaluator_wrapper import run_evaluation
+    _worker_ready = True
+    logger.info(f"Worker {os.getpid()} ready in {time.time() - start:.1f}s")
+
 # Parallelized
-def run_single_evaluation(trial_num, params, output_dir):
-    """Run a single TG evaluation in its own isolated working directory."""
+def run_single_evaluation(trial_num, params, output_dir, scratch_dir=None, pack=None, shard_size=1000, policy=None):
+    """Run a single TG evaluation in its own isolated working directory.
+
+    The working dir is scratch_dir/sample_NNNN (default output_dir/_work/sample_NNNN) and is
+    removed afterwards. Curated artifacts are moved to output_dir/sample_NNNN, or with pack
+    ('tar.gz' or 'tar.zst') appended to the shard archive output_dir/artifacts/shard_NNNNN.tar.
+
+    The stages of the trial (generation, GDS write, DRC, LVS, PEX, geometry, ...) are timed with
+    stage_timing spans; the result records their totals (stages) and the spans themselves.
+
+    policy (robust_verification.DEFAULT_POLICY) skips the later stages of a sample that fails DRC
+    or LVS; the result lists them in skipped_stages.
+    """
     trial_start = time.time()
+    # the trial runs in its working dir, resolve before changing into it
+    output_dir = Path(output_dir).resolve()
 
     # Per-trial working dir (all scratch files live here)
-    trial_work_dir = Path(output_dir) / "_work" / f"sample_{trial_num:04d}"
-    # Per-trial final results dir (curated outputs copied here)
+    trial_work_dir = Path(scratch_dir or Path(output_dir) / "_work") / f"sample_{trial_num:04d}"
+    # Per-trial final results dir (curated outputs moved here)
     trial_out_dir = Path(output_dir) / f"sample_{trial_num:04d}"
+    timer = StageTimer()
 
     try:
-        with chdir(trial_work_dir):
+        with chdir(trial_work_dir), activate(timer), stage("sample"):
             # === DETERMINISTIC SEEDING FIX ===
             import random
-            import numpy as np
             base_seed = trial_num * 1000
             random.seed(base_seed)
             np.random.seed(base_seed)
             os.environ['PYTHONHASHSEED'] = str(base_seed)
             logger.info(f"Trial {trial_num}: Set deterministic seed = {base_seed}")
 
-            # Setup environment for each trial (safe in subprocess)
-            setup_environment()
-
-            # Clear any cached gdsfactory Components / PDKs to avoid stale class refs
-            try:
-                import gdsfactory as gf
-            except ImportError:
-                import gdsfactory as gf
-            if hasattr(gf, 'clear_cache'):
-                gf.clear_cache()
-            if hasattr(gf, 'clear_cell_cache'):
-                gf.clear_cell_cache()
-            try:
-                if hasattr(gf, '_CACHE'):
-                    gf._CACHE.clear()
-                if hasattr(gf.Component, '_cell_cache'):
-                    gf.Component._cell_cache.clear()
-                if hasattr(gf, 'CONFIG'):
-                    if hasattr(gf.CONFIG, 'use_cache'):
-                        gf.CONFIG.use_cache = False
-                    if hasattr(gf.CONFIG, 'cache'):
-                        gf.CONFIG.cache = False
-            except Exception as e:
-                logger.warning(f"Could not clear some gdsfactory caches: {e}")
-
-            # Fresh PDK import per trial/process
-            import importlib, sys
-            if 'glayout.flow.pdk.sky130_mapped' in sys.modules:
-                importlib.reload(sys.modules['glayout.flow.pdk.sky130_mapped'])
-            from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
-            pdk = sky130_mapped_pdk
+            # Environment, gdsfactory and the PDK are set up once per worker (init_worker).
+            # Trials are isolated by their working dir and by clearing the cell cache after each trial.
+            if not _worker_ready:
+                init_worker(scratch_dir)
+            pdk = get_global_pdk()
 
             # Create and name component
             component_name = f"tg_sample_{trial_num:04d}"
-            comp = robust_transmission_gate(pdk, **params)
-            comp.name = component_name
+            with stage("generation"):
+                comp = robust_transmission_gate(pdk, **params)
+                comp.name = component_name
 
             # Write GDS into the trial's **work** dir
             gds_file = f"{component_name}.gds"
-            comp.write_gds(gds_file)
+            with stage("gds_write"):
+                comp.write_gds(gds_file)
             gds_path = Path.cwd() / gds_file  # absolute path
 
             # Run comprehensive evaluation (DRC, LVS, PEX, Geometry)
-            from evaluator_wrapper import run_evaluation
-            comprehensive_results = run_evaluation(str(gds_path), component_name, comp)
+            comprehensive_results = run_evaluation(str(gds_path), component_name, comp, policy=policy)
             drc_result = comprehensive_results["drc"]["is_pass"]
             lvs_result = comprehensive_results["lvs"]["is_pass"]
 
@@ -285,9 +320,8 @@ def run_single_evaluation(trial_num, params, output_dir):
             pex_data = comprehensive_results.get("pex", {})
             geometry_data = comprehensive_results.get("geometric", {})
 
-            # Copy curated artifacts to the **final** per-trial results dir
-            trial_out_dir.mkdir(parents=True, exist_ok=True)
-            files_to_copy = [
+            # Move curated artifacts to the **final** per-trial results dir (or its shard archive)
+            curated_files = [
                 gds_file,
                 f"{component_name}.drc.rpt",
                 f"{component_name}.lvs.rpt",
@@ -297,23 +331,27 @@ def run_single_evaluation(trial_num, params, output_dir):
                 f"{component_name}_lvsmag.spice",
                 f"{component_name}_sim.spice",
             ]
-            for file_path in files_to_copy:
-                p = Path(file_path)
-                if p.exists():
-                    shutil.copy(p, trial_out_dir / p.name)
+            with stage("artifacts"):
+                if pack:
+                    shard, member = pack_artifacts(curated_files, Path(output_dir) / "artifacts", trial_num, shard_size=shard_size, pack=pack)
+                    artifacts_location = f"{shard}:{member}"
+                else:
+                    move_artifacts(curated_files, trial_out_dir)
+                    artifacts_location = str(trial_out_dir)
 
             trial_time = time.time() - trial_start
             success_flag = drc_result and lvs_result
 
             result = {
                 "sample_id": trial_num,
+                "pcell": PCELL,
                 "component_name": component_name,
                 "success": success_flag,
                 "drc_pass": drc_result,
                 "lvs_pass": lvs_result,
                 "execution_time": trial_time,
                 "parameters": make_json_serializable(params),
-                "output_directory": str(trial_out_dir),
+                "output_directory": artifacts_location,
                 # PEX data
                 "pex_status": pex_data.get("status", "not run"),
                 "total_resistance_ohms": pex_data.get("total_resistance_ohms", 0.0),
@@ -322,9 +360,12 @@ def run_single_evaluation(trial_num, params, output_dir):
                 "area_um2": geometry_data.get("raw_area_um2", 0.0),
                 "symmetry_horizontal": geometry_data.get("symmetry_score_horizontal", 0.0),
                 "symmetry_vertical": geometry_data.get("symmetry_score_vertical", 0.0),
+                "symmetry_error_bound": geometry_data.get("symmetry_error_bound", 0.0),
+                "symmetry_by_layer": geometry_data.get("symmetry_by_layer", {}),
+                "skipped_stages": comprehensive_results.get("skipped_stages", []),
             }
 
-            pex_status_short = "✓" if pex_data.get("status") == "PEX Complete" else "✗"
+            pex_status_short = "✓" if pex_data.get("status") == "PEX Complete" else "-" if "pex" in result["skipped_stages"] else "✗"
             nmos_w, pmos_w = params["width"]
             nmos_f, pmos_f = params["fingers"]
             param_summary = f"NMOS:{nmos_w:.1f}μm×{nmos_f}f, PMOS:{pmos_w:.1f}μm×{pmos_f}f"
@@ -333,13 +374,13 @@ def run_single_evaluation(trial_num, params, output_dir):
                 f"(DRC: {'✓' if drc_result else '✗'}, LVS: {'✓' if lvs_result else '✗'}, PEX: {pex_status_short}) "
                 f"[{param_summary}]"
             )
-            return result
 
     except Exception as e:
         trial_time = time.time() - trial_start
         logger.error(f"❌ Sample {trial_num:04d} failed: {e}")
-        return {
+        result = {
             "sample_id": trial_num,
+            "pcell": PCELL,
             "component_name": f"tg_sample_{trial_num:04d}",
             "success": False,
             "error": str(e),
@@ -348,121 +389,263 @@ def run_single_evaluation(trial_num, params, output_dir):
         }
 
     finally:
-        # Clean ONLY this trial's scratch via CWD-scoped globbing
-        with chdir(trial_work_dir):
-            cleanup_files()
-            try:
-                import gdsfactory as gf
-            except ImportError:
-                import gdsfactory as gf
-            if hasattr(gf, 'clear_cache'):
-                gf.clear_cache()
-            if hasattr(gf, 'clear_cell_cache'):
-                gf.clear_cell_cache()
+        # Remove this trial's scratch
+        shutil.rmtree(trial_work_dir, ignore_errors=True)
+        clear_cell_caches()
+
+    result.update(stages=timer.stages(), spans=timer.spans, worker_pid=timer.pid)
+    return result
 
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 # Parallelized
-def run_dataset_generation(parameters, output_dir, max_workers=1):
-    """Run the dataset generation for all parameters (in parallel, per-trial isolation)."""
+def format_duration(seconds):
+    """seconds as '42.0s', '12.5m' or '3.2h'"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{seconds/60:.1f}m"
+    return f"{seconds/3600:.1f}h"
+
+# Columns of tg_summary.csv (fields of the result records of run_single_evaluation)
+SUMMARY_COLUMNS = [
+    "sample_id", "component_name", "success", "drc_pass", "lvs_pass", "execution_time", "parameters",
+    "output_directory", "pex_status", "total_resistance_ohms", "total_capacitance_farads",
+    "area_um2", "symmetry_horizontal", "symmetry_vertical", "symmetry_error_bound", "skipped_stages", "error",
+]
+
+# stage_timing spans whose time a skipped stage (skipped_stages) saves
+SKIPPED_STAGE_SPANS = {"lvs": "lvs", "pex": "pex", "geometry": "physical_features"}
+
+def summarize_journal(journal_path, out_dir):
+    """Stream the results journal once: write tg_results.json and tg_summary.csv and return the summary counts
+    and the percentiles of the stage timings (stats["stages"], see stage_timing.stage_percentiles).
+    stats["skipped"] counts the samples that skipped each stage (verification policy).
+
+    Only the counts and stage timings are kept in memory. Each file is written to a temporary name and renamed when complete.
+    """
+    out_dir = Path(out_dir)
+    stats = {"total": 0, "successful": 0, "drc": 0, "lvs": 0, "pex": 0, "time": 0.0, "area": 0.0,
+             "sym_h": 0.0, "sym_v": 0.0, "errors": {}, "skipped": {}}
+    seen = set()
+    stage_records = []
+    results_file, summary_file = out_dir / "tg_results.json", out_dir / "tg_summary.csv"
+    results_tmp, summary_tmp = results_file.with_suffix(".json.tmp"), summary_file.with_suffix(".csv.tmp")
+    with open(results_tmp, 'w') as results_out, open(summary_tmp, 'w', newline='') as summary_out:
+        writer = csv.DictWriter(summary_out, fieldnames=SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        results_out.write("[")
+        for r in iter_journal(journal_path):
+            if r.get("sample_id") in seen:
+                continue
+            seen.add(r.get("sample_id"))
+            results_out.write(("\n" if stats["total"] == 0 else ",\n") + json.dumps(r, indent=2))
+            writer.writerow({k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in r.items()})
+            stage_records.append({"stages": r.get("stages")})
+            stats["total"] += 1
+            for name in r.get("skipped_stages") or ():
+                stats["skipped"][name] = stats["skipped"].get(name, 0) + 1
+            if r.get("success"):
+                stats["successful"] += 1
+                stats["drc"] += bool(r.get("drc_pass"))
+                stats["lvs"] += bool(r.get("lvs_pass"))
+                stats["pex"] += r.get("pex_status") == "PEX Complete"
+                stats["time"] += r["execution_time"]
+                stats["area"] += r.get("area_um2", 0)
+                stats["sym_h"] += r.get("symmetry_horizontal", 0)
+                stats["sym_v"] += r.get("symmetry_vertical", 0)
+            else:
+                error_key = r.get("error", "Unknown error").split('\n')[0][:50]
+                stats["errors"][error_key] = stats["errors"].get(error_key, 0) + 1
+        results_out.write("\n]\n")
+    os.replace(results_tmp, results_file)
+    os.replace(summary_tmp, summary_file)
+    stats["stages"] = stage_percentiles(stage_records)
+    logger.info(f"📄 Results saved to: {results_file}")
+    logger.info(f"📄 Summary saved to: {summary_file}")
+    return stats
+
+def log_stage_summary(stage_stats):
+    """Log wall time percentiles, share of the sample time, child CPU and bytes written of every stage."""
+    sample_total = stage_stats.get("sample", {}).get("wall_s", {}).get("total", 0.0)
+    logger.info("⏱️ Stage timings (wall p50/p90/p99/max, share of sample time, child CPU p50, written p50):")
+    for name, metrics in sorted(stage_stats.items(), key=lambda item: item[1].get("wall_s", {}).get("total", 0.0), reverse=True):
+        wall = metrics.get("wall_s")
+        if not wall:
+            continue
+        share = f"{wall['total'] / sample_total * 100:5.1f}%" if sample_total else "    -"
+        child_cpu = metrics.get("child_cpu_s", {}).get("p50", 0.0)
+        written = metrics.get("written_bytes", {}).get("p50", 0.0)
+        logger.info(
+            f"   {name:18s} {wall['p50']:7.2f}s {wall['p90']:7.2f}s {wall['p99']:7.2f}s {wall['max']:7.2f}s  {share}  "
+            f"{child_cpu:7.2f}s  {written / 1e6:7.2f} MB  ({wall['count']} samples)"
+        )
+
+def log_skipped_stages(skipped, stage_stats, total):
+    """Log the samples that skipped each stage and the time saved, estimated by the p50 wall time of the stage where it ran."""
+    saved = 0.0
+    for name, count in sorted(skipped.items()):
+        wall = stage_stats.get(SKIPPED_STAGE_SPANS.get(name), {}).get("wall_s", {})
+        estimate = count * wall.get("p50", 0.0)
+        saved += estimate
+        logger.info(f"   skipped {name:10s} in {count}/{total} samples, saved ~{format_duration(estimate)}" + ("" if wall else " (stage never ran)"))
+    sample_total = stage_stats.get("sample", {}).get("wall_s", {}).get("total", 0.0)
+    if saved and sample_total:
+        logger.info(f"   estimated compute saved by the verification policy: {format_duration(saved)} ({saved / (saved + sample_total) * 100:.1f}% of the run without it)")
+
+def run_dataset_generation(parameters, output_dir, max_workers=1, max_tasks_per_child=None, resume=True,
+                           schedule=True, calibration_journals=(), scratch_dir=None, pack=None, shard_size=1000, trace=None,
+                           policy=None):
+    """Run the dataset generation for all parameters (in parallel, per-trial isolation).
+
+    Workers are set up once by init_worker. max_tasks_per_child (Python >= 3.11) replaces a
+    worker after that many trials, to bound memory growth (None: workers live for the whole run).
+
+    Every result is appended to the fsync'd journal tg_results.jsonl as soon as its trial
+    completes. With resume (default), samples already in the journal of output_dir are skipped,
+    so a killed run continues where it stopped. The summary files and the Parquet dataset
+    tg_results.parquet (results_parquet, partitioned by pcell and shard_size samples) are rebuilt from the journal.
+
+    With schedule (default), samples are submitted longest-predicted-first (runtime_scheduler).
+    The runtime model is calibrated from the journal of output_dir and calibration_journals
+    (journals of earlier runs). Predicted and actual makespan are logged at the end.
+
+    Trial working dirs live under scratch_dir (default /dev/shm or $ATLAS_SCRATCH_DIR, see
+    scratch.scratch_root) and are removed after each trial. Curated artifacts are moved to
+    output_dir/sample_NNNN, or with pack ('tar.gz'/'tar.zst') packed into one archive per
+    shard_size samples in output_dir/artifacts.
+
+    Every result records the timings of its stages (stage_timing); their percentiles are logged
+    at the end. With trace (a path), the spans of all samples are written as a Chrome trace.
+
+    policy (dict, see robust_verification.DEFAULT_POLICY) skips the later stages of samples that
+    fail DRC or LVS, e.g. {"on_drc_fail": "skip_pex", "on_lvs_fail": "skip_pex", "drc_violation_cap": 500},
+    and can run DRC and LVS concurrently ("concurrent_drc_lvs": True).
+    """
     n_samples = len(parameters)
     logger.info(f"🚀 Starting Transmission Gate Dataset Generation for {n_samples} samples")
+    policy = resolve_policy(policy)
+    logger.info(f"Verification policy: {policy}")
 
-    # Prepare top-level dirs
+    # Prepare top-level dirs (scratch is private to this output dir)
     out_dir = Path(output_dir)
-    work_root = out_dir / "_work"
     out_dir.mkdir(exist_ok=True)
-    work_root.mkdir(exist_ok=True)
-
-    # Save parameter configuration
-    with open(out_dir / "tg_parameters.json", 'w') as f:
+    run_tag = hashlib.sha1(str(out_dir.resolve()).encode()).hexdigest()[:8]
+    work_root = scratch_root(scratch_dir) / f"atlas_{out_dir.name}_{run_tag}"
+    work_root.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Scratch dir: {work_root}" + (f", artifacts packed as {pack} ({shard_size} samples per shard)" if pack else ""))
+
+    # Save parameter configuration (sample ids index it, a resumed run must use the same one)
+    parameters_file = out_dir / "tg_parameters.json"
+    journal_path = out_dir / "tg_results.jsonl"
+    if resume and journal_path.exists() and parameters_file.exists():
+        with open(parameters_file) as f:
+            if json.load(f) != json.loads(json.dumps(parameters)):
+                raise ValueError(f"{parameters_file} differs from the parameters of this run, resume with the same parameters or pass resume=False")
+    with open(parameters_file, 'w') as f:
         json.dump(parameters, f, indent=2)
 
-    results = []
+    journal = ResultsJournal(journal_path, truncate=not resume)
+    done = journal.completed_ids()
+    pending = [(i, params) for i, params in enumerate(parameters, start=1) if i not in done]
+    if done:
+        logger.info(f"♻️ Resuming: {len(done)} samples already in {journal_path}, {len(pending)} to run")
+
+    # Longest predicted runtime first, idle workers take the next task from the shared queue
+    records = itertools.chain.from_iterable(iter_journal(path) for path in [journal_path, *calibration_journals])
+    model = RuntimeModel().fit(records, pcell=PCELL)
+    predicted = [model.predict(PCELL, params) for _, params in pending]
+    order = lpt_order(predicted) if schedule else list(range(len(pending)))
+    if pending:
+        logger.info(
+            f"🗓️ {'LPT' if schedule else 'In order'} schedule: predicted makespan "
+            f"{format_duration(simulate_makespan([predicted[k] for k in order], max_workers))} on {max_workers} workers "
+            f"(runtime model calibrated on {model.records.get(PCELL, 0)} samples)"
+        )
+
     total_start = time.time()
-    logger.info(f"📊 Processing {n_samples} transmission gate samples in parallel...")
+    logger.info(f"📊 Processing {len(pending)} transmission gate samples in parallel...")
     logger.info(f"Using {max_workers} parallel workers")
 
     futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for i, params in enumerate(parameters, start=1):
-            futures.append(executor.submit(run_single_evaluation, i, params, output_dir))
+    pool_options = {"max_workers": max_workers, "initializer": init_worker, "initargs": (work_root,)}
+    if max_tasks_per_child:
+        pool_options["max_tasks_per_child"] = max_tasks_per_child
+    with journal, ProcessPoolExecutor(**pool_options) as executor:
+        for k in order:
+            i, params = pending[k]
+            futures.append(executor.submit(run_single_evaluation, i, params, output_dir, work_root, pack, shard_size, policy))
+        position = {future: k for k, future in zip(order, futures)}
+        actual = [0.0] * len(pending)
 
         completed = 0
+        successes = 0
         for future in as_completed(futures):
             result = future.result()
-            results.append(result)
+            actual[position[future]] = result.get("execution_time", 0.0)
+            journal.append(make_json_serializable(result))
             completed += 1
+            successes += bool(result.get("success"))
 
             # Progress logging similar to your sequential version
             if completed % 10 == 0 or completed < 5:
-                success_rate = (
-                    sum(1 for r in results if r.get("success")) / len(results) * 100
-                    if results else 0.0
-                )
+                success_rate = successes / completed * 100
                 elapsed = time.time() - total_start
                 avg_time = elapsed / completed
-                eta = avg_time * (n_samples - completed)
+                eta = avg_time * (len(pending) - completed)
                 logger.info(
-                    f"📈 Progress: {completed}/{n_samples} "
-                    f"({completed/n_samples*100:.1f}%) - "
+                    f"📈 Progress: {len(done) + completed}/{n_samples} "
+                    f"({(len(done) + completed)/n_samples*100:.1f}%) - "
                     f"Success: {success_rate:.1f}% - "
                     f"Elapsed: {elapsed/60:.1f}m - ETA: {eta/60:.1f}m"
                 )
 
-    # Final summary (unchanged)
+    # Final summary, streamed from the journal (includes the samples of earlier runs)
     total_time = time.time() - total_start
-    successful = [r for r in results if r.get("success")]
-    success_rate = (len(successful) / len(results) * 100) if results else 0.0
+    shutil.rmtree(work_root, ignore_errors=True)
+    if pending:
+        report = makespan_report(predicted, actual, order, max_workers, total_time)
+        logger.info(
+            f"🗓️ Makespan: predicted {format_duration(report['predicted_makespan'])}, actual {format_duration(report['actual_makespan'])} "
+            f"(measured runtimes replayed: {format_duration(report['replayed_makespan'])} with this schedule, "
+            f"{format_duration(report['unscheduled_makespan'])} in parameter order, lower bound {format_duration(report['lower_bound'])}; "
+            f"mean runtime prediction error {report['mean_abs_error']:.1f}s)"
+        )
+    stats = summarize_journal(journal_path, out_dir)
+    try:
+        dataset = write_results_dataset(journal_path, out_dir / "tg_results.parquet", shard_size=shard_size, pcell=PCELL)
+        logger.info(f"📄 Parquet dataset saved to: {dataset}")
+    except ImportError as e:
+        logger.warning(f"Parquet dataset not written: {e}")
+    if trace:
+        logger.info(f"📄 Chrome trace saved to: {write_chrome_trace(iter_journal(journal_path), trace)}")
+    n_successful = stats["successful"]
+    success_rate = (n_successful / stats["total"] * 100) if stats["total"] else 0.0
 
     logger.info(f"\n🎉 Transmission Gate Dataset Generation Complete!")
     logger.info(f"📊 Total time: {total_time:.1f} seconds ({total_time/60:.1f} minutes)")
-    logger.info(f"📈 Success rate: {len(successful)}/{len(results)} ({success_rate:.1f}%)")
-
-    if successful:
-        drc_passes = sum(1 for r in successful if r.get("drc_pass"))
-        lvs_passes = sum(1 for r in successful if r.get("lvs_pass"))
-        pex_passes = sum(1 for r in successful if r.get("pex_status") == "PEX Complete")
-        avg_time = sum(r["execution_time"] for r in successful) / len(successful)
-        avg_area = sum(r.get("area_um2", 0) for r in successful) / len(successful)
-        avg_sym_h = sum(r.get("symmetry_horizontal", 0) for r in successful) / len(successful)
-        avg_sym_v = sum(r.get("symmetry_vertical", 0) for r in successful) / len(successful)
-
-        logger.info(f"   DRC passes: {drc_passes}/{len(successful)} ({drc_passes/len(successful)*100:.1f}%)")
-        logger.info(f"   LVS passes: {lvs_passes}/{len(successful)} ({lvs_passes/len(successful)*100:.1f}%)")
-        logger.info(f"   PEX passes: {pex_passes}/{len(successful)} ({pex_passes/len(successful)*100:.1f}%)")
-        logger.info(f"   Average time per sample: {avg_time:.1f}s")
-        logger.info(f"   Average area: {avg_area:.2f} μm²")
-        logger.info(f"   Average symmetry (H/V): {avg_sym_h:.3f}/{avg_sym_v:.3f}")
-
-    failed = [r for r in results if not r.get("success")]
-    if failed:
-        logger.info(f"\n⚠️ Failed Samples Summary ({len(failed)} total):")
-        error_counts = {}
-        for r in failed:
-            error = r.get("error", "Unknown error")
-            error_key = error.split('\n')[0][:50]
-            error_counts[error_key] = error_counts.get(error_key, 0) + 1
-        for error, count in sorted(error_counts.items(), key=lambda x: x[1], reverse=True):
+    logger.info(f"📈 Success rate: {n_successful}/{stats['total']} ({success_rate:.1f}%)")
+
+    if n_successful:
+        logger.info(f"   DRC passes: {stats['drc']}/{n_successful} ({stats['drc']/n_successful*100:.1f}%)")
+        logger.info(f"   LVS passes: {stats['lvs']}/{n_successful} ({stats['lvs']/n_successful*100:.1f}%)")
+        logger.info(f"   PEX passes: {stats['pex']}/{n_successful} ({stats['pex']/n_successful*100:.1f}%)")
+        logger.info(f"   Average time per sample: {stats['time']/n_successful:.1f}s")
+        logger.info(f"   Average area: {stats['area']/n_successful:.2f} μm²")
+        logger.info(f"   Average symmetry (H/V): {stats['sym_h']/n_successful:.3f}/{stats['sym_v']/n_successful:.3f}")
+
+    if stats["stages"]:
+        log_stage_summary(stats["stages"])
+    if stats["skipped"]:
+        log_skipped_stages(stats["skipped"], stats["stages"], stats["total"])
+
+    if stats["errors"]:
+        logger.info(f"\n⚠️ Failed Samples Summary ({stats['total'] - n_successful} total):")
+        for error, count in sorted(stats["errors"].items(), key=lambda x: x[1], reverse=True):
             logger.info(f"   {count}x: {error}")
 
-    # Persist results/summary (same as before)
-    results_file = out_dir / "tg_results.json"
-    try:
-        serializable_results = make_json_serializable(results)
-        with open(results_file, 'w') as f:
-            json.dump(serializable_results, f, indent=2)
-        logger.info(f"📄 Results saved to: {results_file}")
-    except Exception as e:
-        logger.error(f"Failed to save JSON results: {e}")
-
-    df_results = pd.DataFrame(results)
-    summary_file = out_dir / "tg_summary.csv"
-    df_results.to_csv(summary_file, index=False)
-    logger.info(f"📄 Summary saved to: {summary_file}")
-
     # Threshold as before
-    return success_rate >= 50, len(successful), len(results)
+    return success_rate >= 50, n_successful, stats["total"]
 
 import argparse
 def main():
@@ -473,6 +656,16 @@ def main():
     parser.add_argument("json_file",    type=str,                   help="Path to the JSON file containing parameters")
     parser.add_argument("--n_cores",    type=int, default=1,        help="Number of CPU cores to use") # Number of CPU cores to use, default=1
     parser.add_argument("--output_dir", type=str, default="result", help="Output directory for the generated dataset")
+    parser.add_argument("--max_tasks_per_child", type=int, default=None, help="Replace each worker process after this many samples (memory hygiene)")
+    parser.add_argument("--no_schedule", action="store_true", help="Submit samples in parameter order instead of longest-predicted-first")
+    parser.add_argument("--calibration_journals", type=str, nargs="*", default=[], help="Results journals (tg_results.jsonl) of earlier runs to calibrate the runtime model")
+    parser.add_argument("--scratch_dir", type=str, default=None, help="Root of the per-sample working dirs (default /dev/shm, or $ATLAS_SCRATCH_DIR)")
+    parser.add_argument("--pack", type=str, default=None, choices=["tar.gz", "tar.zst"], help="Pack the artifacts of each shard of samples into one archive")
+    parser.add_argument("--shard_size", type=int, default=1000, help="Samples per artifact archive with --pack")
+    parser.add_argument("--trace", type=str, default=None, help="Write the stage spans of all samples to this Chrome trace JSON (chrome://tracing, Perfetto)")
+    parser.add_argument("--policy", type=str, default=None, help='Verification policy as JSON or a JSON file, e.g. \'{"on_drc_fail": "skip_pex", "on_lvs_fail": "skip_pex", "drc_violation_cap": 500}\'')
+    parser.add_argument("--concurrent_drc_lvs", action="store_true", help="Run DRC and LVS of each sample concurrently")
+    parser.add_argument("--no_resume", action="store_true", help="Start over instead of skipping the samples already in the results journal")
     parser.add_argument("-y", "--yes", action="store_true", help="Automatic yes to prompts")
     args = parser.parse_args()
     json_file = Path(args.json_file).resolve()
@@ -485,6 +678,20 @@ def main():
     print(f"Input file: {json_file}")
     print(f"Output will be saved to: {output_dir}")
     print("="*70)
+
+    # Verification policy (validated before any sample runs)
+    try:
+        policy = {}
+        if args.policy:
+            policy_file = Path(args.policy)
+            policy = json.loads(policy_file.read_text() if policy_file.is_file() else args.policy)
+        if args.concurrent_drc_lvs:
+            policy["concurrent_drc_lvs"] = True
+        policy = resolve_policy(policy)
+    except ValueError as e:
+        print(f"❌ Error: invalid --policy: {e}")
+        return False
+    print(f"Verification policy: {policy}")
     
     # Load parameters from JSON
     # Todo: make this work with other kind of cells
@@ -526,7 +733,9 @@ def main():
     
     # Generate dataset
     print(f"\nStarting generation of {n_samples} transmission gate samples...")
-    success, passed, total = run_dataset_generation(parameters, output_dir, max_workers=n_cores)
+    success, passed, total = run_dataset_generation(parameters, output_dir, max_workers=n_cores, max_tasks_per_child=args.max_tasks_per_child, resume=not args.no_resume,
+        schedule=not args.no_schedule, calibration_journals=args.calibration_journals,
+        scratch_dir=args.scratch_dir, pack=args.pack, shard_size=args.shard_size, trace=args.trace, policy=policy)
     
     if success:
         print(f"\n🎉 Transmission gate dataset generation completed successfully!")
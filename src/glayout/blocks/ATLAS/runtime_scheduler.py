@@ -0,0 +1,142 @@
+"""
+Runtime-aware scheduling of dataset samples.
+
+A per-PCell linear model predicts the runtime of a sample from the size of its devices
+(fingers x multipliers and gate width summed over the devices). The model is calibrated
+from the execution times in results journals (results_journal.py). Samples are then
+submitted longest-predicted-first (LPT): the pool's workers take the next task from the
+shared queue whenever they are free, so the long samples do not end up in the tail.
+"""
+import heapq
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+# Rough seconds per sample before calibration (the 8h budget averages ~15 s per sample on 26 cores)
+DEFAULT_SECONDS = {
+    'fvf': 10.0,
+    'txgate': 10.0,
+    'current_mirror': 8.0,
+    'diff_pair': 8.0,
+    'lvcm': 12.0,
+    'opamp': 40.0,
+}
+# Records of a PCell needed before its fitted model replaces the default
+MIN_CALIBRATION_RECORDS = 8
+
+
+def _as_tuple(value) -> tuple:
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+def device_sizes(params: dict) -> list:
+    """(width, fingers, multipliers) of every device described by the sample parameters.
+
+    Reads width/fingers/multipliers (scalars or per-device tuples, numcols multiplies the fingers)
+    and (width, length, fingers[, multipliers]) tuples like the opamp parameters.
+    """
+    devices = list()
+    if 'width' in params:
+        widths = _as_tuple(params['width'])
+        fingers = _as_tuple(params.get('fingers', 1))
+        multipliers = _as_tuple(params.get('multipliers', 1))
+        count = max(len(widths), len(fingers), len(multipliers))
+        numcols = params.get('numcols', 1)
+        for i in range(count):
+            devices.append((
+                float(widths[min(i, len(widths) - 1)]),
+                int(fingers[min(i, len(fingers) - 1)]) * int(numcols),
+                int(multipliers[min(i, len(multipliers) - 1)]),
+            ))
+    for value in params.values():
+        if isinstance(value, (list, tuple)) and len(value) in (3, 4) and all(isinstance(v, (int, float)) for v in value):
+            if isinstance(value[2], int) and not isinstance(value[2], bool):
+                devices.append((float(value[0]), int(value[2]), int(value[3]) if len(value) == 4 else 1))
+    return devices
+
+
+def sample_features(params: dict) -> np.ndarray:
+    """[1, sum of fingers*multipliers, sum of width*fingers*multipliers] over the devices of a sample"""
+    devices = device_sizes(params)
+    return np.array([
+        1.0,
+        float(sum(f * m for _, f, m in devices)),
+        float(sum(w * f * m for w, f, m in devices)),
+    ])
+
+
+class RuntimeModel:
+    """Per-PCell least squares fit of runtime = features @ coefficients"""
+
+    def __init__(self, defaults: Optional[dict] = None):
+        self.defaults = dict(DEFAULT_SECONDS if defaults is None else defaults)
+        self.coefficients = dict()
+        self.records = dict()
+
+    def fit(self, records: Iterable[dict], pcell: str = 'txgate') -> "RuntimeModel":
+        """Calibrate from result records (dicts with parameters and execution_time).
+        args:
+        records = iterable of records, for example results_journal.iter_journal(path)
+        pcell = PCell of records without a pcell field
+        """
+        features, times = dict(), dict()
+        for record in records:
+            if 'execution_time' not in record or not isinstance(record.get('parameters'), dict):
+                continue
+            key = record.get('pcell', pcell)
+            features.setdefault(key, list()).append(sample_features(record['parameters']))
+            times.setdefault(key, list()).append(float(record['execution_time']))
+        for key in features:
+            self.records[key] = len(times[key])
+            if len(times[key]) < MIN_CALIBRATION_RECORDS:
+                continue
+            X, y = np.array(features[key]), np.array(times[key])
+            self.coefficients[key] = np.linalg.lstsq(X, y, rcond=None)[0]
+        return self
+
+    def predict(self, pcell: str, params: dict) -> float:
+        """predicted seconds of one sample (always > 0)"""
+        features = sample_features(params)
+        if pcell in self.coefficients:
+            estimate = float(features @ self.coefficients[pcell])
+        else:
+            # uncalibrated: default cost, growing with the number of device fingers
+            estimate = self.defaults.get(pcell, np.mean(list(self.defaults.values()))) * (1 + 0.05 * features[1])
+        return max(estimate, 1e-3)
+
+
+def lpt_order(predictions: Sequence[float]) -> list:
+    """indices of the samples, longest predicted runtime first"""
+    return sorted(range(len(predictions)), key=lambda i: predictions[i], reverse=True)
+
+
+def simulate_makespan(durations: Sequence[float], workers: int) -> float:
+    """makespan of running the durations in the given order on workers that each take the next task when free"""
+    finish = [0.0] * max(1, min(workers, len(durations)))
+    for duration in durations:
+        heapq.heapreplace(finish, finish[0] + duration)
+    return max(finish) if len(durations) else 0.0
+
+
+def makespan_report(predicted: Sequence[float], actual: Sequence[float], order: Sequence[int], workers: int, wall_time: float) -> dict:
+    """predicted vs actual makespan of a run.
+    args:
+    predicted = predicted seconds of every sample
+    actual = measured seconds of every sample (same indexing as predicted)
+    order = submission order (indices into predicted/actual)
+    workers = number of worker processes
+    wall_time = measured wall time of the run
+    """
+    predicted, actual = np.asarray(predicted, dtype=float), np.asarray(actual, dtype=float)
+    order = list(order)
+    return {
+        'samples': len(actual),
+        'workers': workers,
+        'predicted_makespan': simulate_makespan(predicted[order], workers),
+        'actual_makespan': wall_time,
+        # measured runtimes replayed in submission order and in parameter order (without LPT)
+        'replayed_makespan': simulate_makespan(actual[order], workers),
+        'unscheduled_makespan': simulate_makespan(actual, workers),
+        'lower_bound': max(actual.sum() / workers, actual.max()) if len(actual) else 0.0,
+        'mean_abs_error': float(np.abs(predicted - actual).mean()) if len(actual) else 0.0,
+    }
@@ -0,0 +1,131 @@
+"""
+Scratch space and artifact handling for sweep trials.
+
+Trials write their intermediate files (GDS, .ext, .sim, .nodes, SPICE) to a scratch directory,
+by default on the /dev/shm tmpfs, so they never reach the disk. Curated artifacts leave the
+scratch directory by rename (one sendfile copy across file systems), or are packed into one
+archive per shard of samples instead of a directory of small files per sample.
+
+A shard archive is a plain tar with one compressed member per sample (sample_NNNN.tar.gz or
+sample_NNNN.tar.zst, holding the files of the sample). Members are appended under a file lock,
+so workers share shards; a member torn by a killed writer is dropped by the next append.
+A sample that is run again (resumed after a kill) appends a new member, readers take the last one.
+"""
+import errno
+import fcntl
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+# overrides the default scratch root
+SCRATCH_ENV = "ATLAS_SCRATCH_DIR"
+TMPFS_ROOTS = ("/dev/shm",)
+PACK_FORMATS = ("tar.gz", "tar.zst")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("tar.zst packing requires the zstandard package, install it with `pip install zstandard`") from e
+    return zstandard
+
+
+def scratch_root(preferred: Optional[Union[str, Path]] = None, min_free_bytes: int = 1 << 30) -> Path:
+    """Root of the trial scratch dirs: preferred, $ATLAS_SCRATCH_DIR, a tmpfs with min_free_bytes free, or the system temp dir."""
+    for candidate in (preferred, os.environ.get(SCRATCH_ENV)):
+        if candidate:
+            return Path(candidate)
+    for root in TMPFS_ROOTS:
+        if os.path.isdir(root) and os.access(root, os.W_OK) and shutil.disk_usage(root).free >= min_free_bytes:
+            return Path(root)
+    return Path(tempfile.gettempdir())
+
+
+def use_scratch_for_tempfiles(root: Union[str, Path]) -> None:
+    """Create the temporary files of this process (e.g. the DRC/LVS temp dirs of the PDK) under root."""
+    Path(root).mkdir(parents=True, exist_ok=True)
+    tempfile.tempdir = str(root)
+
+
+def move_artifacts(paths: Iterable[Union[str, Path]], dest_dir: Union[str, Path]) -> list:
+    """Move the existing files of paths into dest_dir (rename, or one copy and unlink across file systems).
+    Returns the destination paths."""
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    moved = list()
+    for path in map(Path, paths):
+        if not path.exists():
+            continue
+        dest = dest_dir / path.name
+        try:
+            os.replace(path, dest)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.copyfile(path, dest)
+            os.remove(path)
+        moved.append(dest)
+    return moved
+
+
+def _complete_size(f) -> int:
+    """size of the complete members at the start of an open shard archive"""
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    end = 0
+    try:
+        with tarfile.open(fileobj=f, mode="r:") as tar:
+            for member in tar:
+                member_end = member.offset_data + member.size + (-member.size % tarfile.BLOCKSIZE)
+                if member_end > size:
+                    break
+                end = member_end
+    except tarfile.ReadError:
+        pass
+    return end
+
+
+def _pack_sample(paths: list, arcdir: str, pack: str) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz" if pack == "tar.gz" else "w") as tar:
+        for path in paths:
+            tar.add(path, arcname=f"{arcdir}/{path.name}")
+    if pack == "tar.zst":
+        return _zstandard().ZstdCompressor(level=10).compress(buffer.getvalue())
+    return buffer.getvalue()
+
+
+def pack_artifacts(paths: Iterable[Union[str, Path]], archive_dir: Union[str, Path], sample_id: int, shard_size: int = 1000, pack: str = "tar.gz") -> tuple:
+    """Append the existing files of paths as one compressed member to the shard archive of sample_id.
+    args:
+    paths = files of the sample (removed once they are in the archive)
+    archive_dir = directory of the shard archives (shard_NNNNN.tar, shard k holds samples k*shard_size .. (k+1)*shard_size-1)
+    pack = compression of the member, tar.gz or tar.zst (requires zstandard)
+    returns (shard path, member name)
+    """
+    if pack not in PACK_FORMATS:
+        raise ValueError(f"pack must be one of {PACK_FORMATS}, not {pack!r}")
+    paths = [path for path in map(Path, paths) if path.exists()]
+    name = f"sample_{sample_id:04d}"
+    blob = _pack_sample(paths, name, pack)
+    info = tarfile.TarInfo(f"{name}.{pack}")
+    info.size = len(blob)
+    info.mtime = int(time.time())
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    shard = archive_dir / f"shard_{sample_id // shard_size:05d}.tar"
+    with open(shard, "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.truncate(_complete_size(f))
+        f.write(info.tobuf(tarfile.GNU_FORMAT) + blob + b"\0" * (-len(blob) % tarfile.BLOCKSIZE))
+        f.flush()
+        os.fsync(f.fileno())
+    for path in paths:
+        os.remove(path)
+    return shard, info.name
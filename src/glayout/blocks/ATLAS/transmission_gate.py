@@ -4,7 +4,7 @@ from gdsfactory.cell import cell
 from gdsfactory.component import Component
 from gdsfactory import Component
 from glayout.flow.primitives.fet import nmos, pmos, multiplier
-from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, movex, movey
+from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, align_many, movex, movey
 from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid
 from glayout.flow.pdk.util.port_utils import rename_ports_by_orientation
 from glayout.flow.routing.straight_route import straight_route
@@ -62,10 +62,9 @@ def add_tg_labels(tg_in: Component,
     move_info.append((vgnlabel,tg_in.ports["N_multiplier_0_gate_E"], None))
 
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        tg_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    tg_in.add(align_many(comps, prts, alignments))
     return tg_in.flatten() 
 
 
@@ -79,6 +78,12 @@ def get_component_netlist(component) -> Netlist:
                 # It's a string representation, try to reconstruct
                 # For gymnasium compatibility, we don't store netlist_data, so create a simple netlist
                 return Netlist(source_netlist=netlist_obj)
+            elif isinstance(netlist_obj, dict):
+                # Serialized with Netlist.to_dict (e.g. info read back from json)
+                return Netlist.from_dict(netlist_obj)
+            elif isinstance(netlist_obj, bytes):
+                # Compact form from Netlist.to_bytes
+                return Netlist.from_bytes(netlist_obj)
             else:
                 # It's already a Netlist object
                 return netlist_obj
@@ -6,7 +6,7 @@ sys.path.append(path.join(path.dirname(__file__), '../../'))
 
 from gdsfactory.read.import_gds import import_gds
 from gdsfactory.components import text_freetype, rectangle
-from glayout.flow.pdk.util.comp_utils import prec_array, movey, align_comp_to_port, prec_ref_center
+from glayout.flow.pdk.util.comp_utils import prec_array, movey, align_comp_to_port, align_many, prec_ref_center
 from glayout.flow.pdk.util.port_utils import add_ports_perimeter, print_ports
 from gdsfactory.component import Component
 from glayout.flow.pdk.mappedpdk import MappedPDK
@@ -165,10 +165,9 @@ def sky130_add_ota_labels(ota_in: Component) -> Component:
     move_info.append((m_inputlabel,ota_in.ports["MINUS_top_met_N"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        ota_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    ota_in.add(align_many(comps, prts, alignments))
     return ota_in.flatten() 
 
 
@@ -5,7 +5,7 @@ from gdsfactory.cell import cell
 from gdsfactory.component import Component
 from gdsfactory import Component
 from glayout.primitives.fet import nmos, pmos, multiplier
-from glayout.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port
+from glayout.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port, align_many
 from glayout.util.snap_to_grid import component_snap_to_grid
 from glayout.util.port_utils import rename_ports_by_orientation
 from glayout.primitives.guardring import tapring
@@ -55,10 +55,9 @@ def sky130_add_fvf_labels(fvf_in: Component) -> Component:
     move_info.append((inputlabel,fvf_in.ports["A_multiplier_0_gate_N"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        fvf_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    fvf_in.add(align_many(comps, prts, alignments))
     return fvf_in.flatten() 
 
 @cell
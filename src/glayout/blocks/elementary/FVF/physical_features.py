@@ -5,7 +5,10 @@ import subprocess
 import shutil
 from pathlib import Path
 from gdsfactory.typings import Component
+from glayout.spice import parse_spice_file
 from gdsfactory.geometry.boolean import boolean
+from glayout.util.raster_symmetry import raster_symmetry_scores
+from glayout.util.stage_timing import stage
 
 def calculate_area(component: Component) -> float:
     """Calculates the area of a gdsfactory Component."""
@@ -29,8 +32,13 @@ def _mirror_and_xor(component: Component, axis: str) -> float:
     asymmetry_layout = boolean(A=comp_copy, B=mirrored_ref, operation="xor")
     return float(asymmetry_layout.area())
 
-def calculate_symmetry_scores(component: Component) -> tuple[float, float]:
-    """Calculates horizontal and vertical symmetry scores (1.0 = perfect symmetry)."""
+def calculate_symmetry_scores(component: Component, method: str = "raster", resolution: float = 0.01) -> tuple[float, float]:
+    """Calculates horizontal and vertical symmetry scores (1.0 = perfect symmetry).
+    method "raster" rasterizes the layout (exact for rectilinear layouts, see raster_symmetry_scores),
+    "exact" XORs the component with its mirror images using gdsfactory boolean."""
+    if method == "raster":
+        scores = raster_symmetry_scores(component, resolution=resolution, by_layer=False)
+        return scores["horizontal"], scores["vertical"]
     original_area = calculate_area(component)
     if original_area == 0:
         return (1.0, 1.0)
@@ -42,70 +50,65 @@ def calculate_symmetry_scores(component: Component) -> tuple[float, float]:
     symmetry_score_vertical = 1.0 - (asymmetry_y_area / original_area)
     return symmetry_score_horizontal, symmetry_score_vertical
 
+def calculate_layer_symmetry_scores(component: Component, resolution: float = 0.01) -> dict:
+    """Raster symmetry scores of the whole layout and of every layer ("layer/datatype" keys), with error bounds."""
+    scores = raster_symmetry_scores(component, resolution=resolution)
+    scores["layers"] = {f"{layer}/{datatype}": layer_scores for (layer, datatype), layer_scores in scores["layers"].items()}
+    return scores
+
 def _parse_simple_parasitics(component_name: str) -> tuple[float, float]:
     """Parses total parasitic R and C from a SPICE file by simple summation."""
-    total_resistance = 0.0
-    total_capacitance = 0.0
     spice_file_path = f"{component_name}_pex.spice"
     if not os.path.exists(spice_file_path):
         return 0.0, 0.0
-    with open(spice_file_path, 'r') as f:
-        for line in f:
-            line = line.strip().upper()
-            parts = line.split()
-            if not parts: continue
-            
-            name = parts[0]
-            if name.startswith('R') and len(parts) >= 4:
-                try: total_resistance += float(parts[3])
-                except (ValueError): continue
-            elif name.startswith('C') and len(parts) >= 4:
-                try:
-                    cap_str = parts[3]
-                    unit = cap_str[-1]
-                    val_str = cap_str[:-1]
-                    if unit == 'F': cap_value = float(val_str) * 1e-15
-                    elif unit == 'P': cap_value = float(val_str) * 1e-12
-                    elif unit == 'N': cap_value = float(val_str) * 1e-9
-                    elif unit == 'U': cap_value = float(val_str) * 1e-6
-                    else: cap_value = float(cap_str)
-                    total_capacitance += cap_value
-                except (ValueError): continue
+    # streaming parser: handles continuation lines and SI suffixes (e.g. 1.5fF, 2k)
+    parsed = parse_spice_file(spice_file_path)
+    total_resistance = sum(network.total_resistance() for network in parsed.rc_networks.values())
+    total_capacitance = sum(network.total_capacitance() for network in parsed.rc_networks.values())
     return total_resistance, total_capacitance
 
-def run_physical_feature_extraction(layout_path: str, component_name: str, top_level: Component) -> dict:
+def run_physical_feature_extraction(layout_path: str, component_name: str, top_level: Component, run_pex: bool = True, run_geometry: bool = True) -> dict:
     """
     Runs PEX and calculates geometric features, returning a structured result.
+    run_pex / run_geometry = False leaves that part "not run" (e.g. PEX already ran in verification).
     """
     physical_results = {
         "pex": {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0},
-        "geometric": {"raw_area_um2": 0.0, "symmetry_score_horizontal": 0.0, "symmetry_score_vertical": 0.0}
+        "geometric": {"raw_area_um2": 0.0, "symmetry_score_horizontal": 0.0, "symmetry_score_vertical": 0.0,
+                      "symmetry_error_bound": 0.0, "symmetry_by_layer": {}}
     }
     
     # PEX and Parasitics
-    try:
-        pex_spice_path = f"{component_name}_pex.spice"
-        if os.path.exists(pex_spice_path):
-            os.remove(pex_spice_path)
-        subprocess.run(["./run_pex.sh", layout_path, component_name], check=True, capture_output=True, text=True)
-        physical_results["pex"]["status"] = "PEX Complete"
-        total_res, total_cap = _parse_simple_parasitics(component_name)
-        physical_results["pex"]["total_resistance_ohms"] = total_res
-        physical_results["pex"]["total_capacitance_farads"] = total_cap
-    except subprocess.CalledProcessError as e:
-        physical_results["pex"]["status"] = f"PEX Error: {e.stderr}"
-    except FileNotFoundError:
-        physical_results["pex"]["status"] = "PEX Error: run_pex.sh not found."
-    except Exception as e:
-        physical_results["pex"]["status"] = f"PEX Unexpected Error: {e}"
+    if run_pex:
+        try:
+            pex_spice_path = f"{component_name}_pex.spice"
+            if os.path.exists(pex_spice_path):
+                os.remove(pex_spice_path)
+            with stage("features_pex"):
+                subprocess.run(["./run_pex.sh", layout_path, component_name], check=True, capture_output=True, text=True)
+            physical_results["pex"]["status"] = "PEX Complete"
+            total_res, total_cap = _parse_simple_parasitics(component_name)
+            physical_results["pex"]["total_resistance_ohms"] = total_res
+            physical_results["pex"]["total_capacitance_farads"] = total_cap
+        except subprocess.CalledProcessError as e:
+            physical_results["pex"]["status"] = f"PEX Error: {e.stderr}"
+        except FileNotFoundError:
+            physical_results["pex"]["status"] = "PEX Error: run_pex.sh not found."
+        except Exception as e:
+            physical_results["pex"]["status"] = f"PEX Unexpected Error: {e}"
         
     # Geometric Features
-    try:
-        physical_results["geometric"]["raw_area_um2"] = calculate_area(top_level)
-        sym_h, sym_v = calculate_symmetry_scores(top_level)
-        physical_results["geometric"]["symmetry_score_horizontal"] = sym_h
-        physical_results["geometric"]["symmetry_score_vertical"] = sym_v
-    except Exception as e:
-        print(f"Warning: Could not calculate geometric features. Error: {e}")
+    if run_geometry:
+        try:
+            with stage("area"):
+                physical_results["geometric"]["raw_area_um2"] = calculate_area(top_level)
+            with stage("symmetry"):
+                symmetry = calculate_layer_symmetry_scores(top_level)
+            physical_results["geometric"]["symmetry_score_horizontal"] = symmetry["horizontal"]
+            physical_results["geometric"]["symmetry_score_vertical"] = symmetry["vertical"]
+            physical_results["geometric"]["symmetry_error_bound"] = symmetry["error_bound"]
+            physical_results["geometric"]["symmetry_by_layer"] = symmetry["layers"]
+        except Exception as e:
+            print(f"Warning: Could not calculate geometric features. Error: {e}")
 
     return physical_results
\ No newline at end of file
@@ -8,7 +8,7 @@ from glayout.primitives.guardring import tapring
 from glayout.util.port_utils import add_ports_perimeter,rename_ports_by_orientation
 from gdsfactory.component import Component
 from gdsfactory.cell import cell
-from glayout.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port
+from glayout.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port, align_many
 from typing import Optional, Union 
 from glayout.primitives.via_gen import via_stack
 from gdsfactory.components import text_freetype, rectangle
@@ -52,10 +52,9 @@ def sky130_add_cm_labels(cm_in: Component) -> Component:
     move_info.append((vblabel,cm_in.ports["welltie_S_top_met_S"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        cm_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    cm_in.add(align_many(comps, prts, alignments))
     return cm_in.flatten() 
 
 def current_mirror_netlist(
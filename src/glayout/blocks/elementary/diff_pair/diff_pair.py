@@ -9,7 +9,7 @@ from gdsfactory.components.rectangle import rectangle
 from gdsfactory.routing.route_quad import route_quad
 from gdsfactory.routing.route_sharp import route_sharp
 from glayout.pdk.mappedpdk import MappedPDK
-from glayout.util.comp_utils import align_comp_to_port, evaluate_bbox, movex, movey
+from glayout.util.comp_utils import align_comp_to_port, align_many, evaluate_bbox, movex, movey
 from glayout.util.port_utils import (
     add_ports_perimeter,
     get_orientation,
@@ -77,10 +77,9 @@ def sky130_add_df_labels(df_in: Component) -> Component:
     move_info.append((vnlabel,df_in.ports["bl_multiplier_0_gate_S"], None))
 
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        df_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    df_in.add(align_many(comps, prts, alignments))
     return df_in.flatten() 
 
 def diff_pair_netlist(fetL: Component, fetR: Component) -> Netlist:
@@ -3,7 +3,7 @@ from gdsfactory.cell import cell
 from gdsfactory.component import Component
 from gdsfactory import Component
 from glayout.primitives.fet import nmos, pmos, multiplier
-from glayout.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, movex, movey
+from glayout.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, align_many, movex, movey
 from glayout.util.snap_to_grid import component_snap_to_grid
 from glayout.util.port_utils import rename_ports_by_orientation
 from glayout.routing.straight_route import straight_route
@@ -60,10 +60,9 @@ def add_tg_labels(tg_in: Component,
     move_info.append((vgnlabel,tg_in.ports["N_multiplier_0_gate_E"], None))
 
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        tg_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    tg_in.add(align_many(comps, prts, alignments))
     return tg_in.flatten() 
 
 
@@ -131,10 +130,9 @@ def sky130_add_tg_labels(tg_in: Component) -> Component:
     move_info.append((vgnlabel,tg_in.ports["N_multiplier_0_gate_E"], None))
 
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        tg_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    tg_in.add(align_many(comps, prts, alignments))
     return tg_in.flatten() 
 
 
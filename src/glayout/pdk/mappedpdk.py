@@ -15,6 +15,15 @@ from pydantic import validate_arguments
 import xml.etree.ElementTree as ET
 import pathlib, shutil, os, sys
 
+from ..util.stage_timing import stage
+
+def _link_or_copy(src: PathType, dest: PathType) -> None:
+    """hardlinks src to dest (tool inputs that are only read), copies across file systems"""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy(src, dest)
+
 class SetupPDKFiles:
     """Class to setup the PDK files required for DRC and LVS checks.
     """
@@ -541,7 +550,7 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
             if isinstance(layout, Component):
                 layout.write_gds(gds_path)
             elif isinstance(layout, PathType):            
-                shutil.copy(layout, gds_path)
+                _link_or_copy(layout, gds_path)
             
             magicrc_file = self.pdk_files['magic_drc_file'] if magic_drc_file is None else magic_drc_file
             magic_cmd_file = create_magic_commands_file(temp_dir_path)
@@ -590,8 +599,8 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                 if not path_to_dir.exists():
                     path_to_dir.mkdir(parents=True, exist_ok=False)
                 new_output_file_path = path_to_dir / Path(report_path).name
-                # Overwrite the report file if it exists
-                shutil.copy(report_path, new_output_file_path)
+                # Overwrite the report file if it exists (moved, the temp dir is deleted next)
+                shutil.move(report_path, new_output_file_path)
                 # if not new_output_file_path.exists():
                 #     shutil.copy(report_path, path_to_dir / output_file)
                 # else: 
@@ -775,7 +784,7 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                             f.write(netlist)
                             
             elif isinstance(layout, PathType):            
-                shutil.copy(layout, str(gds_path))
+                _link_or_copy(layout, str(gds_path))
                 if netlist is None:
                     raise ValueError("Path to cdl (netlist) must be provided if only gds file is provided! Provide Component alternatively!")
                 else:
@@ -849,12 +858,13 @@ exit
                 
                 magicrc_file = self.pdk_files['magic_drc_file'] if magic_drc_file is None else magic_drc_file
                 magic_cmd = f"bash -c 'magic -rcfile {magicrc_file} -noconsole -dnull < {magic_script_path}'",
-                magic_subproc = subprocess.run(
-                    magic_cmd, 
-                    shell=True,
-                    check=True,
-                    capture_output=True
-                )
+                with stage("lvs_extraction"):
+                    magic_subproc = subprocess.run(
+                        magic_cmd, 
+                        shell=True,
+                        check=True,
+                        capture_output=True
+                    )
                 
                 magic_subproc_code = magic_subproc.returncode
                 magic_subproc_out = magic_subproc.stdout.decode('utf-8')
@@ -876,12 +886,13 @@ exit
                 lvssetup_file = self.pdk_files['lvs_setup_tcl_file'] if lvs_setup_tcl_file is None else lvs_setup_tcl_file 
                 netgen_command = f'netgen -batch lvs "{str(lvsmag_path)} {design_name}" "{str(spice_path)} {design_name}" {lvssetup_file} {str(report_path)}'
                 print(f"Running netgen command: {netgen_command.strip()}")
-                netgen_subproc = subprocess.run(
-                    netgen_command,
-                    shell=True,
-                    check=True, 
-                    capture_output=True
-                )
+                with stage("netgen"):
+                    netgen_subproc = subprocess.run(
+                        netgen_command,
+                        shell=True,
+                        check=True, 
+                        capture_output=True
+                    )
                 netgen_subproc_code = netgen_subproc.returncode
                 netgen_subproc_out = netgen_subproc.stdout.decode('utf-8')
                 print(netgen_subproc_out)
@@ -922,8 +933,8 @@ exit
                         path_to_dir.mkdir(parents=True, exist_ok=False)
                     #new_output_file_path = path_to_dir / output_file_path
                     new_output_file_path = path_to_dir / Path(report_path).name
-                    # Overwrite the report file if it exists
-                    shutil.copy(report_path, new_output_file_path)
+                    # Overwrite the report file if it exists (moved, the temp dir is deleted next)
+                    shutil.move(report_path, new_output_file_path)
                     # if not new_output_file_path.exists():
                     #     shutil.copy(report_path, path_to_dir / output_file_path)
                     # else: 
@@ -933,10 +944,10 @@ exit
                         lvsmag_dest = path_to_dir / f"{design_name}_lvsmag.spice"
                         sim_dest    = path_to_dir / f"{design_name}_sim.spice"
                         pex_dest    = path_to_dir / f"{design_name}_pex.spice"
-                        shutil.copy(lvsmag_path, lvsmag_dest)
-                        shutil.copy(sim_path, sim_dest)
-                        shutil.copy(pex_path, pex_dest)
-                        print(f"Copied intermediate files to {path_to_dir}")
+                        shutil.move(lvsmag_path, lvsmag_dest)
+                        shutil.move(sim_path, sim_dest)
+                        shutil.move(pex_path, pex_dest)
+                        print(f"Moved intermediate files to {path_to_dir}")
                         # shutil.copy(lvsmag_path, str(Path.cwd() / f"{design_name}_lvsmag.spice"))  
                         # shutil.copy(sim_path, str(Path.cwd() / f"{design_name}_sim.spice"))
             
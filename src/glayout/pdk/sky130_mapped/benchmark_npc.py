@@ -0,0 +1,86 @@
+"""
+Benchmark for the sky130 npc decorator.
+
+Builds a many-finger multiplier (and an nmos) with the decorator disabled, then times
+sky130_add_npc on copies of it: cold (empty npc cache) and cached (same cell generated again).
+The npc region is checked against a brute force reference (all pairs of licons compared).
+
+usage: python benchmark_npc.py [--fingers 64] [--repeats 5]
+"""
+import argparse
+import time
+
+import gdstk
+import numpy as np
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk as pdk
+from glayout.pdk.sky130_mapped import sky130_add_npc as npc_module
+from glayout.primitives.fet import multiplier, nmos
+
+
+def reference_npc(comp) -> list:
+    """npc region computed by comparing every pair of licon over poly (n^2)"""
+    licons = gdstk.boolean(
+        [gdstk.Polygon(points) for points in comp.get_polygons(by_spec=(66,44))],
+        [gdstk.Polygon(points) for points in comp.get_polygons(by_spec=(66,20))],
+        "and",
+    )
+    pad = npc_module.NPC_LICON_ENCLOSURE
+    boxes = np.array([(*polygon.bounding_box()[0], *polygon.bounding_box()[1]) for polygon in licons]) + np.array([-pad, -pad, pad, pad])
+    centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+    close = (np.abs(centers[:, None, :] - centers[None, :, :]) < npc_module.NPC_MERGE_DISTANCE - 1e-6).all(axis=2)
+    first, second = np.nonzero(np.triu(close, k=1))
+    pairs = np.concatenate((np.minimum(boxes[first, :2], boxes[second, :2]), np.maximum(boxes[first, 2:], boxes[second, 2:])), axis=1)
+    return [gdstk.rectangle(box[:2], box[2:]) for box in np.concatenate((boxes, pairs))]
+
+
+def check(comp) -> float:
+    """area of the difference between the npc of comp and the brute force reference"""
+    npc = [gdstk.Polygon(points) for points in comp.get_polygons(by_spec=(95,20))]
+    reference = reference_npc(comp)
+    return sum(polygon.area() for polygon in gdstk.boolean(npc, reference, "xor"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time the sky130 npc decorator on many-finger devices")
+    parser.add_argument("--fingers", type=int, default=64, help="number of fingers of the devices")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs of each case")
+    args = parser.parse_args()
+
+    decorator = pdk.default_decorator
+    pdk.default_decorator = None
+    pdk.activate()
+    try:
+        devices = {
+            f"multiplier {args.fingers} fingers": multiplier(pdk, "n+s/d", width=2, fingers=args.fingers),
+            f"nmos {args.fingers // 4} fingers x 4": nmos(pdk, width=2, fingers=args.fingers // 4, multipliers=4),
+        }
+    finally:
+        pdk.default_decorator = decorator
+        pdk.activate()
+
+    for name, device in devices.items():
+        licons = len(device.get_polygons(by_spec=(66,44)))
+        cold, cached = list(), list()
+        for _ in range(args.repeats):
+            npc_module._npc_cache.clear()
+            work = device.copy()
+            start = time.perf_counter()
+            npc_module.sky130_add_npc(work)
+            cold.append(time.perf_counter() - start)
+            # same name and geometry, like the same cell generated again after clear_cache
+            name_of_cell = work.name
+            work = device.copy()
+            work.name = name_of_cell
+            start = time.perf_counter()
+            npc_module.sky130_add_npc(work)
+            cached.append(time.perf_counter() - start)
+        print(
+            f"{name}: {licons} licons, {len(work.get_polygons(by_spec=(95,20)))} npc polygons,"
+            f" cold {1e3 * np.median(cold):.2f} ms, cached {1e3 * np.median(cached):.2f} ms,"
+            f" difference from brute force {check(work):.6f} um^2"
+        )
+
+
+if __name__ == "__main__":
+    main()
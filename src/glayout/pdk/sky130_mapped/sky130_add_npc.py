@@ -1,64 +1,83 @@
+from collections import OrderedDict
+
 from gdsfactory.component import Component
-from gdsfactory.polygon import Polygon
-from gdsfactory.geometry.boolean import boolean
+import gdstk
+import numpy as np
+from glayout.util.spatial_index import _DBU_PER_UM, _to_dbu_boxes
+
+# npc extends this far past every licon over poly
+NPC_LICON_ENCLOSURE = 0.1
+# npc of licons with centers closer than this (in x and y) are merged: 0.27+0.37
+NPC_MERGE_DISTANCE = 0.64
+
+# merged npc polygons of decorated cells, keyed by cell name and a geometry fingerprint
+# (gdsfactory cell names encode the generator arguments, so this survives clear_cache between sweep samples)
+_NPC_CACHE_SIZE = 512
+_npc_cache: OrderedDict = OrderedDict()
+
+
+def __fingerprint(comp: Component) -> tuple:
+	# gdsfactory adds $<n> to repeated names
+	return (comp.name.split("$")[0], len(comp.polygons), len(comp.references), np.asarray(comp.bbox).round(6).tobytes())
+
+
+def __merge_boxes(npc_boxes: np.ndarray) -> np.ndarray:
+	"""returns the bboxes of all pairs of npc boxes with centers closer than NPC_MERGE_DISTANCE in x and y
+	pairs are found with a sweep over the boxes sorted by x center (only boxes inside the x window are compared)"""
+	max_center_dist2x = 2 * round(NPC_MERGE_DISTANCE * _DBU_PER_UM)
+	centers2x = npc_boxes[:, :2] + npc_boxes[:, 2:]
+	order = np.argsort(centers2x[:, 0], kind="stable")
+	sorted_x = centers2x[order, 0]
+	# boxes k+1 .. end[k]-1 (in x order) are inside the x window of box k
+	end = np.searchsorted(sorted_x, sorted_x + max_center_dist2x, side="left")
+	counts = end - np.arange(len(order)) - 1
+	first = np.repeat(np.arange(len(order)), counts)
+	second = first + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+	first, second = order[first], order[second]
+	close = np.abs(centers2x[first, 1] - centers2x[second, 1]) < max_center_dist2x
+	first, second = first[close], second[close]
+	return np.concatenate((
+		np.minimum(npc_boxes[first, :2], npc_boxes[second, :2]),
+		np.maximum(npc_boxes[first, 2:], npc_boxes[second, 2:]),
+	), axis=1)
+
+
+def __npc_polygons(comp: Component) -> list:
+	"""returns the merged npc polygons (arrays of points in um) covering the licons over poly of comp"""
+	licon_polygons = comp.get_polygons(by_spec=(66,44))
+	poly_polygons = comp.get_polygons(by_spec=(66,20))
+	if len(licon_polygons) < 2 and len(poly_polygons) < 2:
+		return list()
+	# licon over poly and not already covered by npc (of the sub cells)
+	licon_and_poly = gdstk.boolean([gdstk.Polygon(points) for points in licon_polygons], [gdstk.Polygon(points) for points in poly_polygons], "and")
+	existing_npc = comp.get_polygons(by_spec=(95,20))
+	if len(existing_npc) > 1:
+		licon_and_poly = gdstk.boolean(licon_and_poly, [gdstk.Polygon(points) for points in existing_npc], "not")
+	if len(licon_and_poly) == 0:
+		return list()
+	# pad every licon, add a box over each pair of close licons, then union everything at once
+	padding = round(NPC_LICON_ENCLOSURE * _DBU_PER_UM)
+	npc_boxes = _to_dbu_boxes([polygon.points for polygon in licon_and_poly]) + np.array([-padding, -padding, padding, padding])
+	boxes = np.concatenate((npc_boxes, __merge_boxes(npc_boxes))) / _DBU_PER_UM
+	rectangles = [gdstk.rectangle((xmin, ymin), (xmax, ymax)) for xmin, ymin, xmax, ymax in boxes.tolist()]
+	return [polygon.points for polygon in gdstk.boolean(rectangles, [], "or")]
 
 
 def sky130_add_npc(comp: Component) -> Component:
 	"""To keep with the generic generator structure,
 	we do NOT add nitride poly cut layer in the generic generators (npc is specfic to sky130).
-	Because it is easy to add idenpedently, 
+	Because it is easy to add idenpedently,
 	we implement this as a function wrapper to correctly lay npc
 	returns the modified component"""
-	# extract licon polygons which are over poly (using booleans)
-	licon_comp = comp.extract(layers=[(66,44)])
-	poly_comp = comp.extract(layers=[(66,20)])
-	existing_npc = comp.extract(layers=[(95,20)])
-	# TODO: see about an implemtation using gdsfactory component metadata
-	if len(licon_comp.get_polygons()) < 2 and len(poly_comp.get_polygons()) < 2:
-		return comp
-	liconANDpoly = boolean(licon_comp, poly_comp, layer=(1,2), operation="and")
-	if len(existing_npc.get_polygons()) > 1:
-		liconANDpoly = boolean(liconANDpoly, existing_npc, layer=(1,2), operation="A-B")
-	licon_polygons = liconANDpoly.get_polygons(as_array=False)
-	# iterate through all licon and create npc (ignore merges for now)
-	npc_polygons = list()
-	for licon_polygon in licon_polygons:
-		bbox = licon_polygon.bounding_box()
-		licon_polygonxmin = bbox[0][0]
-		licon_polygonymin = bbox[0][1]
-		licon_polygonxmax = bbox[1][0]
-		licon_polygonymax = bbox[1][1]
-		padding_points = [
-			[licon_polygonxmin - 0.1, licon_polygonymin - 0.1],
-			[licon_polygonxmax + 0.1, licon_polygonymin - 0.1],
-			[licon_polygonxmax + 0.1, licon_polygonymax + 0.1],
-			[licon_polygonxmin - 0.1, licon_polygonymax + 0.1],
-		]
-		npc_polygons.append(Polygon(padding_points, layer=(95,20)))
-	# determine which npc polygons should be merged 
-	# also merge them by adding a polygon over them 
-	# naive approach, n^2 complexity
-	npc_merged_polygons = list()
-	for i, npc_polygon in enumerate(npc_polygons):
-		for j, other_polygon in enumerate(npc_polygons):
-			# use the fact that all npc polys have the same width (at this point)
-			yviolation = abs(npc_polygon.center[1] - other_polygon.center[1]) < 0.64#0.27+0.37
-			xviolation = abs(npc_polygon.center[0] - other_polygon.center[0]) < 0.64
-			if i==j:#skip same polygon
-				continue
-			elif (xviolation and yviolation):
-				nxmax = max(npc_polygon.xmax, other_polygon.xmax)
-				nxmin = min(npc_polygon.xmin, other_polygon.xmin)
-				nymax = max(npc_polygon.ymax, other_polygon.ymax)
-				nymin = min(npc_polygon.ymin, other_polygon.ymin)
-				points = [
-					[nxmin,nymin],
-					[nxmax,nymin],
-					[nxmax,nymax],
-					[nxmin,nymax],
-				]
-				npc_merged_polygons.append(Polygon(points=points,layer=(95,20)))
-	# add npc and return
-	npc_polygons_to_add = npc_polygons + npc_merged_polygons
-	comp.add(npc_polygons_to_add)
+	key = __fingerprint(comp)
+	npc_polygons = _npc_cache.get(key)
+	if npc_polygons is None:
+		npc_polygons = __npc_polygons(comp)
+		_npc_cache[key] = npc_polygons
+		if len(_npc_cache) > _NPC_CACHE_SIZE:
+			_npc_cache.popitem(last=False)
+	else:
+		_npc_cache.move_to_end(key)
+	for points in npc_polygons:
+		comp.add_polygon(points, layer=(95,20))
 	return comp
@@ -3,12 +3,20 @@ Glayout Placement module for interdigitized and centroid placement of basic circ
 """
 
 from .common_centroid_ab_ba import common_centroid_ab_ba
+from .common_centroid import common_centroid_pattern, pattern_metrics, score_patterns, pattern_to_string
+from .floorplan import floorplan, place_floorplan
 from .four_transistor_interdigitized import generic_4T_interdigitzed
 from .two_transistor_interdigitized import two_nfet_interdigitized,two_pfet_interdigitized,two_transistor_interdigitized
 from .two_transistor_place import two_transistor_place
 
 __all__ = [
     'common_centroid_ab_ba',
+    'common_centroid_pattern',
+    'pattern_metrics',
+    'score_patterns',
+    'pattern_to_string',
+    'floorplan',
+    'place_floorplan',
     'generic_4T_interdigitzed',
     'two_nfet_interdigitized',
     'two_pfet_interdigitized',
@@ -0,0 +1,51 @@
+"""
+Benchmark for the common centroid pattern search.
+
+Scores batches of random candidate patterns (candidates per second) and runs the
+pattern search (exhaustive or annealing) on a few device/unit configurations.
+
+usage: python benchmark_common_centroid.py [--candidates 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from glayout.placement.common_centroid import common_centroid_pattern, count_patterns, pattern_metrics, pattern_to_string, score_patterns
+
+# (units of each device, rows)
+CONFIGS = [
+    ([2, 2], 2),
+    ([4, 4], 2),
+    ([2, 4, 2], 2),
+    ([8, 8], 2),
+    ([4, 4, 4, 4], 4),
+    ([6, 6, 12], 4),
+    ([8, 8, 8, 8], 4),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time common centroid pattern scoring and search")
+    parser.add_argument("--candidates", type=int, default=100000, help="number of random patterns to score per configuration")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for units, rows in CONFIGS:
+        cols = sum(units) // rows
+        base = np.repeat(np.arange(len(units)), units)
+        candidates = rng.permuted(np.tile(base, (args.candidates, 1)), axis=1).reshape(-1, rows, cols)
+        start = time.perf_counter()
+        score_patterns(candidates, len(units))
+        score_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pattern = common_centroid_pattern(units, rows)
+        search_time = time.perf_counter() - start
+        metrics = {name: round(float(value[0]), 3) for name, value in pattern_metrics(pattern, len(units)).items()}
+        print(f"units={units} rows={rows}: {args.candidates / score_time:.3g} candidates/s, "
+              f"search over {count_patterns(units)} patterns {search_time:.3f} s -> {pattern_to_string(pattern)} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark for the sequence pair floorplanner.
+
+Floorplans random sets of blocks (random sizes, random multi pin nets, one symmetry pair)
+and compares area and wirelength with a single row placement (fixed offsets, as the
+hand placed composite blocks do). Reports the time per floorplan.
+
+usage: python benchmark_floorplan.py [--blocks 4 8 12 16] [--samples 5] [--time-limit 0.5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from glayout.placement.floorplan import floorplan
+
+SPACING = 1.0
+
+
+def random_problem(num_blocks: int, rng: np.random.Generator) -> tuple[dict, list, list]:
+    blocks = {f"b{i}": tuple(rng.uniform(2, 20, size=2)) for i in range(num_blocks)}
+    # b0/b1 are a matched pair
+    blocks["b1"] = blocks["b0"]
+    nets = [
+        [f"b{j}" for j in rng.choice(num_blocks, size=rng.integers(2, min(5, num_blocks) + 1), replace=False)]
+        for _ in range(num_blocks)
+    ]
+    return blocks, nets, [[("b0", "b1")]]
+
+
+def row_placement(blocks: dict, nets: list) -> tuple[float, float]:
+    """(area, hpwl) of the blocks placed left to right in one row, centered vertically"""
+    centers, x = dict(), 0.0
+    for name, (width, height) in blocks.items():
+        centers[name] = (x + width / 2, 0.0)
+        x += width + SPACING
+    area = (x - SPACING) * max(height for _, height in blocks.values())
+    hpwl = 0.0
+    for net in nets:
+        points = np.array([centers[name] for name in net])
+        hpwl += float((points.max(axis=0) - points.min(axis=0)).sum())
+    return area, hpwl
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time the floorplanner and compare it with a row placement")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[4, 8, 12, 16], help="number of blocks of each problem size")
+    parser.add_argument("--samples", type=int, default=5, help="random problems per size")
+    parser.add_argument("--time-limit", type=float, default=0.5, help="floorplan time limit in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for num_blocks in args.blocks:
+        times, area_ratios, hpwl_ratios, utilizations = list(), list(), list(), list()
+        for sample in range(args.samples):
+            blocks, nets, symmetry = random_problem(num_blocks, rng)
+            start = time.perf_counter()
+            plan = floorplan(blocks, nets, symmetry=symmetry, spacing=SPACING, time_limit=args.time_limit, seed=sample)
+            times.append(time.perf_counter() - start)
+            row_area, row_hpwl = row_placement(blocks, nets)
+            area_ratios.append(plan["area"] / row_area)
+            hpwl_ratios.append(plan["hpwl"] / row_hpwl)
+            utilizations.append(plan["utilization"])
+        print(
+            f"{num_blocks:3d} blocks: {np.mean(times):.3f} s/floorplan (max {np.max(times):.3f} s),"
+            f" utilization {np.mean(utilizations):.3f}, area {np.mean(area_ratios):.3f}x and hpwl {np.mean(hpwl_ratios):.3f}x of a row placement"
+        )
+
+
+if __name__ == "__main__":
+    main()
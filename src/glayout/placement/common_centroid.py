@@ -0,0 +1,175 @@
+"""
+Common centroid placement patterns for N devices with arbitrary unit counts.
+
+A pattern is a rows x cols grid of device indices (row 0 is the bottom row, like the array macros).
+Candidates are scored vectorized (numpy) on:
+centroid = max distance (in unit pitches) of a device centroid from the array center (first order gradient error)
+gradient = max difference between devices of the second moments x^2, y^2, xy (second order gradient error)
+dispersion = adjacent (horizontal or vertical) units of the same device per unit (clustering)
+abutment = number of horizontally adjacent units of different devices (diffusion breaks in a row)
+Small problems are searched exhaustively, larger ones with simulated annealing (swap moves, parallel chains).
+The best pattern can be passed to the array macros: pnp/npn(pattern=...) or two_transistor_place(pattern=pattern_to_string(...), other_devices=...).
+The interdigitized macros (two_nfet_interdigitized, two_pfet_interdigitized, two_transistor_interdigitized) search their row with pattern="auto".
+"""
+
+from math import factorial, prod
+from typing import Optional, Union
+
+import numpy as np
+
+DEFAULT_PATTERN_WEIGHTS = {"centroid": 1.0, "gradient": 0.25, "dispersion": 0.1, "abutment": 0.05}
+
+# patterns are scored in chunks of this many candidates to bound memory
+_SCORE_CHUNK = 1 << 15
+
+
+def __cell_moments(rows: int, cols: int) -> np.ndarray:
+    """returns (rows*cols, 5) array of x, y, x^2, y^2, xy of every cell (row major) relative to the array center"""
+    y, x = np.mgrid[0:rows, 0:cols].astype(np.float64)
+    x = (x - (cols - 1) / 2).ravel()
+    y = (y - (rows - 1) / 2).ravel()
+    return np.stack((x, y, x * x, y * y, x * y), axis=1)
+
+
+def pattern_metrics(patterns: Union[np.ndarray, list], num_devices: Optional[int] = None) -> dict[str, np.ndarray]:
+    """returns the metrics of a batch of patterns as a dict {metric name: (B,) array}
+    args:
+    patterns = (B, rows, cols) or (rows, cols) int array of device indices (0 to num_devices-1)
+    num_devices = number of devices, defaults to max index + 1
+    """
+    patterns = np.asarray(patterns)
+    if patterns.ndim == 2:
+        patterns = patterns[None]
+    if patterns.ndim != 3:
+        raise ValueError("patterns must be a (rows, cols) or (B, rows, cols) array")
+    batch, rows, cols = patterns.shape
+    num_devices = int(patterns.max()) + 1 if num_devices is None else num_devices
+    flat = patterns.reshape(batch, rows * cols)
+    # per device sums of the cell moments, bincount over (pattern, device) bins
+    bins = (flat + num_devices * np.arange(batch)[:, None]).ravel()
+    cell_moments = __cell_moments(rows, cols)
+    counts = np.bincount(bins, minlength=batch * num_devices).reshape(batch, num_devices)
+    moments = np.stack(
+        [np.bincount(bins, weights=np.tile(column, batch), minlength=batch * num_devices) for column in cell_moments.T],
+        axis=1,
+    ).reshape(batch, num_devices, 5)
+    present = counts > 0
+    moments /= np.maximum(counts, 1)[:, :, None]
+    centroid = np.sqrt(np.where(present, moments[:, :, 0] ** 2 + moments[:, :, 1] ** 2, 0).max(axis=1))
+    second = moments[:, :, 2:]
+    spread = np.where(present[:, :, None], second, -np.inf).max(axis=1) - np.where(present[:, :, None], second, np.inf).min(axis=1)
+    same_row = patterns[:, :, 1:] == patterns[:, :, :-1]
+    same_col = patterns[:, 1:, :] == patterns[:, :-1, :]
+    return {
+        "centroid": centroid,
+        "gradient": spread.sum(axis=1),
+        "dispersion": (same_row.sum(axis=(1, 2)) + same_col.sum(axis=(1, 2))) / (rows * cols),
+        "abutment": (~same_row).sum(axis=(1, 2)).astype(np.float64),
+    }
+
+
+def score_patterns(patterns: Union[np.ndarray, list], num_devices: Optional[int] = None, weights: Optional[dict] = None) -> np.ndarray:
+    """returns (B,) weighted sum of the pattern metrics (lower is better)
+    args:
+    patterns = (B, rows, cols) or (rows, cols) int array of device indices
+    num_devices = number of devices, defaults to max index + 1
+    weights = {metric name: weight}, missing metrics use DEFAULT_PATTERN_WEIGHTS
+    """
+    weights = {**DEFAULT_PATTERN_WEIGHTS, **(weights or dict())}
+    metrics = pattern_metrics(patterns, num_devices)
+    return sum(weights[name] * value for name, value in metrics.items())
+
+
+def __batched_scores(flat: np.ndarray, rows: int, cols: int, num_devices: int, weights: dict) -> np.ndarray:
+    return np.concatenate([
+        score_patterns(flat[start:start + _SCORE_CHUNK].reshape(-1, rows, cols), num_devices, weights)
+        for start in range(0, len(flat), _SCORE_CHUNK)
+    ])
+
+
+def count_patterns(units: list[int]) -> int:
+    """number of distinct patterns (multiset permutations) of the units"""
+    return factorial(sum(units)) // prod(factorial(count) for count in units)
+
+
+def __all_patterns(units: list[int]) -> np.ndarray:
+    """returns (count_patterns(units), sum(units)) array of all arrangements of the units, built one cell at a time"""
+    prefixes = np.zeros((1, 0), dtype=np.int8)
+    remaining = np.array([units], dtype=np.int64)
+    for _ in range(sum(units)):
+        grown_prefixes, grown_remaining = list(), list()
+        for device in range(len(units)):
+            keep = remaining[:, device] > 0
+            if not keep.any():
+                continue
+            grown_prefixes.append(np.concatenate((prefixes[keep], np.full((int(keep.sum()), 1), device, dtype=np.int8)), axis=1))
+            left = remaining[keep].copy()
+            left[:, device] -= 1
+            grown_remaining.append(left)
+        prefixes, remaining = np.concatenate(grown_prefixes), np.concatenate(grown_remaining)
+    return prefixes
+
+
+def __anneal(units: list[int], rows: int, cols: int, weights: dict, chains: int, steps: int, rng: np.random.Generator) -> np.ndarray:
+    """returns the best pattern (flat) found by parallel simulated annealing chains with random swap moves"""
+    cells = rows * cols
+    num_devices = len(units)
+    base = np.repeat(np.arange(num_devices, dtype=np.int8), units)
+    state = rng.permuted(np.tile(base, (chains, 1)), axis=1)
+    scores = score_patterns(state.reshape(chains, rows, cols), num_devices, weights)
+    best, best_score = state[np.argmin(scores)].copy(), scores.min()
+    # temperature from the spread of random patterns down to ~0
+    start_temperature = max(float(scores.std()), 1e-3)
+    end_temperature = start_temperature * 1e-3
+    chain_ids = np.arange(chains)
+    for step in range(steps):
+        temperature = start_temperature * (end_temperature / start_temperature) ** (step / max(steps - 1, 1))
+        first = rng.integers(cells, size=chains)
+        second = rng.integers(cells, size=chains)
+        candidate = state.copy()
+        candidate[chain_ids, first], candidate[chain_ids, second] = state[chain_ids, second], state[chain_ids, first]
+        candidate_scores = score_patterns(candidate.reshape(chains, rows, cols), num_devices, weights)
+        accept = (candidate_scores <= scores) | (rng.random(chains) < np.exp((scores - candidate_scores) / temperature))
+        state[accept], scores[accept] = candidate[accept], candidate_scores[accept]
+        if scores.min() < best_score:
+            best, best_score = state[np.argmin(scores)].copy(), scores.min()
+    return best
+
+
+def common_centroid_pattern(
+    units: list[int],
+    rows: int = 2,
+    weights: Optional[dict] = None,
+    exhaustive_limit: int = 500000,
+    chains: int = 256,
+    steps: int = 1000,
+    seed: Optional[int] = 0,
+) -> list[list[int]]:
+    """returns the best placement pattern (list of rows, row 0 at the bottom) of device indices for the given unit counts
+    args:
+    units = number of units (fingers or multipliers) of each device, device i is labeled i in the pattern
+    rows = number of rows, sum(units) must be a multiple of rows
+    weights = {metric name: weight} of the score (see pattern_metrics), missing metrics use DEFAULT_PATTERN_WEIGHTS
+    exhaustive_limit = search all patterns if there are at most this many, else use simulated annealing
+    chains, steps = number of parallel annealing chains and steps of each chain
+    seed = random seed of the annealing
+    """
+    units = [int(count) for count in units]
+    if len(units) == 0 or min(units) < 1:
+        raise ValueError("every device must have at least one unit")
+    if rows < 1 or sum(units) % rows != 0:
+        raise ValueError("the total number of units must be a multiple of rows")
+    cols = sum(units) // rows
+    weights = {**DEFAULT_PATTERN_WEIGHTS, **(weights or dict())}
+    if count_patterns(units) <= exhaustive_limit:
+        candidates = __all_patterns(units)
+        best = candidates[np.argmin(__batched_scores(candidates, rows, cols, len(units), weights))]
+    else:
+        best = __anneal(units, rows, cols, weights, chains, steps, np.random.default_rng(seed))
+    return best.reshape(rows, cols).astype(int).tolist()
+
+
+def pattern_to_string(pattern: list[list[int]], labels: str = "abcdefghijklmnopqrstuvwxyz") -> str:
+    """returns the pattern as rows of labels seperated by white space (device i is labels[i])
+    e.g. [[0,1],[1,0]] -> "ab ba", the format of two_transistor_place"""
+    return " ".join("".join(labels[device] for device in row) for row in pattern)
@@ -0,0 +1,269 @@
+"""
+Floorplanning of composite blocks with a sequence pair simulated annealer.
+
+Blocks are rectangles (bbox of a Component, a ComponentReference or explicit (width, height)).
+A sequence pair (two permutations of the blocks) encodes the relative placement:
+a is left of b if a is before b in both sequences, a is below b if a is after b in the first and before b in the second.
+The packing (lower left corners) is the longest path through these constraints, computed vectorized for many annealing chains at once.
+The cost is a weighted sum of (normalized) area, half perimeter wirelength (HPWL) of the nets and aspect ratio.
+HPWL is updated incrementally: after a move only the nets with a pin on a block that moved are recomputed.
+Matched blocks are grouped in symmetry islands (pairs mirrored about a common vertical axis, self symmetric blocks centered on it),
+each island is placed by the annealer as a single rectangle so symmetry holds exactly.
+The result gives the center of every block and can be applied to references with place_floorplan, the ports are then ready for routing (e.g. route_nets).
+"""
+
+import time
+from typing import Optional, Union
+
+import numpy as np
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+
+from glayout.util.comp_utils import place_many
+
+DEFAULT_FLOORPLAN_WEIGHTS = {"area": 1.0, "hpwl": 1.0, "aspect": 0.1}
+
+Block = Union[tuple[float, float], Component, ComponentReference]
+# a pin is a block name (block center), (block name, port name) or (block name, (x, y) offset from the block center)
+Pin = Union[str, tuple[str, Union[str, tuple[float, float]]]]
+
+
+def __block_geometry(block: Block) -> tuple[float, float, dict]:
+    """returns width, height and {port name: (x, y) offset from the bbox lower left} of a block"""
+    if isinstance(block, (Component, ComponentReference)):
+        (xmin, ymin), (xmax, ymax) = np.asarray(block.bbox, dtype=np.float64)
+        ports = {name: (port.center[0] - xmin, port.center[1] - ymin) for name, port in block.ports.items()}
+        return float(xmax - xmin), float(ymax - ymin), ports
+    width, height = block
+    return float(width), float(height), dict()
+
+
+def __symmetry_islands(dims: dict, symmetry: list, spacing: float) -> tuple[list, dict]:
+    """returns [(width, height)] of every island and {block name: (island index, x, y of the block lower left in the island)}
+    rows (a pair or a self symmetric block) are stacked bottom to top in the given order, centered on the island axis"""
+    islands, members = list(), dict()
+    for index, group in enumerate(symmetry):
+        rows = [tuple(entry) if isinstance(entry, (tuple, list)) else (entry,) for entry in group]
+        for row in rows:
+            if len(row) not in (1, 2):
+                raise ValueError("symmetry entries must be a block name or a pair of block names")
+            for name in row:
+                if name not in dims:
+                    raise ValueError(f"symmetry block {name} is not in blocks")
+                if name in members:
+                    raise ValueError(f"block {name} is in more than one symmetry entry")
+                members[name] = None
+        half_widths = [spacing / 2 + max(dims[name][0] for name in row) if len(row) == 2 else dims[row[0]][0] / 2 for row in rows]
+        axis = max(half_widths)
+        y = 0.0
+        for row in rows:
+            row_height = max(dims[name][1] for name in row)
+            if len(row) == 2:
+                left, right = row
+                members[left] = (index, axis - spacing / 2 - dims[left][0], y + (row_height - dims[left][1]) / 2)
+                members[right] = (index, axis + spacing / 2, y + (row_height - dims[right][1]) / 2)
+            else:
+                members[row[0]] = (index, axis - dims[row[0]][0] / 2, y + (row_height - dims[row[0]][1]) / 2)
+            y += row_height + spacing
+        islands.append((2 * axis, y - spacing))
+    return islands, members
+
+
+def __pack(first: np.ndarray, second: np.ndarray, dims: np.ndarray) -> np.ndarray:
+    """returns (2, chains, units) x, y lower left corners of the sequence pairs (chains, units), dims = (2, units) widths, heights
+    longest paths are relaxed for all chains at once until they stop changing (longest chain of constraints + 1 times)"""
+    chains, units = first.shape
+    first_position = np.argsort(first, axis=1)
+    second_position = np.argsort(second, axis=1)
+    before_first = first_position[:, :, None] < first_position[:, None, :]
+    before_second = second_position[:, :, None] < second_position[:, None, :]
+    # [0] i left of j, [1] i below j (coordinates are >= 0 so the max over the masked products is the max over the predecessors)
+    predecessors = np.stack((before_first & before_second, ~before_first & before_second)).astype(np.float64)
+    corners = np.zeros((2, chains, units))
+    for _ in range(units):
+        relaxed = (predecessors * (corners + dims[:, None, :])[:, :, :, None]).max(axis=2)
+        if np.array_equal(relaxed, corners):
+            break
+        corners = relaxed
+    return corners
+
+
+class _NetPins:
+    """padded pin tables of the nets: unit index and offset from the unit lower left of every pin"""
+
+    def __init__(self, pins: list[list[tuple[int, float, float]]], units: int):
+        size = max((len(net) for net in pins), default=1)
+        self.count = len(pins)
+        self.unit = np.zeros((self.count, size), dtype=np.int64)
+        self.offset = np.zeros((2, self.count, size))
+        self.mask = np.zeros((self.count, size), dtype=bool)
+        for i, net in enumerate(pins):
+            for k, (unit, dx, dy) in enumerate(net):
+                self.unit[i, k], self.offset[:, i, k], self.mask[i, k] = unit, (dx, dy), True
+        # units x nets incidence, used to find the nets touched by a move
+        self.incidence = np.zeros((units, self.count), dtype=bool)
+        for i, net in enumerate(pins):
+            for unit, _, _ in net:
+                self.incidence[unit, i] = True
+
+    def hpwl(self, corners: np.ndarray, chain: np.ndarray, net: np.ndarray) -> np.ndarray:
+        """HPWL of net[i] in chain[i] for the (2, chains, units) lower left corners"""
+        pins = corners[:, chain[:, None], self.unit[net]] + self.offset[:, net]
+        mask = self.mask[net]
+        spread = np.where(mask, pins, -np.inf).max(axis=2) - np.where(mask, pins, np.inf).min(axis=2)
+        return spread.sum(axis=0)
+
+    def all_hpwl(self, corners: np.ndarray) -> np.ndarray:
+        """(chains, nets) HPWL of every net"""
+        chains = corners.shape[1]
+        chain, net = np.divmod(np.arange(chains * self.count), self.count)
+        return self.hpwl(corners, chain, net).reshape(chains, self.count)
+
+
+def __costs(corners: np.ndarray, dims: np.ndarray, net_hpwl: np.ndarray, norms: tuple[float, float], weights: dict) -> np.ndarray:
+    width, height = (corners + dims[:, None, :]).max(axis=2)
+    aspect = np.maximum(width, height) / np.maximum(np.minimum(width, height), 1e-9) - 1
+    return weights["area"] * width * height / norms[0] + weights["hpwl"] * net_hpwl.sum(axis=1) / norms[1] + weights["aspect"] * aspect
+
+
+def floorplan(
+    blocks: dict[str, Block],
+    nets: Optional[list[list[Pin]]] = None,
+    symmetry: Optional[list[list[Union[str, tuple[str, str]]]]] = None,
+    spacing: float = 0,
+    weights: Optional[dict] = None,
+    chains: int = 32,
+    steps: int = 2000,
+    time_limit: Optional[float] = 0.5,
+    seed: Optional[int] = 0,
+) -> dict:
+    """returns a floorplan of the blocks minimizing area, wirelength and aspect ratio
+    args:
+    blocks = {name: Component, ComponentReference or (width, height)}, ports of components can be used as pins
+    nets = list of nets, each a list of pins: block name (center), (block name, port name) or (block name, (x, y) offset from the center)
+    symmetry = list of symmetry groups, each a list of pairs (left block, right block) and/or self symmetric block names
+    ****all blocks of a group share one vertical axis, pairs are at the same height (stacked bottom to top in the given order)
+    ****mirroring the right block of a pair (e.g. ref.mirror_x()) is up to the caller, pass the blocks as they will be placed
+    spacing = min spacing between blocks
+    weights = {"area", "hpwl", "aspect"} cost weights, missing keys use DEFAULT_FLOORPLAN_WEIGHTS
+    ****area is normalized by the sum of the block areas, hpwl by the number of nets times sqrt(sum of the block areas)
+    chains, steps = number of parallel annealing chains and steps of each chain
+    time_limit = anneal for at most this many seconds, the cooling schedule is shortened to fit (None runs all steps)
+    seed = random seed
+    returns dict with centers {name: (x, y)} (floorplan bbox centered on the origin), width, height, area, hpwl, utilization
+    """
+    start = time.perf_counter()
+    if len(blocks) == 0:
+        raise ValueError("floorplan needs at least one block")
+    weights = {**DEFAULT_FLOORPLAN_WEIGHTS, **(weights or dict())}
+    geometry = {name: __block_geometry(block) for name, block in blocks.items()}
+    dims = {name: (width, height) for name, (width, height, _) in geometry.items()}
+    # annealed units: symmetry islands first, then the free blocks
+    islands, members = __symmetry_islands(dims, symmetry or list(), spacing)
+    free = [name for name in blocks if name not in members]
+    unit_dims = islands + [dims[name] for name in free]
+    placement = dict(members)
+    placement.update({name: (len(islands) + i, 0.0, 0.0) for i, name in enumerate(free)})
+    # spacing is added to the right/top of every unit
+    padded_dims = np.array(unit_dims, dtype=np.float64).T + spacing
+    units = len(unit_dims)
+    # pins as (unit, offset from the unit lower left)
+    net_pins = list()
+    for net in nets or list():
+        pins = list()
+        for pin in net:
+            name, where = (pin, None) if isinstance(pin, str) else pin
+            if name not in placement:
+                raise ValueError(f"net pin block {name} is not in blocks")
+            unit, x, y = placement[name]
+            width, height, ports = geometry[name]
+            if where is None:
+                dx, dy = width / 2, height / 2
+            elif isinstance(where, str):
+                if where not in ports:
+                    raise ValueError(f"block {name} has no port {where}")
+                dx, dy = ports[where]
+            else:
+                dx, dy = width / 2 + where[0], height / 2 + where[1]
+            pins.append((unit, x + dx, y + dy))
+        net_pins.append(pins)
+    net_table = _NetPins(net_pins, units)
+    total_area = float(padded_dims.prod(axis=0).sum())
+    norms = (total_area, max(net_table.count, 1) * np.sqrt(total_area))
+
+    rng = np.random.default_rng(seed)
+    identity = np.tile(np.arange(units), (chains, 1))
+    first, second = rng.permuted(identity, axis=1), rng.permuted(identity, axis=1)
+    corners = __pack(first, second, padded_dims)
+    net_hpwl = net_table.all_hpwl(corners)
+    costs = __costs(corners, padded_dims, net_hpwl, norms, weights)
+    best = np.argmin(costs)
+    best_cost, best_corners = costs[best], corners[:, best].copy()
+    start_temperature = max(float(costs.std()), 1e-3)
+    end_temperature = start_temperature * 1e-3
+    chain_ids = np.arange(chains)
+    for step in range(steps if units > 1 else 0):
+        # the schedule follows the steps or the time limit, whichever runs out first
+        progress = step / max(steps - 1, 1)
+        if time_limit is not None:
+            progress = max(progress, (time.perf_counter() - start) / time_limit)
+            if progress >= 1:
+                break
+        temperature = start_temperature * (end_temperature / start_temperature) ** progress
+        # moves: swap two units in the first sequence, in the second or in both
+        i = rng.integers(units, size=chains)
+        j = (i + rng.integers(1, units, size=chains)) % units
+        kind = rng.integers(3, size=chains)
+        candidate_first, candidate_second = first.copy(), second.copy()
+        for sequence, candidate, use in ((first, candidate_first, kind != 1), (second, candidate_second, kind != 0)):
+            rows = chain_ids[use]
+            candidate[rows, i[use]], candidate[rows, j[use]] = sequence[rows, j[use]], sequence[rows, i[use]]
+        candidate_corners = __pack(candidate_first, candidate_second, padded_dims)
+        # incremental HPWL: recompute only the nets with a pin on a unit that moved
+        moved = (candidate_corners != corners).any(axis=0)
+        touched_chain, touched_net = np.nonzero(moved @ net_table.incidence)
+        candidate_hpwl = net_hpwl.copy()
+        if len(touched_chain):
+            candidate_hpwl[touched_chain, touched_net] = net_table.hpwl(candidate_corners, touched_chain, touched_net)
+        candidate_costs = __costs(candidate_corners, padded_dims, candidate_hpwl, norms, weights)
+        accept = (candidate_costs <= costs) | (rng.random(chains) < np.exp((costs - candidate_costs) / temperature))
+        first[accept], second[accept] = candidate_first[accept], candidate_second[accept]
+        corners[:, accept], net_hpwl[accept], costs[accept] = candidate_corners[:, accept], candidate_hpwl[accept], candidate_costs[accept]
+        if costs.min() < best_cost:
+            best = np.argmin(costs)
+            best_cost, best_corners = costs[best], corners[:, best].copy()
+
+    # remove the spacing added to the right/top units from the bbox
+    width, height = ((best_corners + padded_dims).max(axis=1) - spacing).tolist()
+    centers = dict()
+    for name in blocks:
+        unit, x_offset, y_offset = placement[name]
+        block_width, block_height = dims[name]
+        centers[name] = (
+            float(best_corners[0, unit] + x_offset + block_width / 2 - width / 2),
+            float(best_corners[1, unit] + y_offset + block_height / 2 - height / 2),
+        )
+    hpwl = float(net_table.all_hpwl(best_corners[:, None]).sum()) if net_table.count else 0.0
+    block_area = sum(block_width * block_height for block_width, block_height in dims.values())
+    return {
+        "centers": centers,
+        "width": width,
+        "height": height,
+        "area": width * height,
+        "hpwl": hpwl,
+        "utilization": block_area / (width * height) if width * height else 1.0,
+    }
+
+
+def place_floorplan(refs: dict[str, ComponentReference], plan: dict, grid: Optional[float] = 0.005) -> list[ComponentReference]:
+    """moves the references to the floorplan centers (plan = output of floorplan), returns the references
+    args:
+    refs = {block name: ComponentReference}, names must be in the plan
+    plan = floorplan(...) result
+    grid = centers are rounded to a multiple of this (None does not round)
+    """
+    names = list(refs)
+    centers = np.array([plan["centers"][name] for name in names])
+    if grid:
+        centers = np.round(centers / grid) * grid
+    return place_many([refs[name] for name in names], centers, destination=True)
@@ -7,7 +7,7 @@ from glayout.placement.two_transistor_interdigitized import two_nfet_interdigiti
 from typing import Literal, Optional
 from gdsfactory import Component
 from gdsfactory.component_reference import ComponentReference
-from glayout.util.comp_utils import evaluate_bbox, movey, align_comp_to_port
+from glayout.util.comp_utils import evaluate_bbox, movey, align_comp_to_port, align_many
 from glayout.primitives.guardring import tapring
 from glayout.spice.netlist import Netlist
 from gdsfactory.components import text_freetype, rectangle
@@ -83,10 +83,9 @@ def add_four_int_labels1(four_int_in: Component,
     move_info.append((vb2label,four_int_in.ports["bottom_welltie_S_top_met_S"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        four_int_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    four_int_in.add(align_many(comps, prts, alignments))
     return four_int_in.flatten()
 
 # one common bulk node
@@ -155,10 +154,9 @@ def add_four_int_labels2(four_int_in: Component,
     move_info.append((vblabel,four_int_in.ports["top_welltie_S_top_met_S"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        four_int_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    four_int_in.add(align_many(comps, prts, alignments))
     return four_int_in.flatten()
 
 def four_tran_interdigitized_netlist(toprow: ComponentReference, bottomrow: ComponentReference, same_bulk: bool) -> Netlist:
@@ -181,12 +179,13 @@ def generic_4T_interdigitzed(
     length: float=None,
     with_substrate_tap: bool = True,
     top_kwargs: Optional[dict]=None,
-    bottom_kwargs: Optional[dict]=None
+    bottom_kwargs: Optional[dict]=None,
+    pattern: Optional[str]=None
 ):
-    if top_kwargs is None:
-        top_kwargs = dict()
-    if bottom_kwargs is None:
-        bottom_kwargs = dict()
+    # pattern = order of the devices in both rows (see two_transistor_interdigitized.interdigitized_row_pattern, e.g. "auto"),
+    # top_kwargs/bottom_kwargs can set a different pattern per row
+    top_kwargs = {"pattern": pattern, **(top_kwargs or dict())}
+    bottom_kwargs = {"pattern": pattern, **(bottom_kwargs or dict())}
     # place
     toplvl = Component()
     if top_row_device=="nfet":
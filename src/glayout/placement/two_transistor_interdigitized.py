@@ -5,7 +5,8 @@ from glayout.primitives.fet import nmos, pmos, multiplier
 from glayout.util.comp_utils import evaluate_bbox
 from typing import Literal, Union
 from glayout.util.port_utils import rename_ports_by_orientation, rename_ports_by_list, create_private_ports
-from glayout.util.comp_utils import prec_ref_center,evaluate_bbox, prec_center, align_comp_to_port
+from glayout.util.comp_utils import prec_ref_center,evaluate_bbox, prec_center, align_comp_to_port, align_many, movex
+from glayout.placement.common_centroid import common_centroid_pattern, pattern_to_string
 from glayout.routing.straight_route import straight_route
 from gdsfactory.functions import transformed
 from glayout.primitives.guardring import tapring
@@ -59,10 +60,9 @@ def add_two_int_labels(two_int_in: Component,
     move_info.append((vblabel,two_int_in.ports["welltie_S_top_met_S"], None))
     
     # move everything to position
-    for comp, prt, alignment in move_info:
-        alignment = ('c','b') if alignment is None else alignment
-        compref = align_comp_to_port(comp, prt, alignment=alignment)
-        two_int_in.add(compref)
+    comps, prts, alignments = zip(*move_info)
+    alignments = [('c','b') if alignment is None else alignment for alignment in alignments]
+    two_int_in.add(align_many(comps, prts, alignments))
     return two_int_in.flatten() 
 
 
@@ -106,79 +106,110 @@ XB VDD2 VG2 VSS2 VB {model} l={length} w={width} m={mtop}"""
             'mult': multipliers
         }
     )
+def interdigitized_row_pattern(numcols: int, pattern: Optional[str] = None) -> str:
+    """returns the placement (left to right) of a row of numcols A and numcols B devices as a string of a/b
+    args:
+    numcols = number of devices A (and of devices B) in the row
+    pattern = None for "abab...", "auto" for the best common centroid row (glayout.placement.common_centroid.common_centroid_pattern),
+    ****or a string of numcols a and numcols b (e.g. "abba")
+    """
+    if pattern is None:
+        return "ab" * numcols
+    if pattern.lower() == "auto":
+        return pattern_to_string(common_centroid_pattern([numcols, numcols], rows=1))
+    pattern = pattern.lower()
+    if sorted(pattern) != sorted("ab" * numcols):
+        raise ValueError(f"pattern must have {numcols} a and {numcols} b (got {pattern!r})")
+    return pattern
+
+
+def interdigitized_end_devices(numcols: int, pattern: Optional[str] = None) -> tuple[str, str]:
+    """returns the port prefixes (e.g. ("A_0_", "B_1_")) of the leftmost and rightmost devices of the row"""
+    pattern = interdigitized_row_pattern(numcols, pattern)
+    left = pattern[0].upper() + "_0_"
+    right = pattern[-1].upper() + "_" + str(pattern.count(pattern[-1]) - 1) + "_"
+    return left, right
+
+
 @validate_arguments
 def macro_two_transistor_interdigitized(
     pdk: MappedPDK,
     numcols: int,
     deviceA_and_B: Literal["nfet", "pfet"],
     dummy: Union[bool, tuple[bool, bool]] = True,
+    pattern: Optional[str] = None,
     **kwargs
 ) -> Component:
     """place two transistors in a single row with interdigitized placement
     Currently only supports two of the same transistor (same devices)
-    Place follows an ABABAB... pattern
+    Place follows an ABABAB... pattern by default
     args:
     pdk = MappedPDK to use
     numcols = a single col is actually one col for both transistors (so AB). 2 cols = ABAB ... so on
     deviceA_and_B = the device to place for both transistors (either nfet or pfet)
     dummy = place dummy at the edges of the interdigitized place (true by default). you can specify tuple to place only on one side
+    pattern = order of the devices in the row, see interdigitized_row_pattern (None = ABAB..., "auto" = common centroid search, or e.g. "abba")
     kwargs = key word arguments for device. 
     ****NOTE: These are the same as glayout.flow.primitives.fet.multiplier arguments EXCLUDING dummy, sd_route_extension, and pdk options
     """
     if isinstance(dummy, bool):
         dummy = (dummy, dummy)
+    pattern = interdigitized_row_pattern(numcols, pattern)
     # override kwargs for needed options
     kwargs["sd_route_extension"] = 0
     kwargs["gate_route_extension"] = 0
     kwargs["sdlayer"] = "n+s/d" if deviceA_and_B == "nfet" else "p+s/d"
     kwargs["pdk"] = pdk
-    # create devices dummy l/r and A/B (change extension options)
-    kwargs["dummy"] = (True,False) if dummy[0] else False
-    lefttmost_devA = multiplier(**kwargs)
+    # create devices A/B (change extension options), with a dummy on the left/right for the row ends
     kwargs["dummy"] = False
     center_devA = multiplier(**kwargs)
     devB_sd_extension = pdk.util_max_metal_seperation() + abs(center_devA.ports["drain_N"].center[1]-center_devA.ports["diff_N"].center[1])
     devB_gate_extension = pdk.util_max_metal_seperation() + abs(center_devA.ports["row0_col0_gate_S"].center[1]-center_devA.ports["gate_S"].center[1])
-    kwargs["sd_route_extension"] = pdk.snap_to_2xgrid(devB_sd_extension)
-    kwargs["gate_route_extension"] = pdk.snap_to_2xgrid(devB_gate_extension)
-    center_devB = multiplier(**kwargs)
-    kwargs["dummy"] = (False,True) if dummy[1] else False
-    rightmost_devB = multiplier(**kwargs)
+    devB_kwargs = dict(kwargs)
+    devB_kwargs["sd_route_extension"] = pdk.snap_to_2xgrid(devB_sd_extension)
+    devB_kwargs["gate_route_extension"] = pdk.snap_to_2xgrid(devB_gate_extension)
+    center_devB = multiplier(**devB_kwargs)
+    def make_device(devletter: str, position: int) -> Component:
+        device_kwargs = kwargs if devletter == "a" else devB_kwargs
+        if position == 0 and dummy[0]:
+            return multiplier(**{**device_kwargs, "dummy": (True, False)})
+        if position == len(pattern) - 1 and dummy[1]:
+            return multiplier(**{**device_kwargs, "dummy": (False, True)})
+        return center_devA if devletter == "a" else center_devB
     # place devices
     idplace = Component()
     dims = evaluate_bbox(center_devA)
     xdisp = pdk.snap_to_2xgrid(dims[0]+pdk.get_grule("active_diff")["min_separation"])
     refs = list()
-    for i in range(2*numcols):
-        if i==0:
-            refs.append(idplace << lefttmost_devA)
-        elif i==((2*numcols)-1):
-            refs.append(idplace << rightmost_devB)
-        elif i%2: # is odd (so device B)
-            refs.append(idplace << center_devB)
-        else: # not i%2 == i is even (so device A)
-            refs.append(idplace << center_devA)
+    devcount = {"a": 0, "b": 0}
+    for i, devletter in enumerate(pattern):
+        refs.append(idplace << make_device(devletter, i))
         refs[-1].movex(i*(xdisp))
-        devletter = "B" if i%2 else "A"
-        prefix=devletter+"_"+str(int(i/2))+"_"
+        prefix=devletter.upper()+"_"+str(devcount[devletter])+"_"
+        devcount[devletter] += 1
         idplace.add_ports(refs[-1].get_ports_list(), prefix=prefix)
+    refsA = [ref for ref, devletter in zip(refs, pattern) if devletter == "a"]
+    refsB = [ref for ref, devletter in zip(refs, pattern) if devletter == "b"]
     # extend poly layer for equal parasitics
     for i in range(2*numcols):
         desired_end_layer = pdk.layer_to_glayer(refs[i].ports["row0_col0_rightsd_top_met_N"].layer)
-        idplace << straight_route(pdk, refs[i].ports["row0_col0_rightsd_top_met_N"],refs[-1].ports["drain_E"],glayer2=desired_end_layer)
-        idplace << straight_route(pdk, refs[i].ports["leftsd_top_met_N"],refs[-1].ports["drain_E"],glayer2=desired_end_layer)
-        if not i%2:
+        idplace << straight_route(pdk, refs[i].ports["row0_col0_rightsd_top_met_N"],refsB[-1].ports["drain_E"],glayer2=desired_end_layer)
+        idplace << straight_route(pdk, refs[i].ports["leftsd_top_met_N"],refsB[-1].ports["drain_E"],glayer2=desired_end_layer)
+        if pattern[i] == "a":
             desired_gate_end_layer = "poly"
-            idplace << straight_route(pdk, refs[i].ports["row0_col0_gate_S"], refs[-1].ports["gate_E"],glayer2=desired_gate_end_layer)
+            idplace << straight_route(pdk, refs[i].ports["row0_col0_gate_S"], refsB[-1].ports["gate_E"],glayer2=desired_gate_end_layer)
     # merge s/d layer for all transistors
     idplace << straight_route(pdk, refs[0].ports["plusdoped_W"],refs[-1].ports["plusdoped_E"])
     # create s/d/gate connections extending over entire row
-    A_src = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, refs[0].ports["source_W"], refs[-1].ports["source_E"]), [("route_","_")]))
-    B_src = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, refs[-1].ports["source_E"], refs[0].ports["source_W"]), [("route_","_")]))
-    A_drain = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, refs[0].ports["drain_W"], refs[-1].ports["drain_E"]), [("route_","_")]))
-    B_drain = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, refs[-1].ports["drain_E"], refs[0].ports["drain_W"]), [("route_","_")]))
-    A_gate = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, refs[0].ports["gate_W"], refs[-1].ports["gate_E"]), [("route_","_")]))
-    B_gate = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, refs[-1].ports["gate_E"], refs[0].ports["gate_W"]), [("route_","_")]))
+    # (A rails start at the left end of the row, B rails at the right end, at the height of the A/B routes)
+    def row_end(port, ref_at_end):
+        return movex(port, destination=ref_at_end.ports[port.name].center[0])
+    A_src = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, row_end(refsA[0].ports["source_W"], refs[0]), refs[-1].ports["source_E"]), [("route_","_")]))
+    B_src = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, row_end(refsB[-1].ports["source_E"], refs[-1]), refs[0].ports["source_W"]), [("route_","_")]))
+    A_drain = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, row_end(refsA[0].ports["drain_W"], refs[0]), refs[-1].ports["drain_E"]), [("route_","_")]))
+    B_drain = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, row_end(refsB[-1].ports["drain_E"], refs[-1]), refs[0].ports["drain_W"]), [("route_","_")]))
+    A_gate = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, row_end(refsA[0].ports["gate_W"], refs[0]), refs[-1].ports["gate_E"]), [("route_","_")]))
+    B_gate = idplace << rename_ports_by_orientation(rename_ports_by_list(straight_route(pdk, row_end(refsB[-1].ports["gate_E"], refs[-1]), refs[0].ports["gate_W"]), [("route_","_")]))
     # add route ports and return
     prefixes = ["A_source","B_source","A_drain","B_drain","A_gate","B_gate"]
     for i, ref in enumerate([A_src, B_src, A_drain, B_drain, A_gate, B_gate]):
@@ -197,19 +228,22 @@ def two_nfet_interdigitized(
     with_substrate_tap: bool = True,
     with_tie: bool = True,
     tie_layers: tuple[str,str]=("met2","met1"),
+    pattern: Optional[str] = None,
     **kwargs
 ) -> Component:
     """Currently only supports two of the same nfet instances. does NOT support multipliers (currently)
-    Place follows an ABABAB... pattern
+    Place follows an ABABAB... pattern by default
     args:
     pdk = MappedPDK to use
     numcols = a single col is actually one col for both nfets (so AB). 2 cols = ABAB ... so on
     dummy = place dummy at the edges of the interdigitized place (true by default). you can specify tuple to place only on one side
+    pattern = order of the devices in the row, see interdigitized_row_pattern (None = ABAB..., "auto" = common centroid search, or e.g. "abba")
     kwargs = key word arguments for multiplier. 
     ****NOTE: These are the same as glayout.flow.primitives.fet.multiplier arguments EXCLUDING dummy, sd_route_extension, and pdk options
     tie_layers: tuple[str,str] specifying (horizontal glayer, vertical glayer) or well tie ring. default=("met2","met1")
     """
-    base_multiplier = macro_two_transistor_interdigitized(pdk, numcols, "nfet", dummy, **kwargs)
+    pattern = interdigitized_row_pattern(numcols, pattern)
+    base_multiplier = macro_two_transistor_interdigitized(pdk, numcols, "nfet", dummy, pattern, **kwargs)
     # tie
     if with_tie:
         tap_separation = max(
@@ -229,12 +263,13 @@ def two_nfet_interdigitized(
             vertical_glayer=tie_layers[1],
         )
         base_multiplier.add_ports(tiering_ref.get_ports_list(), prefix="welltie_")
+        end_devices = interdigitized_end_devices(numcols, pattern)
         try:
-            base_multiplier<<straight_route(pdk,base_multiplier.ports["A_0_dummy_L_gsdcon_top_met_W"],base_multiplier.ports["welltie_W_top_met_W"],glayer2="met1")
+            base_multiplier<<straight_route(pdk,base_multiplier.ports[end_devices[0]+"dummy_L_gsdcon_top_met_W"],base_multiplier.ports["welltie_W_top_met_W"],glayer2="met1")
         except KeyError:
             pass
         try:
-            base_multiplier<<straight_route(pdk,base_multiplier.ports[f"B_{numcols-1}_dummy_R_gsdcon_top_met_E"],base_multiplier.ports["welltie_E_top_met_E"],glayer2="met1")
+            base_multiplier<<straight_route(pdk,base_multiplier.ports[end_devices[1]+"dummy_R_gsdcon_top_met_E"],base_multiplier.ports["welltie_E_top_met_E"],glayer2="met1")
         except KeyError:
             pass
     # add pwell
@@ -282,19 +317,22 @@ def two_pfet_interdigitized(
     with_substrate_tap: bool = True,
     with_tie: bool = True,
     tie_layers: tuple[str,str]=("met2","met1"),
+    pattern: Optional[str] = None,
     **kwargs
 ) -> Component:
     """Currently only supports two of the same nfet instances. does NOT support multipliers (currently)
-    Place follows an ABABAB... pattern
+    Place follows an ABABAB... pattern by default
     args:
     pdk = MappedPDK to use
     numcols = a single col is actually one col for both nfets (so AB). 2 cols = ABAB ... so on
     dummy = place dummy at the edges of the interdigitized place (true by default). you can specify tuple to place only on one side
+    pattern = order of the devices in the row, see interdigitized_row_pattern (None = ABAB..., "auto" = common centroid search, or e.g. "abba")
     kwargs = key word arguments for multiplier. 
     ****NOTE: These are the same as glayout.flow.primitives.fet.multiplier arguments EXCLUDING dummy, sd_route_extension, and pdk options
     tie_layers: tuple[str,str] specifying (horizontal glayer, vertical glayer) or well tie ring. default=("met2","met1")
     """
-    base_multiplier = macro_two_transistor_interdigitized(pdk, numcols, "pfet", dummy, **kwargs)
+    pattern = interdigitized_row_pattern(numcols, pattern)
+    base_multiplier = macro_two_transistor_interdigitized(pdk, numcols, "pfet", dummy, pattern, **kwargs)
     # tie
     if with_tie:
         tap_separation = max(
@@ -314,12 +352,13 @@ def two_pfet_interdigitized(
             vertical_glayer=tie_layers[1],
         )
         base_multiplier.add_ports(tiering_ref.get_ports_list(), prefix="welltie_")
+        end_devices = interdigitized_end_devices(numcols, pattern)
         try:
-            base_multiplier<<straight_route(pdk,base_multiplier.ports["A_0_dummy_L_gsdcon_top_met_W"],base_multiplier.ports["welltie_W_top_met_W"],glayer2="met1")
+            base_multiplier<<straight_route(pdk,base_multiplier.ports[end_devices[0]+"dummy_L_gsdcon_top_met_W"],base_multiplier.ports["welltie_W_top_met_W"],glayer2="met1")
         except KeyError:
             pass
         try:
-            base_multiplier<<straight_route(pdk,base_multiplier.ports[f"B_{numcols-1}_dummy_R_gsdcon_top_met_E"],base_multiplier.ports["welltie_E_top_met_E"],glayer2="met1")
+            base_multiplier<<straight_route(pdk,base_multiplier.ports[end_devices[1]+"dummy_R_gsdcon_top_met_E"],base_multiplier.ports["welltie_E_top_met_E"],glayer2="met1")
         except KeyError:
             pass
     # add pwell
@@ -368,9 +407,10 @@ def two_transistor_interdigitized(
     with_substrate_tap: bool = True,
     with_tie: bool = True,
     tie_layers: tuple[str,str]=("met2","met1"),
+    pattern: Optional[str] = None,
     **kwargs
 ) -> Component:
     if device=="nfet":
-        return two_nfet_interdigitized(pdk=pdk,numcols=numcols,dummy=dummy,with_substrate_tap=with_substrate_tap,with_tie=with_tie,tie_layers=tie_layers,**kwargs)
+        return two_nfet_interdigitized(pdk=pdk,numcols=numcols,dummy=dummy,with_substrate_tap=with_substrate_tap,with_tie=with_tie,tie_layers=tie_layers,pattern=pattern,**kwargs)
     else:
-        return two_pfet_interdigitized(pdk=pdk,numcols=numcols,dummy=dummy,with_substrate_tap=with_substrate_tap,with_tie=with_tie,tie_layers=tie_layers,**kwargs)
\ No newline at end of file
+        return two_pfet_interdigitized(pdk=pdk,numcols=numcols,dummy=dummy,with_substrate_tap=with_substrate_tap,with_tie=with_tie,tie_layers=tie_layers,pattern=pattern,**kwargs)
\ No newline at end of file
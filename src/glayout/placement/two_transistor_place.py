@@ -1,7 +1,7 @@
 from glayout.pdk.mappedpdk import MappedPDK
 from pydantic import validate_arguments
 from gdsfactory.component import Component
-from typing import Callable
+from typing import Callable, Optional
 from glayout.primitives.fet import nmos, pmos
 from glayout.util.comp_utils import evaluate_bbox
 
@@ -10,22 +10,25 @@ def two_transistor_place(
 	pdk: MappedPDK, 
 	pattern: str, 
 	deviceA: tuple[Callable, dict], 
-	deviceB: tuple[Callable, dict]
+	deviceB: tuple[Callable, dict],
+	other_devices: Optional[list[tuple[Callable, dict]]] = None
         ) -> Component:
-    """Place two transitors according to the patter provided
+    """Place two (or more) transitors according to the patter provided
     args:
     pdk = MappedPDK to use
-    pattern = placement pattern. This string must contain only white space, the char a, the char b.
+    pattern = placement pattern. This string must contain only white space, the char a, the char b (and c, d, ... for other_devices).
     **** any other chars result in error. White space indicates a new row in the place
     **** all rows must have same number of cols
+    **** glayout.placement.common_centroid.pattern_to_string(common_centroid_pattern(...)) gives a pattern in this format
     deviceA/deviceB = tuple(function to call, kwargs for function) kwargs must include pdk
+    other_devices = devices c, d, ... (same format as deviceA/deviceB)
     """
     toplvlcomp = Component("2tranplace")
     # create the transistors
-    tranA = deviceA[0](**deviceA[1])
-    tranA_dims = evaluate_bbox(tranA)
-    tranB = deviceB[0](**deviceB[1])
-    tranB_dims = evaluate_bbox(tranB)
+    devices = dict()
+    for label, device in zip("abcdefghijklmnopqrstuvwxyz", [deviceA, deviceB] + list(other_devices or [])):
+        devices[label] = device[0](**device[1])
+    devices_dims = [evaluate_bbox(tran) for tran in devices.values()]
     # parse pattern into a matrix
     pattern = pattern.lower().split()
     parsed_pattern = list()
@@ -36,16 +39,14 @@ def two_transistor_place(
         elif len(row)!=num_cols:
             raise ValueError("all rows should have same number of devices")
         for char in row:
-            if char=="a":
-                parsed_pattern[i].append(tranA)
-            elif char=="b":
-                parsed_pattern[i].append(tranB)
+            if char in devices:
+                parsed_pattern[i].append(devices[char])
             else:
-                raise ValueError("pattern should only contain a,b, or whitespace")
+                raise ValueError(f"pattern should only contain {','.join(devices)}, or whitespace")
     # run place (center, then right, then left, ...)
     extra_sep = 2*pdk.util_max_metal_seperation()
-    yspace = extra_sep + max(tranA_dims[1], tranB_dims[1])
-    xspace = extra_sep + max(tranA_dims[0], tranB_dims[0])
+    yspace = extra_sep + max(dims[1] for dims in devices_dims)
+    xspace = extra_sep + max(dims[0] for dims in devices_dims)
     for i, row in enumerate(parsed_pattern):
         for j, tran in enumerate(row):
             tranref = toplvlcomp << tran
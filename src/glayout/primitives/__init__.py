@@ -7,6 +7,17 @@ from .fet import nmos, pmos, multiplier, fet_netlist
 from .guardring import tapring
 from .mimcap import mimcap, mimcap_array
 from .resistor import resistor
+from .footprint import (
+    via_stack_footprint,
+    via_array_footprint,
+    tapring_footprint,
+    mimcap_footprint,
+    mimcap_array_footprint,
+    multiplier_footprint,
+    nmos_footprint,
+    pmos_footprint,
+    two_transistor_interdigitized_footprint,
+)
 
 __all__ = [
     'via_stack',
@@ -18,5 +29,14 @@ __all__ = [
     'tapring',
     'mimcap',
     'mimcap_array',
-    'resistor'
+    'resistor',
+    'via_stack_footprint',
+    'via_array_footprint',
+    'tapring_footprint',
+    'mimcap_footprint',
+    'mimcap_array_footprint',
+    'multiplier_footprint',
+    'nmos_footprint',
+    'pmos_footprint',
+    'two_transistor_interdigitized_footprint'
 ] 
\ No newline at end of file
@@ -14,6 +14,7 @@ from glayout.routing.L_route import L_route
 from glayout.util.snap_to_grid import component_snap_to_grid
 from decimal import Decimal
 from glayout.routing.straight_route import straight_route
+from glayout.routing.route_cache import cached_route
 from glayout.spice import Netlist
 
 
@@ -201,7 +202,7 @@ def multiplier(
             sdvia_extension = big_extension if finger % 2 else sdroute_minsep + (sdmet_hieght)/2
             sdvia_ref = align_comp_to_port(sdvia,diff_top_port,alignment=('c','t'))
             multiplier.add(sdvia_ref.movey(sdvia_extension + pdk.snap_to_2xgrid(sd_route_extension)))
-            multiplier << straight_route(pdk, diff_top_port, sdvia_ref.ports["bottom_met_N"])
+            multiplier << cached_route(straight_route, pdk, diff_top_port, sdvia_ref.ports["bottom_met_N"])
             sdvia_ports += [sdvia_ref.ports["top_met_W"], sdvia_ref.ports["top_met_E"]]
             # get the next port (break before this if last iteration because port D.N.E. and num gates=fingers)
             if finger==fingers:
@@ -212,7 +213,7 @@ def multiplier(
             metal_seperation = pdk.util_max_metal_seperation()
             psuedo_Ngateroute = movey(gate_S_port.copy(),0-metal_seperation-gate_route_extension)
             psuedo_Ngateroute.y = pdk.snap_to_2xgrid(psuedo_Ngateroute.y)
-            multiplier << straight_route(pdk,gate_S_port,psuedo_Ngateroute)
+            multiplier << cached_route(straight_route, pdk, gate_S_port, psuedo_Ngateroute)
         # place route met: gate
         gate_width = gate_S_port.center[0] - multiplier.ports["row0_col0_gate_S"].center[0] + gate_S_port.width
         gate = rename_ports_by_list(via_array(pdk,"poly",gate_route_topmet, size=(gate_width,None),num_vias=(None,gate_rmult), no_exception=True, fullbottom=True),[("top_met_","gate_")])
@@ -320,19 +321,19 @@ def __mult_array_macro(
             srcpfx = thismult + "source_"
             this_src = multiplier_arr.ports[srcpfx+sd_side]
             next_src = multiplier_arr.ports[nextmult + "source_"+sd_side]
-            src_ref = multiplier_arr << c_route(pdk, this_src, next_src, viaoffset=(True,False), extension=to_float(src_extension))
+            src_ref = multiplier_arr << cached_route(c_route, pdk, this_src, next_src, viaoffset=(True,False), extension=to_float(src_extension))
             multiplier_arr.add_ports(src_ref.get_ports_list(), prefix=srcpfx)
             # route drains left
             drainpfx = thismult + "drain_"
             this_drain = multiplier_arr.ports[drainpfx+sd_side]
             next_drain = multiplier_arr.ports[nextmult + "drain_"+sd_side]
-            drain_ref = multiplier_arr << c_route(pdk, this_drain, next_drain, viaoffset=(True,False), extension=to_float(drain_extension))
+            drain_ref = multiplier_arr << cached_route(c_route, pdk, this_drain, next_drain, viaoffset=(True,False), extension=to_float(drain_extension))
             multiplier_arr.add_ports(drain_ref.get_ports_list(), prefix=drainpfx)
             # route gates right
             gatepfx = thismult + "gate_"
             this_gate = multiplier_arr.ports[gatepfx+gate_side]
             next_gate = multiplier_arr.ports[nextmult + "gate_"+gate_side]
-            gate_ref = multiplier_arr << c_route(pdk, this_gate, next_gate, viaoffset=(True,False), extension=to_float(src_extension))
+            gate_ref = multiplier_arr << cached_route(c_route, pdk, this_gate, next_gate, viaoffset=(True,False), extension=to_float(src_extension))
             multiplier_arr.add_ports(gate_ref.get_ports_list(), prefix=gatepfx)
     multiplier_arr = component_snap_to_grid(rename_ports_by_orientation(multiplier_arr))
     # add port redirects for shortcut names (source,drain,gate N,E,S,W)
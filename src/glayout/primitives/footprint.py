@@ -0,0 +1,446 @@
+"""
+Footprint (bounding box width, height) estimators computed from the pdk grules without building Components.
+Each estimator follows the construction of its generator (same rules, same snapping) and is vectorized:
+numeric parameters may be numpy arrays (broadcast together), the result is a tuple of (width, height) arrays.
+use validate_footprints.py to compare the estimates against evaluate_bbox of the generated components.
+"""
+
+from typing import Literal, Optional, Union
+
+import numpy as np
+
+from glayout.pdk.mappedpdk import MappedPDK
+
+ArrayLike = Union[float, int, np.ndarray, list]
+
+
+def __snap(pdk: MappedPDK, values: ArrayLike) -> np.ndarray:
+    """vectorized pdk.snap_to_2xgrid (rounds the shortest decimal repr of each float up to twice the grid size)"""
+    inverse_grid = round(1 / (2 * pdk.grid_size or 0.001))
+    values = np.asarray(values, dtype=np.float64)
+    # k/inverse_grid is correctly rounded, so it equals a value exactly when the value repr is a multiple of the grid
+    steps = np.round(values * inverse_grid)
+    steps = np.where(values > steps / inverse_grid, steps + 1, steps)
+    return steps / inverse_grid
+
+
+def __level(glayer: str) -> int:
+    return int(glayer[-1]) if "met" in glayer else 0
+
+
+def __via_layer_dim(pdk: MappedPDK, glayer: str, mode: Literal["both","above","below"]) -> float:
+    """same as the via_stack layer sizing: max of the via enclosures (below and/or above) and the layer min width"""
+    is_lvl0 = __level(glayer) == 0
+    layer_dim = 0
+    if mode in ("both", "below") and not is_lvl0:
+        via_below = "mcon" if glayer == "met1" else "via" + str(__level(glayer) - 1)
+        layer_dim = pdk.get_grule(via_below)["width"] + 2 * pdk.get_grule(via_below, glayer)["min_enclosure"]
+    if mode in ("both", "above"):
+        via_above = "mcon" if is_lvl0 else "via" + str(__level(glayer))
+        layer_dim = max(layer_dim, pdk.get_grule(via_above)["width"] + 2 * pdk.get_grule(via_above, glayer)["min_enclosure"])
+    return max(layer_dim, pdk.get_grule(glayer)["min_width"])
+
+
+def __via_stack_layers(pdk: MappedPDK, glayer1: str, glayer2: str, assume_bottom_via: bool = False) -> dict[str, float]:
+    """returns {glayer: square dim} of every layer (and via) in the via_stack between glayer1 and glayer2"""
+    if __level(glayer1) > __level(glayer2):
+        glayer1, glayer2 = glayer2, glayer1
+    level1, level2 = __level(glayer1), __level(glayer2)
+    dims = dict()
+    for level in range(level1, level2 + 1):
+        layer_name = glayer1 if level == 0 else "met" + str(level)
+        mode = "below" if level == level2 else ("above" if level == level1 else "both")
+        mode = "both" if assume_bottom_via and level == level1 else mode
+        dims[layer_name] = __via_layer_dim(pdk, layer_name, mode)
+        if level != level2:
+            via_name = "mcon" if level == 0 else "via" + str(level)
+            dims[via_name] = pdk.get_grule(via_name)["width"]
+    return dims
+
+
+def via_stack_footprint(pdk: MappedPDK, glayer1: str, glayer2: str, assume_bottom_via: bool = False) -> float:
+    """returns the side of the (square) via_stack between glayer1 and glayer2, 0 if both are on the same level"""
+    if __level(glayer1) == __level(glayer2):
+        return 0.0
+    return round(max(__via_stack_layers(pdk, glayer1, glayer2, assume_bottom_via).values()), 6)
+
+
+def __poly_contact_margin(pdk: MappedPDK, glayer: str) -> float:
+    """returns how far layers laid around poly contacts by the pdk cell decorator (sky130 npc) extend past a poly to glayer via stack"""
+    from glayout.pdk.sky130_mapped.sky130_add_npc import NPC_LICON_ENCLOSURE, sky130_add_npc
+    if getattr(pdk, "default_decorator", None) is not sky130_add_npc:
+        return 0.0
+    return max(0.0, (pdk.get_grule("mcon")["width"] + 2 * NPC_LICON_ENCLOSURE - via_stack_footprint(pdk, "poly", glayer)) / 2)
+
+
+def __via_array_pitch(pdk: MappedPDK, glayer1: str, glayer2: str) -> tuple[float, float]:
+    """returns (via stack spacing, 2*top enclosure) used by via_array to count the vias"""
+    if __level(glayer1) > __level(glayer2):
+        glayer1, glayer2 = glayer2, glayer1
+    level1, level2 = __level(glayer1), __level(glayer2)
+    dims = __via_stack_layers(pdk, glayer1, glayer2)
+    spacing = [] if level1 else [pdk.get_grule("mcon")["min_separation"] + dims["mcon"]]
+    top_enclosure = 0
+    for level in range(max(level1, 1), level2):
+        met, via = "met" + str(level), "via" + str(level)
+        spacing.append(pdk.get_grule(met)["min_separation"] + dims[met])
+        spacing.append(pdk.get_grule(via)["min_separation"] + dims[via])
+        if level == level2 - 1:
+            top_enclosure = pdk.get_grule(glayer2, via)["min_enclosure"]
+    spacing = pdk.snap_to_2xgrid(max(spacing))
+    return tuple(pdk.snap_to_2xgrid([spacing, 2 * pdk.snap_to_2xgrid(top_enclosure)]))
+
+
+def __via_count(pdk: MappedPDK, glayer1: str, glayer2: str, size: ArrayLike, minus1: bool) -> np.ndarray:
+    """number of vias via_array lays along a dimension of the given size"""
+    spacing, top_enclosure = __via_array_pitch(pdk, glayer1, glayer2)
+    count = np.floor(np.round((__snap(pdk, size) - top_enclosure) / spacing, 6))
+    count = np.maximum(count, 1)
+    return np.maximum(count - 1, 1) if minus1 else count
+
+
+def via_array_footprint(
+    pdk: MappedPDK,
+    glayer1: str,
+    glayer2: str,
+    size: Optional[tuple[Optional[ArrayLike], Optional[ArrayLike]]] = None,
+    minus1: bool = False,
+    num_vias: Optional[tuple[Optional[ArrayLike], Optional[ArrayLike]]] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of via_array with the same size/minus1/num_vias arguments
+    the top metal is max(size, via array extent) in each dimension"""
+    if __level(glayer1) == __level(glayer2):
+        return np.zeros(1), np.zeros(1)
+    viadim = via_stack_footprint(pdk, glayer1, glayer2)
+    spacing = __via_array_pitch(pdk, glayer1, glayer2)[0]
+    dims = list()
+    for i in range(2):
+        dim_size = None if size is None else size[i]
+        if num_vias is not None and num_vias[i] is not None:
+            count = np.asarray(num_vias[i], dtype=np.float64)
+        elif dim_size is not None:
+            count = __via_count(pdk, glayer1, glayer2, dim_size, minus1)
+        else:
+            raise ValueError("give at least 1: num_vias or size for each dim")
+        extent = np.round((count - 1) * spacing + viadim, 6)
+        dims.append(extent if dim_size is None else np.maximum(extent, np.asarray(dim_size, dtype=np.float64)))
+    return dims[0], dims[1]
+
+
+def tapring_footprint(
+    pdk: MappedPDK,
+    enclosed_rectangle: tuple[ArrayLike, ArrayLike] = (2.0, 4.0),
+    sdlayer: str = "p+s/d",
+    horizontal_glayer: str = "met2",
+    vertical_glayer: str = "met1",
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of tapring (all sides) enclosing enclosed_rectangle"""
+    enclosed = [__snap(pdk, dim) for dim in enclosed_rectangle]
+    tap_width = max(
+        pdk.get_grule("active_tap")["min_width"],
+        2 * pdk.get_grule("active_tap", "mcon")["min_enclosure"] + pdk.get_grule("mcon")["width"],
+    )
+    # the s/d implant ring extends past the tap ring by its enclosure
+    ring = tap_width + pdk.get_grule("active_tap", sdlayer)["min_enclosure"]
+    # via arrays are centered on the tap ring, the corners are connected with L routes (a via between the two metals)
+    via_horizontal = via_stack_footprint(pdk, "active_tap", horizontal_glayer)
+    via_vertical = via_stack_footprint(pdk, "active_tap", vertical_glayer)
+    corner = via_stack_footprint(pdk, horizontal_glayer, vertical_glayer)
+    side_horizontal = max(ring, (tap_width + max(via_horizontal, corner)) / 2)
+    side_vertical = max(ring, (tap_width + max(via_vertical, corner)) / 2)
+    via_arrays = [
+        via_array_footprint(pdk, "active_tap", horizontal_glayer, (enclosed[0], via_horizontal), minus1=True)[0],
+        via_array_footprint(pdk, "active_tap", vertical_glayer, (via_vertical, enclosed[1]), minus1=True)[1],
+    ]
+    width = np.maximum(enclosed[0] + 2 * side_vertical, via_arrays[0])
+    height = np.maximum(enclosed[1] + 2 * side_horizontal, via_arrays[1])
+    return np.round(width, 6), np.round(height, 6)
+
+
+def mimcap_footprint(pdk: MappedPDK, size: tuple[ArrayLike, ArrayLike] = (5.0, 5.0)) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of mimcap, the bottom metal encloses the capmet and the top via array"""
+    capmettop = pdk.layer_to_glayer(pdk.get_grule("capmet")["capmettop"])
+    capmetbottom = pdk.layer_to_glayer(pdk.get_grule("capmet")["capmetbottom"])
+    size = [__snap(pdk, dim) for dim in size]
+    top = via_array_footprint(pdk, capmetbottom, capmettop, size=size, minus1=True)
+    enclosure = 2 * pdk.get_grule(capmetbottom, "capmet")["min_enclosure"]
+    return np.round(top[0] + enclosure, 6), np.round(top[1] + enclosure, 6)
+
+
+def mimcap_array_footprint(pdk: MappedPDK, rows: ArrayLike, columns: ArrayLike, size: tuple[ArrayLike, ArrayLike] = (5.0, 5.0)) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of mimcap_array (rows x columns caps seperated by the capmet min separation)"""
+    width, height = mimcap_footprint(pdk, size)
+    space = pdk.get_grule("capmet")["min_separation"]
+    columns, rows = np.asarray(columns, dtype=np.float64), np.asarray(rows, dtype=np.float64)
+    return np.round(columns * width + (columns - 1) * space, 6), np.round(rows * height + (rows - 1) * space, 6)
+
+
+def __finger_geometry(pdk: MappedPDK, width: ArrayLike, length: Optional[ArrayLike], interfinger_rmult: int, inter_finger_topmet: str) -> dict:
+    """returns the dims shared by the finger arrays (__gen_fingers_macro) of multiplier and its dummies"""
+    min_length = pdk.get_grule("poly")["min_width"]
+    length = __snap(pdk, np.maximum(np.asarray(0 if length is None else length, dtype=np.float64), min_length))
+    min_width = max(min_length, pdk.get_grule("active_diff")["min_width"])
+    width = __snap(pdk, np.maximum(np.asarray(width, dtype=np.float64), min_width))
+    sd_viaxdim = interfinger_rmult * via_stack_footprint(pdk, "active_diff", "met1")
+    poly_spacing = max(sd_viaxdim, 2 * pdk.get_grule("poly", "mcon")["min_separation"] + pdk.get_grule("mcon")["width"])
+    met1_minsep = pdk.get_grule("met1")["min_separation"]
+    poly_spacing = poly_spacing + np.where(length < met1_minsep, met1_minsep, 0)
+    # source/drain via arrays between the fingers
+    sd_dims = via_array_footprint(pdk, "active_diff", "met1", size=(sd_viaxdim, width), minus1=True)
+    interfinger_dims = via_array_footprint(pdk, "met1", inter_finger_topmet, size=(None, width), num_vias=(1, None))
+    return {
+        "length": length,
+        "width": width,
+        "pitch": np.round(poly_spacing + length, 6),
+        "sd_x": np.maximum(sd_dims[0], interfinger_dims[0]),
+        "sd_y": np.maximum(sd_dims[1], interfinger_dims[1]),
+        "poly_height": width + 2 * pdk.get_grule("poly", "active_diff")["overhang"],
+    }
+
+
+def __dummy_counts(dummy: Union[bool, tuple[bool, bool]]) -> tuple[int, int]:
+    return (int(dummy), int(dummy)) if isinstance(dummy, bool) else (int(dummy[0]), int(dummy[1]))
+
+
+def __multiplier_extents(
+    pdk: MappedPDK,
+    sdlayer: str,
+    width: ArrayLike,
+    length: Optional[ArrayLike],
+    fingers: ArrayLike,
+    routing: bool,
+    inter_finger_topmet: str,
+    dummy: Union[bool, tuple[bool, bool]],
+    sd_route_topmet: str,
+    gate_route_topmet: str,
+    sd_rmult: int,
+    gate_rmult: int,
+    interfinger_rmult: int,
+    sd_route_extension: ArrayLike = 0,
+    gate_route_extension: ArrayLike = 0,
+) -> dict:
+    """returns the extents of multiplier relative to its origin (center of the fingers) {left, right, bottom, top}
+    and the route dims needed by the array/placement estimators
+    ****NOTE: with a poly contact decorator (sky130 npc) the bottom extends gate_margin past the gate via array"""
+    fingers = np.asarray(fingers, dtype=np.float64)
+    geometry = __finger_geometry(pdk, width, length, interfinger_rmult, inter_finger_topmet)
+    pitch, width = geometry["pitch"], geometry["width"]
+    enclosure = pdk.get_grule("mcon", "active_diff")["min_enclosure"] + pdk.get_grule(sdlayer, "active_diff")["min_enclosure"]
+    # plus doped region around the finger array
+    half_x = (fingers * pitch + geometry["sd_x"]) / 2 + enclosure
+    top = np.maximum.reduce([width / 2 + pdk.get_grule(sdlayer, "active_diff")["min_enclosure"], geometry["poly_height"] / 2, geometry["sd_y"] / 2])
+    bottom = -top
+    extents = dict()
+    if routing:
+        sdvia = via_stack_footprint(pdk, "met1", sd_route_topmet)
+        sd_height = sd_rmult * sdvia
+        sd_minsep = pdk.get_grule(sd_route_topmet)["min_separation"]
+        # drain via (odd s/d) is above the source via, routes are centered on the vias
+        drain_via_bottom = width / 2 + 2 * sd_minsep + 1.5 * sd_height + __snap(pdk, sd_route_extension)
+        drain_center = drain_via_bottom + sdvia / 2
+        top = np.maximum(top, np.maximum(drain_via_bottom + sdvia, drain_center + sd_height / 2))
+        sd_route_x = fingers * pitch + sdvia
+        half_x = np.maximum(half_x, sd_route_x / 2)
+        # gate via array below the poly
+        gate_port_y = -__snap(pdk, geometry["poly_height"] / 2 + pdk.util_max_metal_seperation() + np.asarray(gate_route_extension, dtype=np.float64))
+        gate_x, gate_y = via_array_footprint(pdk, "poly", gate_route_topmet, size=((fingers - 1) * pitch + geometry["length"], None), num_vias=(None, gate_rmult))
+        gate_margin = __poly_contact_margin(pdk, gate_route_topmet)
+        # the gate ports are on the top metal of the gate via array
+        gate_port_width = (gate_rmult - 1) * __via_array_pitch(pdk, "poly", gate_route_topmet)[0] + via_stack_footprint(pdk, "poly", gate_route_topmet)
+        bottom = np.minimum(bottom, gate_port_y - gate_y - gate_margin)
+        half_x = np.maximum(half_x, gate_x / 2 + gate_margin)
+        extents.update(sd_route_x=sd_route_x, sd_height=sd_height, gate_x=gate_x, gate_port_width=gate_port_width, gate_center=gate_port_y - gate_y / 2, drain_top=drain_center + sd_height / 2, gate_S=gate_port_y - gate_y)
+    left_dummy, right_dummy = __dummy_counts(dummy)
+    if left_dummy or right_dummy:
+        # dummies are single finger arrays (met1 only) placed the s/d implant separation away, shorted by a poly-met1 via below the poly
+        dummy_geometry = __finger_geometry(pdk, width, length, interfinger_rmult, "met1")
+        dummy_x = dummy_geometry["pitch"] + dummy_geometry["sd_x"] + 2 * enclosure
+        dummy_space = pdk.get_grule(sdlayer)["min_separation"] + dummy_x
+        bottom = np.minimum(bottom, -geometry["poly_height"] / 2 - via_stack_footprint(pdk, "poly", "met1") - __poly_contact_margin(pdk, "met1"))
+    else:
+        dummy_space = 0
+    extents.update(
+        left=-(half_x + left_dummy * dummy_space),
+        right=half_x + right_dummy * dummy_space,
+        bottom=bottom,
+        top=top,
+        core_half_x=half_x,
+    )
+    return extents
+
+
+def multiplier_footprint(
+    pdk: MappedPDK,
+    sdlayer: str,
+    width: ArrayLike = 3,
+    length: Optional[ArrayLike] = None,
+    fingers: ArrayLike = 1,
+    routing: bool = True,
+    inter_finger_topmet: str = "met2",
+    dummy: Union[bool, tuple[bool, bool]] = True,
+    sd_route_topmet: str = "met2",
+    gate_route_topmet: str = "met2",
+    rmult: Optional[int] = None,
+    sd_rmult: int = 1,
+    gate_rmult: int = 1,
+    interfinger_rmult: int = 1,
+    sd_route_extension: ArrayLike = 0,
+    gate_route_extension: ArrayLike = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of multiplier with the same arguments (length None or below min means min length)"""
+    if rmult:
+        sd_rmult, gate_rmult, interfinger_rmult = rmult, 1, ((rmult - 1) or 1)
+    extents = __multiplier_extents(pdk, sdlayer, width, length, fingers, routing, inter_finger_topmet, dummy, sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult, sd_route_extension, gate_route_extension)
+    return np.round(extents["right"] - extents["left"], 6), np.round(extents["top"] - extents["bottom"], 6)
+
+
+def __array_extents(pdk: MappedPDK, sdlayer: str, width, fingers, multipliers, dummy, length, sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of the multiplier array of a fet (rows of multipliers connected with c routes)"""
+    extents = __multiplier_extents(pdk, sdlayer, width, length, fingers, True, "met2", dummy, sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult)
+    multipliers = np.asarray(multipliers, dtype=np.float64)
+    row_height = extents["top"] - extents["bottom"]
+    row_pitch = max(pdk.get_grule("met" + str(i))["min_separation"] for i in range(1, 5)) + row_height
+    # source/drain c routes on the left, gate c routes on the right (only with more than 1 multiplier)
+    # the vertical part of a c route is as wide as the narrower port, centered on the via
+    src_extension = 0.6
+    drain_extension = src_extension + 3 * pdk.get_grule("met4")["min_separation"]
+    sd_cvia = via_stack_footprint(pdk, sd_route_topmet, "met" + str(__level(sd_route_topmet) + 1), assume_bottom_via=True)
+    gate_cvia = via_stack_footprint(pdk, gate_route_topmet, "met" + str(__level(gate_route_topmet) + 1), assume_bottom_via=True)
+    sd_reach = drain_extension + sd_cvia / 2 + np.maximum(sd_cvia, extents["sd_height"]) / 2
+    gate_reach = src_extension + gate_cvia / 2 + np.maximum(gate_cvia, extents["gate_port_width"]) / 2
+    left = np.where(multipliers > 1, np.minimum(extents["left"], -extents["sd_route_x"] / 2 - sd_reach), extents["left"])
+    right = np.where(multipliers > 1, np.maximum(extents["right"], extents["gate_x"] / 2 + gate_reach), extents["right"])
+    # the gate via of the bottom row is moved down to be flush with the gate route
+    gate_via_bottom = extents["gate_center"] - np.maximum(gate_cvia - extents["gate_port_width"] / 2, extents["gate_port_width"] / 2)
+    bottom = np.where(multipliers > 1, np.minimum(extents["bottom"], gate_via_bottom), extents["bottom"])
+    height = (multipliers - 1) * row_pitch + extents["top"] - bottom
+    return right - left, height
+
+
+def __enclosing(pdk: MappedPDK, width: np.ndarray, height: np.ndarray, separation: float) -> tuple[np.ndarray, np.ndarray]:
+    """returns the rectangle a ring encloses around a centered width x height component: 2*(separation + xmax, ymax)
+    a centered component with an odd number of grid steps extends one grid step further on its max side"""
+    grid = pdk.grid_size or 0.001
+    return tuple(np.round(2 * (separation + np.ceil(np.round(np.asarray(dim) / (2 * grid), 6)) * grid), 6) for dim in (width, height))
+
+
+def __fet_footprint(pdk: MappedPDK, width: np.ndarray, height: np.ndarray, tie_sdlayer: Optional[str], tie_separation: float, tie_layers: tuple[str,str], well_enclosure: float, substrate_tap: bool, substrate_tap_layers: tuple[str,str]) -> tuple[np.ndarray, np.ndarray]:
+    """adds the tie ring, well padding and substrate tap ring around a centered core of width x height"""
+    if tie_sdlayer is not None:
+        width, height = tapring_footprint(pdk, __enclosing(pdk, width, height, tie_separation), tie_sdlayer, *tie_layers)
+    width, height = width + 2 * well_enclosure, height + 2 * well_enclosure
+    if substrate_tap:
+        separation = pdk.get_grule("dnwell", "active_tap")["min_separation"]
+        width, height = tapring_footprint(pdk, __enclosing(pdk, width, height, separation), "p+s/d", *substrate_tap_layers)
+    return np.round(width, 6), np.round(height, 6)
+
+
+def nmos_footprint(
+    pdk: MappedPDK,
+    width: ArrayLike = 3,
+    fingers: ArrayLike = 1,
+    multipliers: ArrayLike = 1,
+    with_tie: bool = True,
+    with_dummy: Union[bool, tuple[bool, bool]] = True,
+    with_dnwell: bool = True,
+    with_substrate_tap: bool = True,
+    length: Optional[ArrayLike] = None,
+    sd_route_topmet: str = "met2",
+    gate_route_topmet: str = "met2",
+    rmult: Optional[int] = None,
+    sd_rmult: int = 1,
+    gate_rmult: int = 1,
+    interfinger_rmult: int = 1,
+    tie_layers: tuple[str,str] = ("met2","met1"),
+    substrate_tap_layers: tuple[str,str] = ("met2","met1"),
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of nmos with the same arguments"""
+    if rmult:
+        sd_rmult, gate_rmult, interfinger_rmult = rmult, 1, ((rmult - 1) or 1)
+    core = __array_extents(pdk, "n+s/d", width, fingers, multipliers, with_dummy, length, sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult)
+    tie_separation = max(pdk.util_max_metal_seperation(), pdk.get_grule("active_diff", "active_tap")["min_separation"]) + pdk.get_grule("p+s/d", "active_tap")["min_enclosure"]
+    well_enclosure = pdk.get_grule("pwell", "active_tap")["min_enclosure"]
+    if with_dnwell:
+        well_enclosure += pdk.get_grule("pwell", "dnwell")["min_enclosure"]
+    return __fet_footprint(pdk, *core, "p+s/d" if with_tie else None, tie_separation, tie_layers, well_enclosure, with_substrate_tap, substrate_tap_layers)
+
+
+def pmos_footprint(
+    pdk: MappedPDK,
+    width: ArrayLike = 3,
+    fingers: ArrayLike = 1,
+    multipliers: ArrayLike = 1,
+    with_tie: bool = True,
+    dnwell: bool = False,
+    with_dummy: Union[bool, tuple[bool, bool]] = True,
+    with_substrate_tap: bool = True,
+    length: Optional[ArrayLike] = None,
+    sd_route_topmet: str = "met2",
+    gate_route_topmet: str = "met2",
+    rmult: Optional[int] = None,
+    sd_rmult: int = 1,
+    gate_rmult: int = 1,
+    interfinger_rmult: int = 1,
+    tie_layers: tuple[str,str] = ("met2","met1"),
+    substrate_tap_layers: tuple[str,str] = ("met2","met1"),
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of pmos with the same arguments"""
+    if rmult:
+        sd_rmult, gate_rmult, interfinger_rmult = rmult, 1, ((rmult - 1) or 1)
+    core = __array_extents(pdk, "p+s/d", width, fingers, multipliers, with_dummy, length, sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult)
+    tie_separation = max(
+        pdk.get_grule("met2")["min_separation"],
+        pdk.get_grule("met1")["min_separation"],
+        pdk.get_grule("active_diff", "active_tap")["min_separation"],
+    ) + pdk.get_grule("n+s/d", "active_tap")["min_enclosure"]
+    well_enclosure = pdk.get_grule("active_tap", "dnwell" if dnwell else "nwell")["min_enclosure"]
+    return __fet_footprint(pdk, *core, "n+s/d" if with_tie else None, tie_separation, tie_layers, well_enclosure, with_substrate_tap, substrate_tap_layers)
+
+
+def two_transistor_interdigitized_footprint(
+    pdk: MappedPDK,
+    device: Literal["nfet","pfet"],
+    numcols: ArrayLike,
+    dummy: Union[bool, tuple[bool, bool]] = True,
+    with_substrate_tap: bool = True,
+    with_tie: bool = True,
+    tie_layers: tuple[str,str] = ("met2","met1"),
+    width: ArrayLike = 3,
+    length: Optional[ArrayLike] = None,
+    fingers: ArrayLike = 1,
+    inter_finger_topmet: str = "met2",
+    sd_route_topmet: str = "met2",
+    gate_route_topmet: str = "met2",
+    rmult: Optional[int] = None,
+    sd_rmult: int = 1,
+    gate_rmult: int = 1,
+    interfinger_rmult: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns (width, height) of two_transistor_interdigitized with the same arguments (multiplier kwargs as keywords)"""
+    if rmult:
+        sd_rmult, gate_rmult, interfinger_rmult = rmult, 1, ((rmult - 1) or 1)
+    sdlayer = "n+s/d" if device == "nfet" else "p+s/d"
+    route_args = (True, inter_finger_topmet, False, sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult)
+    center_a = __multiplier_extents(pdk, sdlayer, width, length, fingers, *route_args)
+    geometry = __finger_geometry(pdk, width, length, interfinger_rmult, inter_finger_topmet)
+    # device B routes are extended past the device A routes
+    # same float arithmetic as the generator (port coordinates are on grid) so that snapping rounds the same way
+    sd_extension = pdk.util_max_metal_seperation() + np.abs(np.round(center_a["drain_top"], 6) - np.round(geometry["width"] / 2, 6))
+    gate_extension = pdk.util_max_metal_seperation() + np.abs(np.round(-geometry["poly_height"] / 2, 6) - np.round(center_a["gate_S"], 6))
+    center_b = __multiplier_extents(pdk, sdlayer, width, length, fingers, *route_args, __snap(pdk, sd_extension), __snap(pdk, gate_extension))
+    left_dummy, right_dummy = __dummy_counts(dummy)
+    dummy_ends = __multiplier_extents(pdk, sdlayer, width, length, fingers, True, inter_finger_topmet, (bool(left_dummy), bool(right_dummy)), sd_route_topmet, gate_route_topmet, sd_rmult, gate_rmult, interfinger_rmult)
+    # devices are placed every (device width + diffusion separation)
+    device_x = np.round(center_a["right"] - center_a["left"], 6)
+    xdisp = __snap(pdk, device_x + pdk.get_grule("active_diff")["min_separation"])
+    numcols = np.asarray(numcols, dtype=np.float64)
+    core_width = (2 * numcols - 1) * xdisp - dummy_ends["left"] + dummy_ends["right"]
+    core_height = np.maximum.reduce([center_a["top"], center_b["top"], dummy_ends["top"]]) - np.minimum.reduce([center_a["bottom"], center_b["bottom"], dummy_ends["bottom"]])
+    if device == "nfet":
+        tie_separation = max(pdk.util_max_metal_seperation(), pdk.get_grule("active_diff", "active_tap")["min_separation"]) + pdk.get_grule("p+s/d", "active_tap")["min_enclosure"]
+        well_enclosure = pdk.get_grule("pwell", "active_tap")["min_enclosure"]
+    else:
+        tie_separation = max(pdk.util_max_metal_seperation(), pdk.get_grule("active_diff", "active_tap")["min_separation"]) + pdk.get_grule("n+s/d", "active_tap")["min_enclosure"]
+        well_enclosure = pdk.get_grule("nwell", "active_tap")["min_enclosure"]
+    tie_sdlayer = ("p+s/d" if device == "nfet" else "n+s/d") if with_tie else None
+    return __fet_footprint(pdk, core_width, core_height, tie_sdlayer, tie_separation, tie_layers, well_enclosure, with_substrate_tap, ("met2", "met1"))
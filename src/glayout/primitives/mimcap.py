@@ -8,6 +8,7 @@ from glayout.util.comp_utils import prec_array, to_decimal, to_float
 from glayout.util.port_utils import rename_ports_by_orientation, add_ports_perimeter, print_ports
 from pydantic import validate_arguments
 from glayout.routing.straight_route import straight_route
+from glayout.routing.route_cache import cached_route
 from decimal import ROUND_UP, Decimal
 from glayout.spice import Netlist
 
@@ -126,7 +127,7 @@ def mimcap_array(pdk: MappedPDK, rows: int, columns: int, size: tuple[float,floa
 					port_pairs.append((bl_east_port,r_west_port,layer))
 					port_pairs.append((bl_north_port,top_south_port,layer))
 	for port_pair in port_pairs:
-		mimcap_arr << straight_route(pdk,port_pair[0],port_pair[1],width=rmult*pdk.get_grule(port_pair[2])["min_width"])
+		mimcap_arr << cached_route(straight_route,pdk,port_pair[0],port_pair[1],width=rmult*pdk.get_grule(port_pair[2])["min_width"])
 
 	# add netlist
 	mimcap_arr.info['netlist'] = __generate_mimcap_array_netlist(mimcap_single.info['netlist'], rows * columns)
@@ -0,0 +1,132 @@
+"""
+Validation of the footprint estimators (footprint.py) against generated components.
+
+For every generator, samples parameters from a grid, builds the components and compares
+evaluate_bbox with the estimate (computed in one vectorized call over all samples).
+Reports the max absolute and relative error of width and height, and the time per sample
+of generation vs estimation.
+
+usage: python validate_footprints.py [--pdk sky130 gf180] [--samples 6] [--generators multiplier nmos ...]
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from glayout.primitives import footprint
+from glayout.primitives.fet import multiplier, nmos, pmos
+from glayout.primitives.guardring import tapring
+from glayout.primitives.mimcap import mimcap_array
+from glayout.primitives.via_gen import via_array
+from glayout.placement.two_transistor_interdigitized import two_transistor_interdigitized
+from glayout.util.comp_utils import evaluate_bbox
+
+# generator name: (grid of sample parameters, build(pdk, **sample), estimate(pdk, **{name: array of values}))
+GENERATORS = {
+    "via_array": (
+        {"width": [0.5, 1.3, 2.77, 6.0], "height": [0.5, 0.9, 4.2], "glayer2": ["met1", "met2", "met3"]},
+        lambda pdk, width, height, glayer2: via_array(pdk, "active_diff", glayer2, size=(width, height)),
+        None,
+    ),
+    "tapring": (
+        {"width": [2.0, 3.37, 10.0], "height": [2.0, 4.0, 7.55]},
+        lambda pdk, width, height: tapring(pdk, enclosed_rectangle=(width, height)),
+        lambda pdk, width, height: footprint.tapring_footprint(pdk, (width, height)),
+    ),
+    "mimcap_array": (
+        {"rows": [1, 2, 3], "columns": [1, 2], "side": [5.0, 7.3]},
+        lambda pdk, rows, columns, side: mimcap_array(pdk, int(rows), int(columns), size=(side, side)),
+        lambda pdk, rows, columns, side: footprint.mimcap_array_footprint(pdk, rows, columns, size=(side, side)),
+    ),
+    "multiplier": (
+        {"width": [0.5, 1.0, 3.0, 7.3], "length": [0.15, 0.5, 1.0], "fingers": [1, 2, 5]},
+        lambda pdk, width, length, fingers: multiplier(pdk, "n+s/d", width=width, length=length, fingers=int(fingers)),
+        lambda pdk, width, length, fingers: footprint.multiplier_footprint(pdk, "n+s/d", width=width, length=length, fingers=fingers),
+    ),
+    "nmos": (
+        {"width": [1.0, 3.0, 5.0], "fingers": [1, 2, 4], "multipliers": [1, 2]},
+        lambda pdk, width, fingers, multipliers: nmos(pdk, width=width, fingers=int(fingers), multipliers=int(multipliers)),
+        lambda pdk, width, fingers, multipliers: footprint.nmos_footprint(pdk, width=width, fingers=fingers, multipliers=multipliers),
+    ),
+    "pmos": (
+        {"width": [1.0, 3.0, 5.0], "fingers": [1, 2, 4], "multipliers": [1, 2]},
+        lambda pdk, width, fingers, multipliers: pmos(pdk, width=width, fingers=int(fingers), multipliers=int(multipliers)),
+        lambda pdk, width, fingers, multipliers: footprint.pmos_footprint(pdk, width=width, fingers=fingers, multipliers=multipliers),
+    ),
+    "two_transistor_interdigitized": (
+        {"numcols": [1, 2, 3], "width": [1.0, 3.0], "fingers": [1, 2]},
+        lambda pdk, numcols, width, fingers: two_transistor_interdigitized(pdk, "nfet", int(numcols), width=width, fingers=int(fingers)),
+        lambda pdk, numcols, width, fingers: footprint.two_transistor_interdigitized_footprint(pdk, "nfet", numcols, width=width, fingers=fingers),
+    ),
+}
+
+
+def via_array_estimate(pdk, width, height, glayer2):
+    """via_array_footprint takes a single glayer pair, estimate each top metal separately"""
+    estimate = [np.zeros(len(width)), np.zeros(len(width))]
+    for glayer in set(glayer2):
+        mask = np.asarray(glayer2) == glayer
+        dims = footprint.via_array_footprint(pdk, "active_diff", glayer, size=(width[mask], height[mask]))
+        estimate[0][mask], estimate[1][mask] = dims
+    return estimate
+
+
+def load_pdk(name: str):
+    if name == "sky130":
+        from glayout.pdk.sky130_mapped import sky130_mapped_pdk as pdk
+    else:
+        from glayout.pdk.gf180_mapped import gf180_mapped_pdk as pdk
+    return pdk
+
+
+def validate(pdk, name: str, samples: int, rng: np.random.Generator) -> dict:
+    grid, build, estimate = GENERATORS[name]
+    estimate = estimate or via_array_estimate
+    keys = list(grid)
+    points = list(itertools.product(*grid.values()))
+    points = [points[i] for i in sorted(rng.choice(len(points), size=min(samples, len(points)), replace=False))]
+    start = time.perf_counter()
+    real = np.array([evaluate_bbox(build(pdk, **dict(zip(keys, point)))) for point in points])
+    build_time = time.perf_counter() - start
+    columns = {key: np.array([point[i] for point in points]) for i, key in enumerate(keys)}
+    start = time.perf_counter()
+    est = np.stack([np.broadcast_to(dim, (len(points),)) for dim in estimate(pdk, **columns)], axis=1)
+    estimate_time = time.perf_counter() - start
+    error = np.abs(est - real)
+    worst = int(np.argmax(error.max(axis=1)))
+    return {
+        "samples": len(points),
+        "max_abs": error.max(axis=0),
+        "max_rel": (error / real).max(axis=0),
+        "worst": dict(zip(keys, points[worst])),
+        "build_ms": 1e3 * build_time / len(points),
+        "estimate_us": 1e6 * estimate_time / len(points),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compare the footprint estimators with evaluate_bbox of the generated components")
+    parser.add_argument("--pdk", nargs="+", default=["sky130", "gf180"], choices=["sky130", "gf180"])
+    parser.add_argument("--samples", type=int, default=6, help="number of grid points sampled per generator")
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for pdk_name in args.pdk:
+        pdk = load_pdk(pdk_name)
+        pdk.activate()
+        for name in args.generators:
+            result = validate(pdk, name, args.samples, rng)
+            print(
+                f"{pdk_name:7s} {name:30s} n={result['samples']:3d}"
+                f" max abs err (w, h) = ({result['max_abs'][0]:.3f}, {result['max_abs'][1]:.3f}) um"
+                f" max rel err = ({100 * result['max_rel'][0]:.2f}, {100 * result['max_rel'][1]:.2f}) %"
+                f" build {result['build_ms']:.1f} ms/sample, estimate {result['estimate_us']:.1f} us/sample"
+                f" worst at {result['worst']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
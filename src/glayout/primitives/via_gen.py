@@ -15,6 +15,7 @@ from typing import Optional, Union
 from glayout.util.comp_utils import evaluate_bbox, prec_array, to_float, move, prec_ref_center, to_decimal
 from glayout.util.port_utils import rename_ports_by_orientation, print_ports
 from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.spatial_index import layer_bbox, layer_dims
 from decimal import Decimal
 from typing import Literal
 
@@ -75,7 +76,7 @@ def __get_layer_dim(pdk: MappedPDK, glayer: str, mode: Literal["both","above","b
 @validate_arguments
 def __get_viastack_minseperation(pdk: MappedPDK, viastack: Component, ordered_layer_info) -> tuple[float,float]:
     """internal use: return absolute via separation and top_enclosure (top via to top met enclosure)"""
-    get_sep = lambda _pdk, rule, _lay_, comp : (rule+2*comp.extract(layers=[_pdk.get_glayer(_lay_)]).xmax)
+    get_sep = lambda _pdk, rule, _lay_, comp : (rule+2*layer_bbox(comp, _pdk.get_glayer(_lay_))[1][0])
     level1, level2 = ordered_layer_info[0]
     glayer1, glayer2 = ordered_layer_info[1]
     mcon_rule = pdk.get_grule("mcon")["min_separation"]
@@ -261,7 +262,7 @@ def via_array(
     size = [viadims[i] if viadims[i]>size[i] else size[i] for i in range(2)]
     # place bottom layer and add bot_lay_ ports
     if lay_bottom or fullbottom or lay_every_layer:
-        bdims = evaluate_bbox(viaarray.extract(layers=[pdk.get_glayer(glayer1)]))
+        bdims = layer_dims(viaarray, pdk.get_glayer(glayer1))
         bref = viaarray << rectangle(size=(size if fullbottom else bdims), layer=pdk.get_glayer(glayer1), centered=True)
         viaarray.add_ports(bref.get_ports_list(), prefix="bottom_lay_")
     else:
@@ -272,8 +273,15 @@ def via_array(
     # place every layer in between if lay_every_layer
     if lay_every_layer:
         for i in range(level1+1,level2):
-            bdims = evaluate_bbox(viaarray.extract(layers=[pdk.get_glayer(f"met{i}")]))
+            bdims = layer_dims(viaarray, pdk.get_glayer(f"met{i}"))
             viaarray << rectangle(size=bdims, layer=pdk.get_glayer(f"met{i}"), centered=True)
     return component_snap_to_grid(rename_ports_by_orientation(viaarray))
 
 
+
+
+def via_level_count(pdk: MappedPDK, via: Component) -> int:
+    """returns the number of via layers (mcon, via1, ...) drawn in via, e.g. 2 for a met1 to met3 via_stack
+    and 0 for the plain rectangles routes put in place of a via between two ports on the same layer"""
+    via_glayers = [glayer for glayer in ("mcon", "via1", "via2", "via3", "via4") if glayer in pdk.glayers]
+    return len({pdk.get_glayer(glayer) for glayer in via_glayers} & set(via.layers))
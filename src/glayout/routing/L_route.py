@@ -3,7 +3,7 @@ from gdsfactory.component import Component
 from gdsfactory.port import Port
 from glayout.pdk.mappedpdk import MappedPDK
 from typing import Optional, Union
-from glayout.primitives.via_gen import via_stack, via_array
+from glayout.primitives.via_gen import via_stack, via_array, via_level_count
 from glayout.util.comp_utils import evaluate_bbox, align_comp_to_port, to_decimal, to_float, prec_ref_center, get_primitive_rectangle
 from glayout.util.port_utils import rename_ports_by_orientation, rename_ports_by_list, print_ports, assert_port_manhattan, assert_ports_perpindicular
 from decimal import Decimal
@@ -46,6 +46,7 @@ def L_route(
 	viaoffset = push the via away from both edges so that inside corner aligns with via corner
 	****via offset can also be specfied as a tuple(bool,bool): movex? if viaoffset[0] and movey? if viaoffset[1]
 	fullbottom = fullbottom option for via
+	info has wirelength (lengths of the drawn vertical and horizontal connections) and via_count (via levels drawn)
 	"""
 	# error checking, TODO: validate layers
 	assert_port_manhattan([edge1,edge2])
@@ -104,6 +105,8 @@ def L_route(
 		h_to_v_via_ref.movex(viaxofs).movey(viayofs)
 	# add ports and return
 	Lroute.add_ports(h_to_v_via_ref.get_ports_list())
+	Lroute.info["wirelength"] = float(hdim + vdim)
+	Lroute.info["via_count"] = via_level_count(pdk,hv_via)
 	return rename_ports_by_orientation(Lroute.flatten())
 
 
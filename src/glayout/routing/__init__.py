@@ -6,10 +6,19 @@ from .c_route import c_route
 from .L_route import L_route
 from .straight_route import straight_route
 from .smart_route import smart_route
+from .maze_route import maze_route, MazeRouteError
+from .route_cache import RouteCache, cached_route, route_cache
+from .route_nets import route_nets
 
 __all__ = [
     'c_route',
     'L_route',
     'straight_route',
-    'smart_route'   
+    'smart_route',
+    'maze_route',
+    'MazeRouteError',
+    'RouteCache',
+    'cached_route',
+    'route_cache',
+    'route_nets',
 ] 
@@ -4,7 +4,7 @@ from gdsfactory.port import Port
 from glayout.pdk.mappedpdk import MappedPDK
 from typing import Optional, Union
 from math import isclose
-from glayout.primitives.via_gen import via_stack, via_array
+from glayout.primitives.via_gen import via_stack, via_array, via_level_count
 from glayout.routing.straight_route import straight_route
 from gdsfactory.components.rectangle import rectangle
 from glayout.util.comp_utils import evaluate_bbox, get_primitive_rectangle, to_float, prec_ref_center
@@ -62,6 +62,7 @@ def c_route(
     - None means center (no offset)
     ****NOTE: viaoffset pushes both vias towards each other slightly
     extra_vias = adds extra vias at intermediate nodes if metal width permits
+    info has wirelength (lengths of the drawn extensions and connection) and via_count (via levels drawn)
     """
     if debug:
         pass
@@ -260,10 +261,13 @@ def c_route(
     route_port1 = route_ports[1].copy()
     route_port0.layer = route_port1.layer = pdk.get_glayer(cglayer)
     cconnection = croute << straight_route(pdk, route_port0,route_port1,glayer1=cglayer,glayer2=cglayer)
+    connections = [cconnection.parent]
     for _port in fix_ports:
         port2 = cconnection.ports["route_"+fix_connection_direction]
         port2.layer = _port.layer = pdk.get_glayer(cglayer)
-        croute << straight_route(pdk, _port, port2, glayer1=cglayer,glayer2=cglayer)
+        connections.append((croute << straight_route(pdk, _port, port2, glayer1=cglayer,glayer2=cglayer)).parent)
+    croute.info["wirelength"] = e1_length + e2_length + sum(connection.info["wirelength"] for connection in connections)
+    croute.info["via_count"] = via_level_count(pdk,viastack1) + via_level_count(pdk,viastack2)
     for i,port_to_add in enumerate(route_ports):
         orta = get_orientation(port_to_add.orientation)
         route_ports[i] = set_port_orientation(port_to_add, orta)
@@ -0,0 +1,399 @@
+import heapq
+from math import ceil, floor
+from typing import Optional, Union
+
+import numpy as np
+from gdsfactory.component import Component, ComponentReference
+from gdsfactory.port import Port
+from gdstk import rectangle as primitive_rectangle
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.primitives.via_gen import via_stack
+from glayout.util.comp_utils import evaluate_bbox, prec_ref_center
+from glayout.util.spatial_index import get_spatial_index
+
+# tolerance (um) used when comparing geometry against grid node positions
+_EPS = 1e-6
+
+
+class MazeRouteError(ValueError):
+	"""raised when maze_route can not find a legal path between two ports"""
+
+
+def __routing_layers(pdk: MappedPDK, edge1: Port, edge2: Port, glayers: Optional[list[str]]) -> list[str]:
+	"""returns ordered (lowest first) list of metal glayers to route on, includes the port layers"""
+	if glayers is None:
+		# from met1 up to one level above the highest port (thick top metals make the grid very coarse)
+		top_level = max(int(pdk.layer_to_glayer(edge.layer)[-1]) for edge in [edge1, edge2])
+		glayers = [f"met{level}" for level in range(1, max(top_level + 1, 3) + 1) if f"met{level}" in pdk.glayers]
+	glayers = sorted(set(glayers), key=lambda glayer: int(glayer[-1]))
+	for glayer in glayers:
+		if "met" not in glayer:
+			raise ValueError("maze_route: routing layers must be metals")
+	for edge in [edge1, edge2]:
+		if pdk.layer_to_glayer(edge.layer) not in glayers:
+			raise ValueError("maze_route: port layers must be included in the routing layers")
+	# vias can only be placed between adjacent levels
+	levels = [int(glayer[-1]) for glayer in glayers]
+	if levels != list(range(levels[0], levels[-1] + 1)):
+		raise ValueError("maze_route: routing layers must be contiguous metal levels")
+	return glayers
+
+
+def __mark_boxes(blocked: np.ndarray, boxes: np.ndarray, origin: tuple[float,float], pitch: float) -> None:
+	"""marks every grid node strictly inside any of boxes (N,4 array of xmin,ymin,xmax,ymax)
+	uses a 2d difference array so the cost is O(N + grid size)"""
+	if len(boxes) == 0:
+		return
+	nx, ny = blocked.shape
+	i0 = np.clip(np.floor((boxes[:, 0] - origin[0]) / pitch + _EPS).astype(np.int64) + 1, 0, nx)
+	j0 = np.clip(np.floor((boxes[:, 1] - origin[1]) / pitch + _EPS).astype(np.int64) + 1, 0, ny)
+	i1 = np.clip(np.ceil((boxes[:, 2] - origin[0]) / pitch - _EPS).astype(np.int64), 0, nx)
+	j1 = np.clip(np.ceil((boxes[:, 3] - origin[1]) / pitch - _EPS).astype(np.int64), 0, ny)
+	valid = (i1 > i0) & (j1 > j0)
+	i0, j0, i1, j1 = i0[valid], j0[valid], i1[valid], j1[valid]
+	diff = np.zeros((nx + 1, ny + 1), dtype=np.int32)
+	np.add.at(diff, (i0, j0), 1)
+	np.add.at(diff, (i1, j0), -1)
+	np.add.at(diff, (i0, j1), -1)
+	np.add.at(diff, (i1, j1), 1)
+	blocked |= (diff.cumsum(axis=0).cumsum(axis=1)[:nx, :ny] > 0)
+
+
+def __mark_polygon_interior(blocked: np.ndarray, polygon: np.ndarray, origin: tuple[float,float], pitch: float) -> None:
+	"""marks grid nodes inside a (non rectangular) polygon with a vectorized even-odd test"""
+	nx, ny = blocked.shape
+	xmin, ymin = polygon.min(axis=0)
+	xmax, ymax = polygon.max(axis=0)
+	i0, i1 = max(0, ceil((xmin - origin[0]) / pitch)), min(nx, floor((xmax - origin[0]) / pitch) + 1)
+	j0, j1 = max(0, ceil((ymin - origin[1]) / pitch)), min(ny, floor((ymax - origin[1]) / pitch) + 1)
+	if i1 <= i0 or j1 <= j0:
+		return
+	xs = origin[0] + pitch * np.arange(i0, i1)
+	ys = origin[1] + pitch * np.arange(j0, j1)
+	px, py = np.meshgrid(xs, ys, indexing="ij")
+	inside = np.zeros(px.shape, dtype=bool)
+	for (xa, ya), (xb, yb) in zip(polygon, np.roll(polygon, -1, axis=0)):
+		if ya == yb:
+			continue
+		crosses = (ya > py) != (yb > py)
+		xcross = xa + (py - ya) * (xb - xa) / (yb - ya)
+		inside ^= crosses & (px < xcross)
+	blocked[i0:i1, j0:j1] |= inside
+
+
+def __is_rectangle(polygon: np.ndarray) -> bool:
+	if len(polygon) != 4:
+		return False
+	xs, ys = polygon[:, 0], polygon[:, 1]
+	return len(np.unique(np.round(xs, 6))) == 2 and len(np.unique(np.round(ys, 6))) == 2
+
+
+def __occupancy(
+	polygons: list[np.ndarray],
+	halos: tuple[float, float],
+	shape: tuple[int, int],
+	origin: tuple[float, float],
+	pitch: float
+) -> tuple[np.ndarray, np.ndarray]:
+	"""returns (wire_blocked, via_blocked) node masks for one layer
+	a node is blocked if a wire/via centered at that node would be closer than min_separation to any polygon"""
+	wire_blocked = np.zeros(shape, dtype=bool)
+	via_blocked = np.zeros(shape, dtype=bool)
+	rects = list()
+	for polygon in polygons:
+		if __is_rectangle(polygon):
+			rects.append((*polygon.min(axis=0), *polygon.max(axis=0)))
+			continue
+		# polygon expanded by a square halo == interior + every edge expanded by the halo
+		interior = np.zeros(shape, dtype=bool)
+		__mark_polygon_interior(interior, polygon, origin, pitch)
+		wire_blocked |= interior
+		via_blocked |= interior
+		for pointa, pointb in zip(polygon, np.roll(polygon, -1, axis=0)):
+			rects.append((min(pointa[0], pointb[0]), min(pointa[1], pointb[1]), max(pointa[0], pointb[0]), max(pointa[1], pointb[1])))
+	if rects:
+		rects = np.asarray(rects, dtype=np.float64)
+		for blocked, halo in zip((wire_blocked, via_blocked), halos):
+			__mark_boxes(blocked, rects + np.array([-halo, -halo, halo, halo]), origin, pitch)
+	return wire_blocked, via_blocked
+
+
+def __stub_is_legal(
+	segments: list[tuple[tuple[float,float],tuple[float,float]]],
+	obstacle_boxes: np.ndarray,
+	own_boxes: np.ndarray,
+	width: float,
+	separation: float
+) -> bool:
+	"""True if every wire (width wide, from pointa to pointb) is at least separation away from all obstacle boxes
+	(N,4 array of xmin,ymin,xmax,ymax, the bbox of non rectangular obstacles is used so the check is conservative)
+	wires completely covered by one of own_boxes (metal of the net being routed) are always legal"""
+	for pointa, pointb in segments:
+		if np.allclose(pointa, pointb):
+			continue
+		wire = (
+			min(pointa[0], pointb[0]) - width / 2,
+			min(pointa[1], pointb[1]) - width / 2,
+			max(pointa[0], pointb[0]) + width / 2,
+			max(pointa[1], pointb[1]) + width / 2,
+		)
+		covered = (own_boxes[:, 0] <= wire[0] + _EPS) & (own_boxes[:, 1] <= wire[1] + _EPS) & (own_boxes[:, 2] >= wire[2] - _EPS) & (own_boxes[:, 3] >= wire[3] - _EPS)
+		if covered.any():
+			continue
+		keepout = (wire[0] - separation + _EPS, wire[1] - separation + _EPS, wire[2] + separation - _EPS, wire[3] + separation - _EPS)
+		too_close = (obstacle_boxes[:, 0] < keepout[2]) & (obstacle_boxes[:, 2] > keepout[0]) & (obstacle_boxes[:, 1] < keepout[3]) & (obstacle_boxes[:, 3] > keepout[1])
+		if too_close.any():
+			return False
+	return True
+
+
+def __terminal(
+	edge: Port,
+	lnum: int,
+	wire_free: np.ndarray,
+	obstacle_boxes: np.ndarray,
+	own_boxes: np.ndarray,
+	width: float,
+	separation: float,
+	origin: tuple[float,float],
+	pitch: float,
+	radius: int = 2
+) -> tuple[tuple[int,int,int], tuple[float,float], tuple[float,float]]:
+	"""returns (grid node, stub start, stub corner) connecting edge to the routing grid on layer lnum
+	the stub starts width/2 behind the port (so the wire ends flush with the port edge) and the node is the
+	free node (within radius grid steps) with the shortest L shaped stub start -> corner -> node that keeps
+	separation from all obstacles, raises MazeRouteError if there is none"""
+	_, nx, ny = wire_free.shape
+	center = (float(edge.center[0]), float(edge.center[1]))
+	angle = np.deg2rad(edge.orientation)
+	start = (center[0] - width / 2 * round(np.cos(angle)), center[1] - width / 2 * round(np.sin(angle)))
+	ci, cj = int(round((center[0] - origin[0]) / pitch)), int(round((center[1] - origin[1]) / pitch))
+	candidates = list()
+	for i in range(max(0, ci - radius), min(nx, ci + radius + 1)):
+		for j in range(max(0, cj - radius), min(ny, cj + radius + 1)):
+			if wire_free[lnum, i, j]:
+				node_x, node_y = origin[0] + pitch * i, origin[1] + pitch * j
+				candidates.append((abs(node_x - center[0]) + abs(node_y - center[1]), i, j, node_x, node_y))
+	for _, i, j, node_x, node_y in sorted(candidates):
+		for corner in [(node_x, start[1]), (start[0], node_y)]:
+			if __stub_is_legal([(start, corner), (corner, (node_x, node_y))], obstacle_boxes, own_boxes, width, separation):
+				return (lnum, i, j), start, corner
+	raise MazeRouteError(
+		f"maze_route: port {edge.name} at {center} can not be connected to the routing grid "
+		f"without violating min_separation to nearby geometry (move the port or the obstacle)"
+	)
+
+
+def __astar(
+	wire_free: np.ndarray,
+	via_free: np.ndarray,
+	start: tuple[int,int,int],
+	goal: tuple[int,int,int],
+	via_costs: list[float],
+	wrong_way_cost: float,
+	horizontal: list[bool],
+	max_expansions: int
+) -> list[tuple[int,int,int]]:
+	"""A* search over the (layer, x, y) grid, returns list of nodes from start to goal"""
+	nlayers, nx, ny = wire_free.shape
+	layer_stride, x_stride = nx * ny, ny
+	wire_free_flat = wire_free.ravel().tolist()
+	via_free_flat = via_free.ravel().tolist()
+	index = lambda node: node[0] * layer_stride + node[1] * x_stride + node[2]
+	start_idx, goal_idx = index(start), index(goal)
+	gl, gx, gy = goal
+	min_via_cost = min(via_costs) if via_costs else 0
+	g_cost = {start_idx: 0.0}
+	parent = {start_idx: -1}
+	closed = set()
+	heap = [(0.0, 0, start_idx)]
+	counter = 0
+	while heap:
+		_, _, idx = heapq.heappop(heap)
+		if idx in closed:
+			continue
+		if idx == goal_idx:
+			path = list()
+			while idx != -1:
+				layer, rem = divmod(idx, layer_stride)
+				path.append((layer, *divmod(rem, x_stride)))
+				idx = parent[idx]
+			return path[::-1]
+		closed.add(idx)
+		if len(closed) > max_expansions:
+			break
+		layer, rem = divmod(idx, layer_stride)
+		x, y = divmod(rem, x_stride)
+		gcur = g_cost[idx]
+		hcost, vcost = (1.0, wrong_way_cost) if horizontal[layer] else (wrong_way_cost, 1.0)
+		neighbors = list()
+		if x > 0:
+			neighbors.append((idx - x_stride, hcost, layer, x - 1, y))
+		if x < nx - 1:
+			neighbors.append((idx + x_stride, hcost, layer, x + 1, y))
+		if y > 0:
+			neighbors.append((idx - 1, vcost, layer, x, y - 1))
+		if y < ny - 1:
+			neighbors.append((idx + 1, vcost, layer, x, y + 1))
+		if via_free_flat[idx]:
+			if layer > 0 and via_free_flat[idx - layer_stride]:
+				neighbors.append((idx - layer_stride, via_costs[layer - 1], layer - 1, x, y))
+			if layer < nlayers - 1 and via_free_flat[idx + layer_stride]:
+				neighbors.append((idx + layer_stride, via_costs[layer], layer + 1, x, y))
+		for nidx, step, nlayer, nxi, nyi in neighbors:
+			if nidx in closed or not wire_free_flat[nidx]:
+				continue
+			ncost = gcur + step
+			if ncost < g_cost.get(nidx, float("inf")):
+				g_cost[nidx] = ncost
+				parent[nidx] = idx
+				counter += 1
+				heuristic = abs(nxi - gx) + abs(nyi - gy) + min_via_cost * abs(nlayer - gl)
+				heapq.heappush(heap, (ncost + heuristic, counter, nidx))
+	raise MazeRouteError("maze_route: no legal path found between the ports")
+
+
+def maze_route(
+	pdk: MappedPDK,
+	edge1: Port,
+	edge2: Port,
+	top_comp: Union[Component, ComponentReference],
+	width: Optional[float] = None,
+	glayers: Optional[list[str]] = None,
+	via_weight: float = 4.0,
+	wrong_way_cost: float = 2.0,
+	margin: Optional[float] = None,
+	max_expansions: int = 2000000
+) -> Component:
+	"""creates an obstacle aware multi layer Manhattan route between two Ports
+	polygons already in top_comp are treated as obstacles (except geometry touching edge1 or edge2 on the port layer)
+	each port is connected by a short L shaped stub to the nearest grid node the stub can reach without violating
+	min_separation (MazeRouteError if there is none within 2 grid steps).
+	a uniform routing grid is built over top_comp, blocked nodes are found from the min_separation rule of each metal
+	and an A* search with via costs finds the cheapest path. Wires are laid on grid centerlines and vias are via stacks.
+	args:
+	pdk = pdk to use
+	edge1, edge2 = Ports to connect, port layers must be one of the routing glayers
+	top_comp = Component (or ComponentReference) containing the obstacles, the route is NOT added to top_comp
+	width = route width, defaults to (and is at least) the largest min_width of the routing layers
+	glayers = list of metal glayers to route on, defaults to met1 up to one level above the highest port layer
+	via_weight = via cost multiplier, a via costs via_weight * (via width + via min_separation) / pitch grid steps
+	wrong_way_cost = cost of a grid step against the preferred direction of the layer (odd metals prefer horizontal)
+	margin = extra space around top_comp bbox that the route may use, defaults to 4 grid pitches
+	max_expansions = max number of nodes A* may expand before giving up
+
+	info:
+	wirelength = total length of wires in um
+	via_count = number of via stacks placed
+	"""
+	glayers = __routing_layers(pdk, edge1, edge2, glayers)
+	pdk.activate()
+	# routing width, grid pitch and min separation halos
+	min_widths = [pdk.get_grule(glayer)["min_width"] for glayer in glayers]
+	width = pdk.snap_to_2xgrid(max(width or 0, *min_widths))
+	via_dim = 0.0
+	via_costs = list()
+	for lower, upper in zip(glayers, glayers[1:]):
+		via_dim = max(via_dim, *evaluate_bbox(via_stack(pdk, lower, upper, fullbottom=True, fulltop=True)))
+	separations = [pdk.get_grule(glayer)["min_separation"] for glayer in glayers]
+	pitch = pdk.snap_to_2xgrid(max(width, via_dim) + max(separations))
+	for lower in glayers[:-1]:
+		via_rule = pdk.get_grule("via" + lower[-1])
+		via_costs.append(1 + via_weight * (via_rule["width"] + via_rule["min_separation"]) / pitch)
+	# grid spans top_comp and both ports plus margin, edge1 lies exactly on a grid node
+	margin = 4 * pitch if margin is None else margin
+	bbox = np.asarray(top_comp.bbox, dtype=np.float64)
+	xmin = min(bbox[0][0], edge1.center[0], edge2.center[0]) - margin
+	ymin = min(bbox[0][1], edge1.center[1], edge2.center[1]) - margin
+	xmax = max(bbox[1][0], edge1.center[0], edge2.center[0]) + margin
+	ymax = max(bbox[1][1], edge1.center[1], edge2.center[1]) + margin
+	origin = (
+		edge1.center[0] - pitch * ceil((edge1.center[0] - xmin) / pitch),
+		edge1.center[1] - pitch * ceil((edge1.center[1] - ymin) / pitch),
+	)
+	shape = (int(ceil((xmax - origin[0]) / pitch)) + 1, int(ceil((ymax - origin[1]) / pitch)) + 1)
+	# build occupancy per layer
+	index = get_spatial_index(top_comp)
+	wire_free = np.ones((len(glayers), *shape), dtype=bool)
+	via_free = np.ones((len(glayers), *shape), dtype=bool)
+	obstacle_boxes, own_net_boxes = list(), list()
+	for lnum, glayer in enumerate(glayers):
+		layer = tuple(pdk.get_glayer(glayer))
+		polygons = [np.asarray(polygon, dtype=np.float64) for polygon in index.polygons(layer)]
+		boxes = np.array([(*polygon.min(axis=0), *polygon.max(axis=0)) for polygon in polygons]).reshape(-1, 4)
+		# polygons connected to the ports are the geometry of the net being routed, they are not obstacles
+		own_net = np.zeros(len(polygons), dtype=bool)
+		for edge in [edge1, edge2]:
+			if tuple(edge.layer) == layer:
+				own_net[index.connected(layer, edge.center)] = True
+		obstacles = [polygon for polygon, own in zip(polygons, own_net) if not own]
+		obstacle_boxes.append(boxes[~own_net])
+		halos = (
+			max(separations[lnum] + width / 2, pitch / 2 + _EPS),
+			max(separations[lnum] + via_dim / 2, pitch / 2 + _EPS),
+		)
+		wire_blocked, via_blocked = __occupancy(obstacles, halos, shape, origin, pitch)
+		# wires and vias that are completely covered by the metal of the net being routed are always legal
+		wire_inside_own, via_inside_own = np.zeros(shape, dtype=bool), np.zeros(shape, dtype=bool)
+		own_boxes = boxes[own_net]
+		own_net_boxes.append(own_boxes)
+		__mark_boxes(wire_inside_own, own_boxes + np.array([1, 1, -1, -1]) * (width / 2 - _EPS), origin, pitch)
+		__mark_boxes(via_inside_own, own_boxes + np.array([1, 1, -1, -1]) * (via_dim / 2 - _EPS), origin, pitch)
+		wire_free[lnum] = ~wire_blocked | wire_inside_own
+		via_free[lnum] = ~(via_blocked | wire_blocked) | via_inside_own
+	# terminals: free grid nodes reachable from the ports by a legal stub
+	terminals = list()
+	for edge in [edge1, edge2]:
+		lnum = glayers.index(pdk.layer_to_glayer(edge.layer))
+		terminals.append(__terminal(edge, lnum, wire_free, obstacle_boxes[lnum], own_net_boxes[lnum], width, separations[lnum], origin, pitch))
+	(start, start_stub, start_corner), (goal, goal_stub, goal_corner) = terminals
+	horizontal = [bool(int(glayer[-1]) % 2) for glayer in glayers]
+	path = __astar(wire_free, via_free, start, goal, via_costs, wrong_way_cost, horizontal, max_expansions)
+	# draw wires (merged into straight segments) and via stacks
+	node_xy = lambda node: (origin[0] + pitch * node[1], origin[1] + pitch * node[2])
+	route = Component()
+	wirelength = 0.0
+	via_count = 0
+	def add_wire(glayer: str, pointa: tuple[float,float], pointb: tuple[float,float]):
+		nonlocal wirelength
+		if np.allclose(pointa, pointb):
+			return
+		corner1 = (min(pointa[0], pointb[0]) - width / 2, min(pointa[1], pointb[1]) - width / 2)
+		corner2 = (max(pointa[0], pointb[0]) + width / 2, max(pointa[1], pointb[1]) + width / 2)
+		route.add_polygon(primitive_rectangle(corner1, corner2, *pdk.get_glayer(glayer)))
+		wirelength += abs(pointa[0] - pointb[0]) + abs(pointa[1] - pointb[1])
+	# stubs from ports to their terminal node (L shape if the port is off grid)
+	for stub, node, corner in [(start_stub, start, start_corner), (goal_stub, goal, goal_corner)]:
+		glayer = glayers[node[0]]
+		add_wire(glayer, stub, corner)
+		add_wire(glayer, corner, node_xy(node))
+	segment_start, direction = path[0], None
+	for prev, node in zip(path, path[1:]):
+		if node[0] != prev[0]:
+			add_wire(glayers[prev[0]], node_xy(segment_start), node_xy(prev))
+			segment_start, direction = node, None
+			continue
+		# break a segment whenever the direction changes
+		step = (node[1] - prev[1], node[2] - prev[2])
+		if direction is not None and step != direction:
+			add_wire(glayers[prev[0]], node_xy(segment_start), node_xy(prev))
+			segment_start = prev
+		direction = step
+	add_wire(glayers[path[-1][0]], node_xy(segment_start), node_xy(path[-1]))
+	# vias: group consecutive layer changes at one node into one via stack
+	lnum = 0
+	while lnum < len(path) - 1:
+		if path[lnum + 1][0] == path[lnum][0]:
+			lnum += 1
+			continue
+		end = lnum + 1
+		while end < len(path) - 1 and path[end + 1][0] != path[end][0]:
+			end += 1
+		via_ref = prec_ref_center(via_stack(pdk, glayers[path[lnum][0]], glayers[path[end][0]], fullbottom=True, fulltop=True), destination=node_xy(path[lnum]))
+		route.add(via_ref)
+		via_count += 1
+		lnum = end
+	route = route.flatten()
+	route.info["wirelength"] = float(pdk.snap_to_2xgrid(wirelength)) if wirelength else 0.0
+	route.info["via_count"] = via_count
+	return route
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from importlib import import_module
+from typing import Callable, Optional
+
+import numpy as np
+from gdsfactory.component import Component
+from gdsfactory.port import Port
+from glayout.pdk.mappedpdk import MappedPDK
+
+# database units per um (gdsfactory 1nm grid), route geometry is keyed in these integer units
+_DBU_PER_UM = 1000
+
+# module holding the gdsfactory cell cache (gdsfactory.cell as an attribute is the cell decorator)
+_gf_cell = import_module("gdsfactory.cell")
+
+
+def _freeze(value):
+	"""returns a hashable version of a route option (lists and dicts become tuples)"""
+	if isinstance(value, (list, tuple)):
+		return tuple(_freeze(element) for element in value)
+	if isinstance(value, dict):
+		return tuple(sorted((key, _freeze(element)) for key, element in value.items()))
+	return value
+
+
+def _port_geometry(port: Port, origin: np.ndarray) -> tuple:
+	"""port geometry relative to origin: (dx, dy, width, orientation, layer) all integer database units"""
+	center = np.rint(np.asarray(port.center, dtype=np.float64) * _DBU_PER_UM).astype(np.int64) - origin
+	return (
+		int(center[0]),
+		int(center[1]),
+		int(np.rint(port.width * _DBU_PER_UM)),
+		int(round(port.orientation)) % 360,
+		tuple(port.layer),
+	)
+
+
+class RouteCache:
+	"""translation invariant cache of route geometry for straight_route, L_route and c_route
+
+	routes are keyed on the relative geometry of the two ports (delta vector, widths, orientations, layers)
+	and the route options. On a hit, the canonical route cell (built with edge1 at the origin) is
+	placed at the right offset instead of regenerating the route.
+	canonical routes are gdsfactory cells, so they are dropped when the gdsfactory cell cache is cleared
+	(gf.clear_cache or activating another pdk, checked on each route call; call clear() to release them right away)
+	args:
+	maxsize = max number of canonical route cells to hold (least recently used are evicted)
+	hierarchical = if True the returned component holds a reference to the canonical route cell,
+	****else the returned component is flattened (same structure as calling the route function directly)
+	"""
+
+	def __init__(self, maxsize: int = 512, hierarchical: bool = False):
+		if maxsize < 1:
+			raise ValueError("RouteCache maxsize must be at least 1")
+		self.maxsize = maxsize
+		self.hierarchical = hierarchical
+		self._routes: OrderedDict = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.uncacheable = 0
+		# gdsfactory cell cache the canonical routes were built with (gf.clear_cache replaces it)
+		self._cell_cache = getattr(_gf_cell, "CACHE", None)
+
+	def route(
+		self,
+		route_fn: Callable[..., Component],
+		pdk: MappedPDK,
+		edge1: Port,
+		edge2: Port,
+		hierarchical: Optional[bool] = None,
+		**kwargs
+	) -> Component:
+		"""returns the same route as route_fn(pdk, edge1, edge2, **kwargs) using the cache where possible
+		hierarchical = overrides the cache hierarchical setting for this call
+		"""
+		hierarchical = self.hierarchical if hierarchical is None else hierarchical
+		self._drop_cleared_routes()
+		origin = np.rint(np.asarray(edge1.center, dtype=np.float64) * _DBU_PER_UM).astype(np.int64)
+		try:
+			key = (
+				getattr(route_fn, "__name__", repr(route_fn)),
+				pdk.name,
+				_port_geometry(edge1, origin),
+				_port_geometry(edge2, origin),
+				_freeze(kwargs),
+			)
+			hash(key)
+		except TypeError:
+			# some option can not be hashed (e.g. a Port), do not cache this route
+			self.uncacheable += 1
+			return route_fn(pdk, edge1, edge2, **kwargs)
+		canonical = self._routes.get(key)
+		if canonical is None:
+			self.misses += 1
+			offset = tuple((-origin / _DBU_PER_UM).tolist())
+			canonical = route_fn(pdk, edge1.move_copy(offset), edge2.move_copy(offset), **kwargs)
+			# route functions activate the pdk, which clears the cell cache when the active pdk changes
+			self._drop_cleared_routes()
+			self._routes[key] = canonical
+			if len(self._routes) > self.maxsize:
+				self._routes.popitem(last=False)
+				self.evictions += 1
+		else:
+			self.hits += 1
+			self._routes.move_to_end(key)
+		placed = Component()
+		route_ref = placed << canonical
+		route_ref.move(tuple((origin / _DBU_PER_UM).tolist()))
+		placed.add_ports(route_ref.get_ports_list())
+		placed.info.update(canonical.info)
+		return placed if hierarchical else placed.flatten()
+
+	def _drop_cleared_routes(self) -> None:
+		"""removes the canonical routes if the gdsfactory cell cache was cleared since they were built
+		(names of the cleared cells are reused by new cells, the old routes must not be placed next to them)"""
+		cell_cache = getattr(_gf_cell, "CACHE", None)
+		if cell_cache is not self._cell_cache:
+			self._routes.clear()
+			self._cell_cache = cell_cache
+
+	def stats(self) -> dict:
+		"""returns dict of hits, misses, evictions, uncacheable, currsize and maxsize"""
+		return {
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"uncacheable": self.uncacheable,
+			"currsize": len(self._routes),
+			"maxsize": self.maxsize,
+		}
+
+	def clear(self) -> None:
+		"""removes all canonical routes and resets stats"""
+		self._routes.clear()
+		self._cell_cache = getattr(_gf_cell, "CACHE", None)
+		self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+
+# default cache used by cached_route
+route_cache = RouteCache()
+
+
+def cached_route(
+	route_fn: Callable[..., Component],
+	pdk: MappedPDK,
+	edge1: Port,
+	edge2: Port,
+	hierarchical: Optional[bool] = None,
+	**kwargs
+) -> Component:
+	"""drop in replacement for route_fn(pdk, edge1, edge2, **kwargs) that uses the default route_cache
+	example: comp << cached_route(straight_route, pdk, port1, port2, glayer2="met1")
+	"""
+	return route_cache.route(route_fn, pdk, edge1, edge2, hierarchical=hierarchical, **kwargs)
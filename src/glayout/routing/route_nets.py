@@ -0,0 +1,271 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+import numpy as np
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.port import Port
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.primitives.via_gen import via_stack
+from glayout.routing.c_route import c_route
+from glayout.routing.L_route import L_route
+from glayout.routing.straight_route import straight_route
+from glayout.routing.route_cache import cached_route
+from glayout.util.comp_utils import evaluate_bbox
+from glayout.util.port_utils import assert_port_manhattan, ports_inline, ports_parallel
+from glayout.util.spatial_index import get_spatial_index, invalidate_spatial_index
+
+# options used by route_nets for planning, everything else in a net opts dict is passed to the route function
+_PLAN_OPTIONS = ("route", "criticality", "extensions", "net")
+_ROUTE_FUNCTIONS = {"straight": straight_route, "c": c_route, "L": L_route}
+_DIRECTIONS = {0: (1, 0), 90: (0, 1), 180: (-1, 0), 270: (0, -1)}
+
+
+def __level(glayer: str) -> int:
+	"""routing level of a glayer (poly/active are level 0), same convention as via_stack"""
+	return int(glayer[-1]) if "met" in glayer else 0
+
+
+def __segment_box(start: tuple[float,float], end: tuple[float,float], width: float) -> tuple[float,float,float,float]:
+	"""bbox (xmin,ymin,xmax,ymax) of a manhattan wire of width from start to end (centerline)"""
+	half = width / 2
+	return (
+		min(start[0], end[0]) - half,
+		min(start[1], end[1]) - half,
+		max(start[0], end[0]) + half,
+		max(start[1], end[1]) + half,
+	)
+
+
+def __route_kind(edge1: Port, edge2: Port) -> str:
+	"""same choice smart_route makes between straight_route, c_route and L_route"""
+	if ports_parallel(edge1, edge2):
+		if ports_inline(edge1, edge2) or (edge1.orientation != edge2.orientation):
+			return "straight"
+		return "c"
+	return "L"
+
+
+def __plan_straight(pdk: MappedPDK, edge1: Port, edge2: Port, kwargs: dict) -> dict:
+	"""lightweight geometry of straight_route(pdk, edge1, edge2, **kwargs)"""
+	edge1_glayer = pdk.layer_to_glayer(edge1.layer)
+	glayer1 = kwargs.get("glayer1") or edge1_glayer
+	glayer2 = kwargs.get("glayer2") or pdk.layer_to_glayer(edge2.layer)
+	width = kwargs.get("width") or edge1.width
+	if bool(round(edge1.orientation + 90) % 180):
+		end = (edge2.center[0], edge1.center[1])
+	else:
+		end = (edge1.center[0], edge2.center[1])
+	wirelength = abs(end[0] - edge1.center[0]) + abs(end[1] - edge1.center[1])
+	return {
+		"boxes": [(glayer1, __segment_box(edge1.center, end, width))],
+		"wirelength": wirelength,
+		"via_count": abs(__level(glayer1) - __level(edge1_glayer)) + abs(__level(glayer1) - __level(glayer2)),
+	}
+
+
+def __plan_L(pdk: MappedPDK, edge1: Port, edge2: Port, kwargs: dict) -> dict:
+	"""lightweight geometry of L_route(pdk, edge1, edge2, **kwargs)"""
+	vport, hport = (edge1, edge2) if bool(round(edge1.orientation + 90) % 180) else (edge2, edge1)
+	hglayer = kwargs.get("hglayer") or pdk.layer_to_glayer(vport.layer)
+	vglayer = kwargs.get("vglayer") or pdk.layer_to_glayer(hport.layer)
+	corner = (hport.center[0], vport.center[1])
+	wirelength = abs(corner[0] - vport.center[0]) + abs(corner[1] - hport.center[1])
+	return {
+		"boxes": [
+			(hglayer, __segment_box(vport.center, corner, kwargs.get("vwidth") or vport.width)),
+			(vglayer, __segment_box(hport.center, corner, kwargs.get("hwidth") or hport.width)),
+		],
+		"wirelength": wirelength,
+		"via_count": abs(__level(hglayer) - __level(vglayer)),
+	}
+
+
+def __plan_c(pdk: MappedPDK, edge1: Port, edge2: Port, kwargs: dict, via_dims: dict) -> dict:
+	"""lightweight geometry of c_route(pdk, edge1, edge2, **kwargs)
+	via_dims = dict of (glayer, cglayer) -> via size along the route direction (precomputed)"""
+	e1glayer = kwargs.get("e1glayer") or pdk.layer_to_glayer(edge1.layer)
+	e2glayer = kwargs.get("e2glayer") or pdk.layer_to_glayer(edge2.layer)
+	cglayer = kwargs.get("cglayer") or ("met" + str(int(e1glayer[-1])+1))
+	width1 = kwargs.get("width1") or edge1.width
+	width2 = kwargs.get("width2") or edge1.width
+	cwidth = kwargs.get("cwidth") or min(width1, width2)
+	extension = kwargs.get("extension", 0.5)
+	direction = np.array(_DIRECTIONS[round(edge1.orientation) % 360], dtype=np.float64)
+	normal = np.abs(direction[::-1])
+	center1 = np.asarray(edge1.center, dtype=np.float64)
+	center2 = np.asarray(edge2.center, dtype=np.float64)
+	via_dim = max(via_dims[(e1glayer, cglayer)], via_dims[(e2glayer, cglayer)])
+	far = max(center1 @ direction, center2 @ direction) + extension + via_dim
+	end1 = center1 + (far - center1 @ direction) * direction
+	end2 = center2 + (far - center2 @ direction) * direction
+	connection = (far - via_dim / 2) * direction
+	wirelength = float((far - center1 @ direction) + (far - center2 @ direction) + abs((center1 - center2) @ normal))
+	return {
+		"boxes": [
+			(e1glayer, __segment_box(center1, end1, width1)),
+			(e2glayer, __segment_box(center2, end2, width2)),
+			(cglayer, __segment_box(connection + (center1 @ normal) * normal, connection + (center2 @ normal) * normal, cwidth)),
+		],
+		"wirelength": wirelength,
+		"via_count": abs(__level(e1glayer) - __level(cglayer)) + abs(__level(e2glayer) - __level(cglayer)),
+	}
+
+
+def __overlap_area(box: tuple[float,float,float,float], others: np.ndarray) -> float:
+	"""sum of the overlap area of box with each of others (N,4)"""
+	if len(others) == 0:
+		return 0.0
+	dx = np.minimum(box[2], others[:, 2]) - np.maximum(box[0], others[:, 0])
+	dy = np.minimum(box[3], others[:, 3]) - np.maximum(box[1], others[:, 1])
+	return float((np.clip(dx, 0, None) * np.clip(dy, 0, None)).sum())
+
+
+def __score(candidate: dict, context: dict) -> float:
+	"""cost of a planned candidate: wirelength + via cost + conflicts with obstacles and already planned nets
+	pure geometry, safe to evaluate concurrently (the spatial index layers are built before scoring)"""
+	conflict_area = 0.0
+	for glayer, box in candidate["boxes"]:
+		layer = context["layers"][glayer]
+		sep = context["separations"][glayer]
+		bloated = (box[0] - sep, box[1] - sep, box[2] + sep, box[3] + sep)
+		obstacle_ids = np.setdiff1d(context["index"].query(layer, bloated, touching=False), context["own"].get(layer, []))
+		conflict_area += __overlap_area(bloated, context["obstacle_boxes"][layer][obstacle_ids])
+		planned = context["planned"].get(glayer)
+		if planned:
+			conflict_area += __overlap_area(bloated, np.array([pbox for net, pbox in planned if net != context["net"]]).reshape(-1, 4))
+	return candidate["wirelength"] + context["via_weight"] * candidate["via_count"] + context["conflict_weight"] * conflict_area
+
+
+def route_nets(
+	pdk: MappedPDK,
+	top_comp: Component,
+	nets: list[Union[tuple[Port,Port], tuple[Port,Port,Optional[dict]]]],
+	num_extensions: int = 4,
+	via_weight: float = 1.0,
+	conflict_weight: float = 100.0,
+	max_workers: Optional[int] = None,
+) -> ComponentReference:
+	"""plans and routes a batch of nets, then adds all routes to top_comp at once
+	every net is first planned on lightweight geometry (boxes per glayer), nets are routed in order of
+	criticality (highest first) then planned length (shortest first). Alternative c_route extensions are
+	scored concurrently against the obstacles in top_comp and the nets planned before. The chosen routes
+	are then created (using the route cache) and committed to top_comp as a single reference.
+	args:
+	pdk = pdk to use
+	top_comp = component with the obstacles and the ports, the routes are added to it
+	nets = list of (port_a, port_b) or (port_a, port_b, opts). opts are passed to the route function except:
+	****route = one of "auto","straight","c","L" (default "auto" makes the same choice as smart_route)
+	****criticality = higher routes earlier (default 0)
+	****extensions = list of c_route extensions to try (default: extension if given, else num_extensions candidates one pitch apart)
+	****net = net name, routes with the same net name do not conflict with each other (default: the net index)
+	num_extensions = number of default extension candidates for c routes
+	via_weight = cost of a via relative to 1um of wire
+	conflict_weight = cost of 1um^2 of overlap (bloated by min separation) with other geometry
+	max_workers = threads used to score candidates (None uses the ThreadPoolExecutor default, 0 scores serially)
+	returns the reference to the routes component in top_comp
+	****ports are named net<i>_<route port name> (i = position in nets) and info has wirelength and via_count
+	****(summed from the info of the committed routes), planned_wirelength and planned_via_count (planner
+	****estimates of the chosen routes), route_order and extensions (chosen c_route extension per net, None for other routes)
+	"""
+	# normalize nets and pick route functions
+	requests = list()
+	for i, net in enumerate(nets):
+		if len(net) not in (2, 3):
+			raise ValueError("route_nets: each net must be (port_a, port_b) or (port_a, port_b, opts)")
+		edge1, edge2 = net[0], net[1]
+		opts = dict(net[2]) if len(net) == 3 and net[2] is not None else dict()
+		assert_port_manhattan([edge1, edge2])
+		kind = opts.get("route", "auto")
+		kind = __route_kind(edge1, edge2) if kind == "auto" else kind
+		if kind not in _ROUTE_FUNCTIONS:
+			raise ValueError("route_nets: route must be one of auto, straight, c or L")
+		kwargs = {key: value for key, value in opts.items() if key not in _PLAN_OPTIONS}
+		requests.append({
+			"index": i, "edge1": edge1, "edge2": edge2, "kind": kind, "kwargs": kwargs,
+			"criticality": opts.get("criticality", 0), "net": opts.get("net", i), "extensions": opts.get("extensions"),
+		})
+	# candidates per net (lightweight geometry only)
+	via_dims = dict()
+	for request in requests:
+		edge1, edge2, kwargs = request["edge1"], request["edge2"], request["kwargs"]
+		if request["kind"] == "straight":
+			request["candidates"] = [(kwargs, __plan_straight(pdk, edge1, edge2, kwargs))]
+		elif request["kind"] == "L":
+			request["candidates"] = [(kwargs, __plan_L(pdk, edge1, edge2, kwargs))]
+		else:
+			e1glayer = kwargs.get("e1glayer") or pdk.layer_to_glayer(edge1.layer)
+			e2glayer = kwargs.get("e2glayer") or pdk.layer_to_glayer(edge2.layer)
+			cglayer = kwargs.get("cglayer") or ("met" + str(int(e1glayer[-1])+1))
+			for glayer in (e1glayer, e2glayer):
+				if (glayer, cglayer) not in via_dims:
+					if glayer == cglayer:
+						via_dims[(glayer, cglayer)] = 2 * pdk.get_grule(glayer)["min_width"]
+					else:
+						viastack = via_stack(pdk, glayer, cglayer, fullbottom=kwargs.get("fullbottom", False), assume_bottom_via=True, fulltop=True)
+						via_dims[(glayer, cglayer)] = evaluate_bbox(viastack)[0]
+			extensions = request["extensions"]
+			if extensions is None and "extension" in kwargs:
+				extensions = [kwargs["extension"]]
+			elif extensions is None:
+				pitch = (kwargs.get("cwidth") or edge1.width) + pdk.get_grule(cglayer)["min_separation"]
+				extensions = [pdk.snap_to_2xgrid(0.5 + step * pitch) for step in range(max(num_extensions, 1))]
+			request["candidates"] = [
+				(ckwargs, __plan_c(pdk, edge1, edge2, ckwargs, via_dims))
+				for ckwargs in [dict(kwargs, extension=extension) for extension in extensions]
+			]
+	# route order: criticality then length of the first candidate
+	order = sorted(requests, key=lambda request: (-request["criticality"], request["candidates"][0][1]["wirelength"], request["index"]))
+	# build the obstacle index for every layer used before scoring (scoring only reads the index)
+	index = get_spatial_index(top_comp)
+	glayers = {glayer for request in requests for _, plan in request["candidates"] for glayer, _ in plan["boxes"]}
+	context = {
+		"index": index,
+		"layers": {glayer: tuple(pdk.get_glayer(glayer)) for glayer in glayers},
+		"separations": {glayer: pdk.get_grule(glayer)["min_separation"] for glayer in glayers},
+		"via_weight": via_weight,
+		"conflict_weight": conflict_weight,
+		"planned": dict(),
+	}
+	context["obstacle_boxes"] = {layer: index.boxes(layer) for layer in context["layers"].values()}
+	executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers != 0 else None
+	try:
+		for request in order:
+			# polygons connected to the ports belong to this net, they are not obstacles
+			own = dict()
+			for edge in (request["edge1"], request["edge2"]):
+				layer = tuple(edge.layer)
+				if layer in context["obstacle_boxes"]:
+					own[layer] = np.union1d(own.get(layer, []), index.connected(layer, edge.center)).astype(np.int64)
+			net_context = dict(context, own=own, net=request["net"])
+			plans = [plan for _, plan in request["candidates"]]
+			if executor is not None and len(plans) > 1:
+				costs = list(executor.map(lambda plan: __score(plan, net_context), plans))
+			else:
+				costs = [__score(plan, net_context) for plan in plans]
+			best = int(np.argmin(costs))
+			request["kwargs"], request["plan"] = request["candidates"][best]
+			for glayer, box in request["plan"]["boxes"]:
+				context["planned"].setdefault(glayer, list()).append((request["net"], box))
+	finally:
+		if executor is not None:
+			executor.shutdown()
+	# commit all routes in one batch
+	routes = Component()
+	wirelength, via_count = 0, 0
+	for request in order:
+		route_fn = _ROUTE_FUNCTIONS[request["kind"]]
+		route_ref = routes << cached_route(route_fn, pdk, request["edge1"], request["edge2"], **request["kwargs"])
+		routes.add_ports(route_ref.get_ports_list(), prefix="net" + str(request["index"]) + "_")
+		wirelength += route_ref.parent.info["wirelength"]
+		via_count += route_ref.parent.info["via_count"]
+	routes.info["wirelength"] = round(wirelength, 6)
+	routes.info["via_count"] = via_count
+	routes.info["planned_wirelength"] = round(sum(request["plan"]["wirelength"] for request in requests), 6)
+	routes.info["planned_via_count"] = sum(request["plan"]["via_count"] for request in requests)
+	routes.info["route_order"] = [request["index"] for request in order]
+	routes.info["extensions"] = [request["kwargs"].get("extension") if request["kind"] == "c" else None for request in requests]
+	routes_ref = top_comp << routes
+	# the obstacle index of top_comp no longer matches its geometry
+	invalidate_spatial_index(top_comp)
+	return routes_ref
@@ -1,5 +1,5 @@
 import warnings
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 
 from gdsfactory import Component, ComponentReference
 from gdsfactory.port import Port
@@ -14,6 +14,7 @@ from glayout.primitives.via_gen import via_stack
 from glayout.routing.c_route import c_route
 from glayout.routing.L_route import L_route
 from glayout.routing.straight_route import straight_route
+from glayout.routing.maze_route import maze_route
 
 
 def smart_route(
@@ -23,14 +24,25 @@ def smart_route(
     ref_comp: Optional[Union[Component, ComponentReference]]=None,
     top_comp: Optional[Union[Component, ComponentReference]]=None,
     auto_downscale_routing: bool = True,
+    engine: Literal["auto","maze"] = "auto",
     **kwargs
 ) -> Component:
+    """routes between edge1 and edge2
+    engine = "auto" picks straight_route, c_route or L_route (or a specialized route if ref_comp supports it)
+    ****"maze" uses the obstacle aware grid router (maze_route) with top_comp as the obstacles, kwargs are passed to maze_route
+    """
     # error checks
     assert_port_manhattan([edge1,edge2])
     # auto downscale routing widths if both port widths>1 (will make port width exactly 1)
     if edge1.width>1 and edge2.width>1:
         edge1.width=1
         edge2.width=1
+    if engine == "maze":
+        if top_comp is None:
+            raise ValueError("smart_route: engine=\"maze\" requires top_comp (the component with the obstacles)")
+        return maze_route(pdk, edge1, edge2, top_comp, **kwargs)
+    elif engine != "auto":
+        raise ValueError("smart_route: engine must be one of auto or maze")
     # determine route type based on preconfiged route utils
     if top_comp is not None and ref_comp is not None:
         if ref_comp.info.get("route_genid") is not None:
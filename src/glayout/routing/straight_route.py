@@ -3,7 +3,7 @@ from gdsfactory.component import Component
 from gdsfactory.port import Port
 from glayout.pdk.mappedpdk import MappedPDK
 from typing import Optional
-from glayout.primitives.via_gen import via_stack, via_array
+from glayout.primitives.via_gen import via_stack, via_array, via_level_count
 from gdsfactory.components.rectangle import rectangle
 from glayout.util.comp_utils import evaluate_bbox, align_comp_to_port
 from glayout.util.port_utils import assert_port_manhattan, set_port_orientation, add_ports_perimeter
@@ -50,6 +50,7 @@ def straight_route(
 	
 	Ports:
 	route_...all edges of the rectangle path
+	info has wirelength (length of the drawn rectangle path) and via_count (via levels drawn)
 	"""
 	#TODO: error checking
 	width = width if width else edge1.width
@@ -109,6 +110,8 @@ def straight_route(
 	if front_via is not None:
 		alignlayer1 = pdk.get_glayer(glayer1) if via1_alignment_layer is None else pdk.get_glayer(via1_alignment_layer)
 		straightroute.add(align_comp_to_port(front_via,edge1,layer=alignlayer1,alignment=via1_alignment))
+	straightroute.info["wirelength"] = abs(extension)
+	straightroute.info["via_count"] = sum(via_level_count(pdk,via) for via in (front_via,out_via) if via is not None)
 	return straightroute.flatten()
 
 
@@ -1 +1,3 @@
-from .netlist import Netlist
\ No newline at end of file
+from .netlist import Netlist
+from .spice_parser import parse_spice, parse_spice_file, parse_spice_value, iter_spice_statements, ParsedSpice, RCNetwork
+from .netlist_graph import canonical_hash, flatten_netlist, to_graph
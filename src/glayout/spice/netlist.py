@@ -1,9 +1,92 @@
 from os.path import join, dirname
 from typing import Union, Optional
-from copy import deepcopy
+from hashlib import sha1
+from io import StringIO
+from weakref import WeakSet
 
 import re
 
+NETLIST_SCHEMA_VERSION = 1
+"""Version of the `Netlist.to_dict` format, incremented on incompatible changes."""
+
+def _msgpack():
+	try:
+		import msgpack
+	except ImportError as e:
+		raise ImportError("the compact Netlist form requires the msgpack package, install it with `pip install msgpack`") from e
+	return msgpack
+
+class _NetTable:
+	"""Union-find over the (sub-netlist, node) terminals of a netlist.
+
+	The id of a terminal is `offsets[i] + node_index` for node `node_index` of sub-netlist `i`. Every set is one net. Nets are named by a top-level node (`Netlist.connect_node`) or are wires created by `Netlist.connect_subnets`, wires are numbered at emit time in creation order.
+	"""
+
+	def __init__(self):
+		self.offsets: list[int] = []
+		"""Id of the first terminal of every sub-netlist."""
+		self.links: list[int] = []
+		"""Union-find parent of every terminal."""
+		self.sizes: list[int] = []
+		"""Size of the set of every root terminal."""
+		self.names: dict[int, str] = {}
+		"""Maps root terminals to the name of their net."""
+		self.named: dict[str, int] = {}
+		"""Maps net names to a terminal of the net."""
+		self.wires: dict[int, int] = {}
+		"""Maps root terminals of wires to their creation sequence number."""
+
+	def copy(self) -> '_NetTable':
+		table = _NetTable()
+		table.offsets, table.links, table.sizes = self.offsets.copy(), self.links.copy(), self.sizes.copy()
+		table.names, table.named, table.wires = self.names.copy(), self.named.copy(), self.wires.copy()
+		return table
+
+	def add(self, count: int):
+		"""Adds the terminals of a sub-netlist with `count` nodes."""
+		start = len(self.links)
+		self.offsets.append(start)
+		self.links.extend(range(start, start + count))
+		self.sizes.extend([1] * count)
+
+	def find(self, terminal: int) -> int:
+		links = self.links
+		while links[terminal] != terminal:
+			# path halving
+			links[terminal] = links[links[terminal]]
+			terminal = links[terminal]
+		return terminal
+
+	def union(self, terminal1: int, terminal2: int) -> int:
+		"""Merges the nets of two terminals (union by size) and returns the root of the merged net. The name is left to the caller."""
+		root1, root2 = self.find(terminal1), self.find(terminal2)
+		if root1 == root2:
+			return root1
+		if self.sizes[root1] < self.sizes[root2]:
+			root1, root2 = root2, root1
+		self.links[root2] = root1
+		self.sizes[root1] += self.sizes[root2]
+		self.names.pop(root2, None)
+		if root2 in self.wires:
+			sequence = self.wires.pop(root2)
+			self.wires[root1] = min(sequence, self.wires.get(root1, sequence))
+		return root1
+
+
+class _ReadOnlyList(list):
+	"""List attribute (`nodes`, `global_nodes`) of a shared sub-netlist definition, in-place edits raise ValueError."""
+
+	def _read_only(self, *args, **kwargs):
+		raise ValueError("the attributes of a shared sub-netlist definition can not be modified, modify the netlist it was created from instead")
+
+	append = extend = insert = pop = remove = clear = sort = reverse = __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+class _ReadOnlyDict(dict):
+	"""`parameters` of a shared sub-netlist definition, in-place edits raise ValueError."""
+
+	_read_only = _ReadOnlyList._read_only
+	__setitem__ = __delitem__ = pop = popitem = clear = update = setdefault = __ior__ = _read_only
+
 class Netlist:
 	"""Represents a SPICE netlist/subcircuit."""
 
@@ -26,22 +109,112 @@ class Netlist:
 
 	sub_netlists: list['Netlist']
 	"""List of the sub-netlists."""
-	netlist_connections: list[list[str]]
-	"""2D matrix of interconnections of the sub-netlists.
-
-	The row and column number in the matrix represent the indices of the connected sub-netlists. The value represents the name of the wire connecting the nodes.
-	"""
+	_nets: _NetTable
+	"""Connectivity of the sub-netlist nodes, see `netlist_connections` for the generated net names."""
 
 	# Variable to determine how many wires were created
 	wire_index: int = 0
-	"""The index of the next interconnection wire.
+	"""The creation sequence number of the next interconnection wire.
 
-	The wires for interconnecting sub-netlists are named `wire{wire_index}`. This index is incremented each time a sub-netlist connection is made.
+	Incremented each time `connect_subnets` creates a wire. The wires are named `wire{n}` at emit time, numbered densely in creation order.
 	"""
 
 	parameters: dict = {}
 	"""Dictionary of the high-level parameters."""
 
+	_structural_attributes = ('circuit_name', 'nodes', 'global_nodes', 'source_netlist', 'instance_format', 'parameters', 'sub_netlists', '_nets')
+	"""Attributes that change the generated SPICE. Assigning any of them invalidates the memoized hash and subcircuit text."""
+
+	def __setattr__(self, name, value):
+		if name in self._structural_attributes and self.__dict__.get('_frozen'):
+			self._raise_frozen()
+		object.__setattr__(self, name, value)
+		if name == 'sub_netlists':
+			for netlist in value: netlist._add_parent(self)
+		if name in self._structural_attributes:
+			self._invalidate()
+
+	def __getstate__(self) -> dict:
+		# the memo and the parent back-references are rebuilt on load
+		return {key: value for key, value in self.__dict__.items() if key not in ('_memo', '_parents')}
+
+	def __reduce__(self):
+		# pickle the compact form, it is memoized and stores shared sub-netlists once
+		return (type(self).from_dict, (self.to_dict(),))
+
+	def __setstate__(self, state: dict):
+		if 'netlist_connections' in state:
+			state = self.__upgrade_state(state)
+		self.__dict__.update(state)
+		for netlist in self.__dict__.get('sub_netlists', []): netlist._add_parent(self)
+
+	def _add_parent(self, netlist: 'Netlist'):
+		"""Registers a netlist that contains this one, so that mutations invalidate its memo as well."""
+		if '_parents' not in self.__dict__:
+			object.__setattr__(self, '_parents', WeakSet())
+		self._parents.add(netlist)
+
+	def _invalidate(self):
+		"""Drops the memoized structural hash and subcircuit text of this netlist and of all the netlists containing it.
+
+		Called on every mutation made through the Netlist API. In-place edits of `nodes`, `global_nodes` and `parameters` (e.g. `nodes.append`) are detected by `_get_memo`.
+		"""
+		if '_memo' in self.__dict__:
+			del self.__dict__['_memo']
+			for netlist in list(self.__dict__.get('_parents', [])): netlist._invalidate()
+
+	def _raise_frozen(self):
+		raise ValueError(f"Netlist {self.circuit_name} is a shared sub-netlist definition and can not be modified, modify the netlist it was created from instead")
+
+	def shared(self) -> 'Netlist':
+		"""Returns an immutable definition of this netlist that can be shared by any number of parents (copy-on-write).
+
+		The definition is a shallow snapshot of this netlist (sub-netlists are shared definitions themselves), its `nodes`, `global_nodes` and `parameters` are read only. It is cached until this netlist is mutated (including in-place edits of those attributes), so connecting the same netlist many times creates a single definition.
+		"""
+		if self.__dict__.get('_frozen'):
+			return self
+
+		memo = self._get_memo()
+		if 'shared' not in memo:
+			definition = object.__new__(type(self))
+			state = self.__getstate__()
+			for key, value in state.items():
+				if isinstance(value, (list, dict, _NetTable)): state[key] = value.copy()
+			if 'sub_netlists' in state:
+				state['sub_netlists'] = [netlist.shared() for netlist in state['sub_netlists']]
+			state['_frozen'] = True
+			definition.__setstate__(Netlist.__read_only_state(state))
+			memo['shared'] = definition
+
+		return memo['shared']
+
+	@staticmethod
+	def __read_only_state(state: dict) -> dict:
+		for key in ('nodes', 'global_nodes'):
+			if key in state: state[key] = _ReadOnlyList(state[key])
+		if 'parameters' in state: state['parameters'] = _ReadOnlyDict(state['parameters'])
+		return state
+
+	def __attribute_state(self) -> tuple:
+		"""Shallow copy of the attributes that can be edited in place (`nodes.append`, `parameters[key] = value`, ...), compared on every memo lookup."""
+		return (list(self.nodes), list(self.global_nodes), dict(self.parameters), [id(netlist) for netlist in self.sub_netlists])
+
+	def _get_memo(self) -> dict:
+		memo = self.__dict__.get('_memo')
+		if memo is not None and not self.__dict__.get('_frozen'):
+			# in-place edits do not go through __setattr__, check this netlist and its sub-netlists (shared definitions are read only)
+			for netlist in self.sub_netlists:
+				if not netlist.__dict__.get('_frozen'): netlist._get_memo()
+			if '_memo' not in self.__dict__ or memo['state'] != self.__attribute_state():
+				self._invalidate()
+				memo = None
+		if memo is None:
+			# memoized values depend on the sub-netlists, they get a memo too so that their mutations are propagated here
+			for netlist in self.__dict__.get('sub_netlists', []): netlist._get_memo()
+			memo = {} if self.__dict__.get('_frozen') else {'state': self.__attribute_state()}
+			object.__setattr__(self, '_memo', memo)
+		return memo
+
 	def __init__(self, source_netlist: str = '', nodes: list[str] = [], circuit_name: Union[str, None] = None, instance_format: Optional[str] = None, parameters: dict = {}, sub_netlists: list['Netlist'] = []):
 		"""Initializes a Netlist object.
 
@@ -50,7 +223,7 @@ class Netlist:
 		self.parameters = {**self.parameters, **parameters}
 
 		self.sub_netlists = []
-		self.netlist_connections = []
+		self._nets = _NetTable()
 		self.source_netlist = source_netlist
 		self.nodes = nodes
 
@@ -72,9 +245,11 @@ class Netlist:
 
 		return 'Netlist'
 
-	def generate_instance(self, name: Optional[str] = None, nodes: Optional[list[str]] = None, instance_format: Optional[str] = None) -> str:
+	def generate_instance(self, name: Optional[str] = None, nodes: Optional[list[str]] = None, instance_format: Optional[str] = None, circuit_name: Optional[str] = None) -> str:
 		"""Generates an instance of the netlist subcircuit.
 		Override to insert parameters in the instance.
+
+		`circuit_name` overrides the name of the instantiated subcircuit (used for the suffixed names in the generated netlist).
 		"""
 		if name == None:
 			name = self.circuit_name
@@ -86,7 +261,7 @@ class Netlist:
 			nodes = self.nodes
 
 		params = {
-			**self.generate_source_netlist_params(),
+			**self.generate_source_netlist_params(circuit_name),
 			'nodes': ' '.join(nodes),
 			'name': name
 		}
@@ -98,6 +273,92 @@ class Netlist:
 		self.source_netlist = open(join(self.designs_dir, netlist_src)).read()
 		return self.source_netlist
 
+	def __terminal(self, net_index: int, node: str) -> int:
+		return self._nets.offsets[net_index] + self.sub_netlists[net_index].nodes.index(node)
+
+	def __preferred_name(self, name1: Optional[str], name2: Optional[str]) -> Optional[str]:
+		"""Picks the name of a merged net: a top-level node of this netlist wins over an internal name, otherwise `name1`."""
+		if name1 is None or (name2 is not None and name2 in self.nodes and name1 not in self.nodes):
+			return name2
+		return name1
+
+	def __merge(self, terminal1: int, terminal2: int, name: Optional[str] = None):
+		"""Merges the nets of two terminals. Merging two unnamed nets creates a wire (or extends an existing one)."""
+		nets = self._nets
+		name1 = self.__preferred_name(name, nets.names.get(nets.find(terminal1)))
+		name = self.__preferred_name(name1, nets.names.get(nets.find(terminal2)))
+		root = nets.union(terminal1, terminal2)
+		if name is not None:
+			nets.names[root] = name
+			nets.named.setdefault(name, root)
+		elif root not in nets.wires:
+			nets.wires[root] = self.wire_index
+			self.wire_index += 1
+
+	@property
+	def netlist_connections(self) -> list[list[str]]:
+		"""2D matrix of the net names connected to the sub-netlist nodes (read only, derived from the connectivity).
+
+		Row `i` holds the net of every node of `sub_netlists[i]`: the top-level node it is connected to, `wire{n}` for internal connections, or the node name itself if it is not connected.
+		"""
+		memo = self._get_memo()
+		if 'connections' not in memo:
+			memo['connections'] = self.__generate_connections()
+		return memo['connections']
+
+	def __generate_connections(self) -> list[list[str]]:
+		nets = self._nets
+		roots = [nets.find(terminal) for terminal in range(len(nets.links))]
+
+		# number the wires densely in creation order, skipping names that are in use
+		used_names = set(self.nodes) | set(nets.names.values())
+		wire_names = dict()
+		wire_number = 0
+		for root in sorted((root for root in nets.wires if root not in nets.names), key=nets.wires.get):
+			while f"wire{wire_number}" in used_names:
+				wire_number += 1
+			wire_names[root] = f"wire{wire_number}"
+			wire_number += 1
+
+		connections = []
+		for offset, netlist in zip(nets.offsets, self.sub_netlists):
+			connections.append([
+				nets.names.get(roots[offset + i]) or wire_names.get(roots[offset + i]) or node
+				for i, node in enumerate(netlist.nodes)
+			])
+		return connections
+
+	def __upgrade_state(self, state: dict) -> dict:
+		"""Converts the state of a netlist pickled with a `netlist_connections` matrix."""
+		state = dict(state)
+		matrix = state.pop('netlist_connections')
+		nets = _NetTable()
+		wires = dict()
+		named = []
+		for netlist, connections in zip(state.get('sub_netlists', []), matrix):
+			nets.add(len(netlist.nodes))
+			for node_index, (node, net_name) in enumerate(zip(netlist.nodes, connections)):
+				terminal = nets.offsets[-1] + node_index
+				if re.match("^wire[\\d]+$", net_name):
+					wires.setdefault(int(net_name[4:]), []).append(terminal)
+				elif net_name != node:
+					named.append((terminal, net_name))
+
+		for sequence, (_, terminals) in enumerate(sorted(wires.items())):
+			for terminal in terminals[1:]:
+				nets.union(terminals[0], terminal)
+			nets.wires[nets.find(terminals[0])] = sequence
+		for terminal, net_name in named:
+			if net_name in nets.named:
+				nets.union(terminal, nets.named[net_name])
+			else:
+				nets.named[net_name] = terminal
+			nets.names[nets.find(terminal)] = net_name
+
+		state['_nets'] = nets
+		state['wire_index'] = len(wires)
+		return state
+
 	def connect_subnets(
 		self,
 		net1: Union[int, 'Netlist'],
@@ -111,32 +372,21 @@ class Netlist:
 			- `net2`: The netlist to connect to. Either a reference to the Netlist object or it's index in the `sub_netlists` list.
 			- `node_mapping`: A list of 2-element tuples representing the connections between nodes of the netlists. The first element in the tuple is the name of the node of `net1` and the second value is the name of the node in `net2` to connect to.
 		"""
-		for mapping in node_mapping:
-			node1, node2 = mapping
-
-			net1_index = net1 if type(net1) == int else self.sub_netlists.index(net1)
-			net2_index = net2 if type(net2) == int else self.sub_netlists.index(net2)
-
-			netlist1 = self.sub_netlists[net1_index]
-			netlist2 = self.sub_netlists[net2_index]
+		if self.__dict__.get('_frozen'): self._raise_frozen()
 
-			node1_index = netlist1.nodes.index(node1)
-			node2_index = netlist2.nodes.index(node2)
+		net1_index = net1 if type(net1) == int else self.sub_netlists.index(net1)
+		net2_index = net2 if type(net2) == int else self.sub_netlists.index(net2)
 
-			connection_wire = ""
-			# if one of the nodes is already connected, then use that wire instead of creating a new wire
-			if re.match("^wire[\d]+$", self.netlist_connections[net1_index][node1_index]):
-				connection_wire = self.netlist_connections[net1_index][node1_index]
+		for mapping in node_mapping:
+			node1, node2 = mapping
 
-			elif re.match("^wire[\d]+$", self.netlist_connections[net2_index][node2_index]):
-				connection_wire = self.netlist_connections[net2_index][node2_index]
+			terminal1 = self.__terminal(net1_index, node1)
+			terminal2 = self.__terminal(net2_index, node2)
 
-			else:
-				connection_wire = f"wire{self.wire_index}"
-				self.wire_index += 1
+			# nets that are already connected (to a wire or a top-level node) are merged, not overwritten
+			self.__merge(terminal1, terminal2)
 
-			self.netlist_connections[net1_index][node1_index] = connection_wire
-			self.netlist_connections[net2_index][node2_index] = connection_wire
+		self._invalidate()
 
 
 	def connect_node(
@@ -150,15 +400,23 @@ class Netlist:
 		- `net`: The sub-netlist to connect. Either a reference to the Netlist object or it's index in the `sub_netlists` list.
 		- `node_mapping`: A list of 2-element tuples representing the connections between the netlist nodes and the top-level nodes. The first element in the tuple is the name of the node of `net` and the second value is the name of the top-level to connect to.
 		"""
+		if self.__dict__.get('_frozen'): self._raise_frozen()
+
 		net_index = net if type(net) == int else self.sub_netlists.index(net)
 
 		for mapping in node_mapping:
 			net_node, top_level_node = mapping
 
-			net = self.sub_netlists[net_index]
-			node_index = net.nodes.index(net_node)
+			terminal = self.__terminal(net_index, net_node)
 
-			self.netlist_connections[net_index][node_index] = top_level_node
+			if top_level_node in self._nets.named:
+				self.__merge(terminal, self._nets.named[top_level_node], top_level_node)
+			else:
+				root = self._nets.find(terminal)
+				self._nets.names[root] = self.__preferred_name(top_level_node, self._nets.names.get(root))
+				self._nets.named[top_level_node] = terminal
+
+		self._invalidate()
 
 	def add_netlists(self, netlists: list['Netlist']):
 		"""Adds sub-netlists.
@@ -166,18 +424,25 @@ class Netlist:
 		Parameters:
 		- `netlists`: A list of Netlist objects to add.
 		"""
+		if self.__dict__.get('_frozen'): self._raise_frozen()
+
 		for netlist in netlists:
 			self.sub_netlists.append(netlist)
-			self.netlist_connections.append(netlist.nodes.copy())
+			self._nets.add(len(netlist.nodes))
+			netlist._add_parent(self)
+
+		self._invalidate()
 
 	def connect_netlist(self, netlist: 'Netlist', node_mapping: list[tuple[str, str]]) -> int:
 		"""Adds a sub-netlist and connects it to top-level nodes.
 
+		The netlist is not copied. A shared immutable definition of it (see `Netlist.shared`) is added, later changes to `netlist` do not affect this netlist.
+
 		Parameters:
 		- `netlist`: The netlist object to add.
 		- `node_mapping`: A list of 2-element tuples representing the connections between the netlist nodes and the top-level nodes. The first element in the tuple is the name of the node of `netlist` and the second value is the name of the top-level to connect to.
 		"""
-		self.add_netlists([deepcopy(netlist)])
+		self.add_netlists([netlist.shared()])
 		netlist_index = len(self.sub_netlists) - 1
 
 		self.connect_node(net=netlist_index, node_mapping=node_mapping)
@@ -192,58 +457,117 @@ class Netlist:
 			**self.parameters
 		}
 
-	def __generate_self_subcircuit(self, prefix: str = '', suffix: str = '', with_pins: bool = True) -> str:
+	def structural_hash(self) -> str:
+		"""Returns a hash of everything that determines the SPICE subcircuit of this netlist (including the sub-netlists).
+
+		Netlists with equal hashes generate the same subcircuit directive. The hash is memoized and recomputed only after a mutation of this netlist or one of its sub-netlists.
+		"""
+		memo = self._get_memo()
+		if 'hash' in memo:
+			return memo['hash']
+
+		if self.source_netlist != "":
+			# the text of a source netlist is fully determined by its template parameters
+			key = self.source_netlist.format(**self.generate_source_netlist_params())
+		elif len(self.sub_netlists) > 0:
+			key = repr((
+				self.circuit_name,
+				self.nodes,
+				[(netlist.structural_hash(), netlist.generate_instance(str(i), self.netlist_connections[i])) for i, netlist in enumerate(self.sub_netlists)]
+			))
+		else:
+			key = ""
+
+		memo['hash'] = sha1(key.encode()).hexdigest()
+		return memo['hash']
+
+	def canonical_hash(self) -> str:
+		"""Returns a Weisfeiler-Lehman hash of the flattened device/net graph (see `glayout.spice.netlist_graph.canonical_hash`).
+
+		Topologically identical netlists have the same hash regardless of hierarchy and internal names. Memoized until the next mutation of this netlist or one of its sub-netlists.
+		"""
+		memo = self._get_memo()
+		if 'canonical_hash' not in memo:
+			from .netlist_graph import canonical_hash
+			memo['canonical_hash'] = canonical_hash(self)
+		return memo['canonical_hash']
+
+	def to_graph(self):
+		"""Returns the flattened device/net bipartite graph as a networkx MultiGraph (see `glayout.spice.netlist_graph.to_graph`)."""
+		from .netlist_graph import to_graph
+		return to_graph(self)
+
+	def __generate_self_subcircuit(self, prefix: str = '', suffix: str = '', with_pins: bool = True, subcircuit_names: Optional[dict[str, str]] = None) -> str:
 		"""Generates the top-level SPICE subcircuit directive.
 		The name of the subcircuit is set by `self.circuit_name`.
+
+		`subcircuit_names` maps structural hashes to the (suffixed) names to use for the sub-netlists. The generated text is memoized.
 		"""
 		generated_circuit_name = f"{prefix}{self.circuit_name}{suffix}"
+		child_names = tuple(
+			subcircuit_names.get(netlist.structural_hash(), netlist.circuit_name) if subcircuit_names else netlist.circuit_name
+			for netlist in self.sub_netlists
+		)
+
+		key = (self.structural_hash(), generated_circuit_name, with_pins, child_names)
+		cached = self._get_memo().get('text')
+		if cached is not None and cached[0] == key:
+			return cached[1]
 
 		if self.source_netlist != "":
-			return self.source_netlist.format(**self.generate_source_netlist_params(generated_circuit_name))
+			text = self.source_netlist.format(**self.generate_source_netlist_params(generated_circuit_name))
 
 		elif len(self.sub_netlists) > 0:
+			main_circuit = StringIO()
 			if with_pins:
-				main_circuit = f".subckt {generated_circuit_name} {' '.join(self.nodes)}\n"
+				main_circuit.write(f".subckt {generated_circuit_name} {' '.join(self.nodes)}\n")
 			else:
-				main_circuit = f".subckt {generated_circuit_name}\n"
-    
+				main_circuit.write(f".subckt {generated_circuit_name}\n")
+
 			for i, netlist in enumerate(self.sub_netlists):
-				main_circuit += netlist.generate_instance(str(i), self.netlist_connections[i]) + "\n"
+				main_circuit.write(netlist.generate_instance(str(i), self.netlist_connections[i], circuit_name=child_names[i]) + "\n")
 
-			main_circuit += f".ends {generated_circuit_name}"
+			main_circuit.write(f".ends {generated_circuit_name}")
 
-			return main_circuit
+			text = main_circuit.getvalue()
 
 		else:
-			return ""
-
-	def get_subcircuits_netlist_map(self, sub_netlists_only = False) -> dict[str, list['Netlist']]:
-		"""Generates a list of all the unique SPICE subcircuits directives used in the netlist."""
-		subcircuits = dict()
+			text = ""
 
-		# Get sub netlists' subcircuits
-		for netlist in self.sub_netlists:
-			subnetlist_subcircuits = netlist.get_subcircuits_netlist_map()
-
-			# For each subnetlists' subcircuit
-			for subckt in subnetlist_subcircuits:
-				subckt_netlists = subnetlist_subcircuits[subckt]
-
-				if subckt not in subcircuits:
-					# If it is unique, create an entry in the dict
-					subcircuits[subckt] = [*subckt_netlists]
-				else:
-					# If it is not unique, append the netlists to the dict
-					subcircuits[subckt] += subckt_netlists
+		self._get_memo()['text'] = (key, text)
+		return text
 
+	def get_unique_subcircuits(self, sub_netlists_only: bool = False) -> dict[str, list['Netlist']]:
+		"""Groups all the netlists in the hierarchy by structural hash, in the order their subcircuits are emitted (sub-netlists before their parents).
 
-		if not sub_netlists_only:
-			self_subckt = self.__generate_self_subcircuit()
-			if self_subckt not in subcircuits:
-				subcircuits[self_subckt] = [self]
+		Each netlist object is visited once, so shared sub-netlists do not make the traversal grow with the number of instances.
+		"""
+		subcircuits = dict()
+		visited = set()
+		# iterative post-order traversal
+		stack = [(self, False)]
+		while stack:
+			netlist, expanded = stack.pop()
+			if expanded:
+				if netlist is self and sub_netlists_only:
+					continue
+				subcircuits.setdefault(netlist.structural_hash(), []).append(netlist)
+				continue
+			if id(netlist) in visited:
+				continue
+			visited.add(id(netlist))
+			stack.append((netlist, True))
+			stack.extend((child, False) for child in reversed(netlist.sub_netlists))
 
 		return subcircuits
 
+	def get_subcircuits_netlist_map(self, sub_netlists_only = False) -> dict[str, list['Netlist']]:
+		"""Generates a list of all the unique SPICE subcircuits directives used in the netlist."""
+		return {
+			netlists[0].__generate_self_subcircuit(): netlists
+			for netlists in self.get_unique_subcircuits(sub_netlists_only).values()
+		}
+
 	def get_global_nodes_list(self) -> set[str]:
 		"""Generates a list of unique global nodes used in the netlist."""
 		global_nodes = set()
@@ -259,49 +583,168 @@ class Netlist:
 		"""Generates the final SPICE netlist for the design.
 
 		The final netlist is a set of SPICE subcircuit directives and global directives. The top-level subcircuit is set by `self.circuit_name`.
+		Subcircuits are deduplicated by structural hash. Repeated subcircuit names get a `_{n}` suffix in the output, the netlists themselves are not renamed.
 
 		Parameters:
 		- `only_subcircuits`: Only generates the subcircuit directives if set to `True`. (Default: `False`)
 		"""
 
 		# GENERATE UNIQUE SUBCIRCUIT DiRECTIVES
-		subcircuits_netlist_map = self.get_subcircuits_netlist_map(sub_netlists_only=True)
+		unique_subcircuits = self.get_unique_subcircuits(sub_netlists_only=True)
 
 		subcircuit_suffixes = dict()
-		# Get the unique netlists' list and set their suffixes
-		for subckt in subcircuits_netlist_map:
-			netlists = subcircuits_netlist_map[subckt]
+		subcircuit_names = dict()
+		# Set the emitted name of every unique subcircuit
+		for structural_hash, netlists in unique_subcircuits.items():
 			# All of these subcircuits will have the same name, so use any one
 			subckt_name = netlists[0].circuit_name
 
 			if subckt_name in subcircuit_suffixes:
 				# If a suffix exists, use it and increment it
-				for netlist in netlists: netlist.circuit_name = f"{netlist.circuit_name}_{subcircuit_suffixes[subckt_name]}"
+				subcircuit_names[structural_hash] = f"{subckt_name}_{subcircuit_suffixes[subckt_name]}"
 				subcircuit_suffixes[subckt_name] += 1
 			else:
 				# If a suffix doesn't exist, create it.
+				subcircuit_names[structural_hash] = subckt_name
 				subcircuit_suffixes[subckt_name] = 1
-
-		unique_subcircuits_list = []
-		# Generate all the unique subcircuits (generation is done again since suffixes were updated)
-		for subckt in subcircuits_netlist_map:
-			unique_subcircuits_list.append(
-				# Use any one since all will be equal
-				subcircuits_netlist_map[subckt][0].__generate_self_subcircuit()
-			)
 		# /GENERATE UNIQUE SUBCIRCUIT DiRECTIVES
 
 		# GENERATE THE FINAL NETLIST
-		subcircuits = '\n\n'.join(unique_subcircuits_list)
-		main_circuit = self.__generate_self_subcircuit(with_pins=with_pins)
+		spice_netlist = StringIO()
 		global_nodes = ' '.join(self.get_global_nodes_list())
 
-		self.spice_netlist = "" 
+		if len(global_nodes) > 0 and not only_subcircuits: spice_netlist.write(f".global {global_nodes}\n\n")
 
-		if len(global_nodes) > 0 and not only_subcircuits: self.spice_netlist += f".global {global_nodes}\n\n"
+		for i, (structural_hash, netlists) in enumerate(unique_subcircuits.items()):
+			if i > 0: spice_netlist.write("\n\n")
+			# Use any one since all will be equal
+			suffix = subcircuit_names[structural_hash][len(netlists[0].circuit_name):]
+			spice_netlist.write(netlists[0].__generate_self_subcircuit(suffix=suffix, subcircuit_names=subcircuit_names))
 
-		self.spice_netlist += subcircuits + "\n\n"
-		self.spice_netlist += main_circuit
+		spice_netlist.write("\n\n")
+		spice_netlist.write(self.__generate_self_subcircuit(with_pins=with_pins, subcircuit_names=subcircuit_names))
 		# /GENERATE THE FINAL NETLIST
 
+		self.spice_netlist = spice_netlist.getvalue()
+
 		return self.spice_netlist
+
+	def to_dict(self) -> dict:
+		"""Returns a JSON/msgpack serializable dict of the netlist and all of its sub-netlists.
+
+		Every netlist object is stored once (shared sub-netlists are referenced by index) in `netlists`, children before their parents, the last entry is this netlist. Connectivity is stored as the net root of every sub-netlist terminal. Fields with default values are omitted.
+		The dict is memoized until the next mutation and must not be modified. Load it with `Netlist.from_dict`.
+		"""
+		memo = self._get_memo()
+		if 'dict' in memo:
+			return memo['dict']
+
+		order = []
+		indices = dict()
+		visited = set()
+		# iterative post-order traversal
+		stack = [(self, False)]
+		while stack:
+			netlist, expanded = stack.pop()
+			if expanded:
+				indices[id(netlist)] = len(order)
+				order.append(netlist)
+				continue
+			if id(netlist) in visited:
+				continue
+			visited.add(id(netlist))
+			stack.append((netlist, True))
+			stack.extend((child, False) for child in reversed(netlist.sub_netlists))
+
+		memo['dict'] = {
+			'schema': NETLIST_SCHEMA_VERSION,
+			'netlists': [netlist.__to_entry(indices) for netlist in order],
+		}
+		return memo['dict']
+
+	def __to_entry(self, indices: dict[int, int]) -> dict:
+		nets = self._nets
+		entry = {
+			'circuit_name': self.circuit_name,
+			'nodes': list(self.nodes),
+			'global_nodes': list(self.global_nodes),
+			'source_netlist': self.source_netlist,
+			'instance_format': self.instance_format,
+			'parameters': dict(self.parameters),
+			'sub_netlists': [indices[id(netlist)] for netlist in self.sub_netlists],
+			'nets': [nets.find(terminal) for terminal in range(len(nets.links))],
+			'net_names': [[root, name] for root, name in nets.names.items()],
+			'named_nets': [[name, terminal] for name, terminal in nets.named.items()],
+			'wires': [[root, sequence] for root, sequence in nets.wires.items()],
+			'wire_index': self.wire_index,
+		}
+		if self.__dict__.get('_frozen'):
+			entry['shared'] = True
+		# keep the form compact, fields with default values are left out
+		return {key: value for key, value in entry.items() if key in ('circuit_name', 'nodes') or value != self.__entry_defaults().get(key)}
+
+	@classmethod
+	def __entry_defaults(cls) -> dict:
+		return {
+			'global_nodes': [],
+			'source_netlist': '',
+			'instance_format': cls.instance_format,
+			'parameters': {},
+			'sub_netlists': [],
+			'nets': [],
+			'net_names': [],
+			'named_nets': [],
+			'wires': [],
+			'wire_index': 0,
+		}
+
+	@classmethod
+	def from_dict(cls, data: dict) -> 'Netlist':
+		"""Creates a netlist from the output of `Netlist.to_dict`. Raises ValueError for an unsupported schema version."""
+		schema = data.get('schema')
+		if schema != NETLIST_SCHEMA_VERSION:
+			raise ValueError(f"unsupported Netlist schema version {schema}, expected {NETLIST_SCHEMA_VERSION}")
+
+		netlists = []
+		for entry in data['netlists']:
+			entry = {**cls.__entry_defaults(), **entry}
+			netlist = cls(
+				source_netlist=entry['source_netlist'],
+				nodes=list(entry['nodes']),
+				circuit_name=entry['circuit_name'],
+				instance_format=entry['instance_format'],
+				parameters=entry['parameters'],
+				sub_netlists=[netlists[index] for index in entry['sub_netlists']]
+			)
+			netlist.global_nodes = list(entry['global_nodes'])
+			netlist.wire_index = entry['wire_index']
+
+			nets = netlist._nets
+			nets.links = list(entry['nets'])
+			nets.sizes = [0] * len(nets.links)
+			for root in nets.links: nets.sizes[root] += 1
+			nets.names = {root: name for root, name in entry['net_names']}
+			nets.named = {name: terminal for name, terminal in entry['named_nets']}
+			nets.wires = {root: sequence for root, sequence in entry['wires']}
+
+			if entry.get('shared'):
+				netlist.__dict__.update(Netlist.__read_only_state({key: netlist.__dict__[key] for key in ('nodes', 'global_nodes', 'parameters')}))
+				object.__setattr__(netlist, '_frozen', True)
+			netlists.append(netlist)
+
+		return netlists[-1]
+
+	def to_bytes(self) -> bytes:
+		"""Returns the compact binary form of the netlist (`to_dict` packed with msgpack), memoized until the next mutation.
+
+		Cheap to send between processes and to store with dataset samples. Load it with `Netlist.from_bytes`. Requires the `msgpack` package.
+		"""
+		memo = self._get_memo()
+		if 'bytes' not in memo:
+			memo['bytes'] = _msgpack().packb(self.to_dict(), use_bin_type=True)
+		return memo['bytes']
+
+	@classmethod
+	def from_bytes(cls, data: bytes) -> 'Netlist':
+		"""Creates a netlist from the output of `Netlist.to_bytes`."""
+		return cls.from_dict(_msgpack().unpackb(data, raw=False))
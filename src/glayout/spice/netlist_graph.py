@@ -0,0 +1,193 @@
+from functools import lru_cache
+from hashlib import sha1
+from typing import Callable, Optional
+
+from .netlist import Netlist
+from .spice_parser import iter_spice_statements, parse_spice_value
+
+DEVICE_LABEL_PARAMETERS = ('l', 'w', 'm')
+"""Device parameters that are part of the device labels in the graph (and so of the canonical hash)."""
+
+# number of terminals of the SPICE elements that are not subcircuit instances
+_element_terminals = {'m': 4, 'r': 2, 'c': 2, 'l': 2, 'd': 2, 'q': 3, 'j': 3, 'v': 2, 'i': 2, 'e': 4, 'g': 4, 'f': 2, 'h': 2}
+
+class FlatDevice:
+	"""A device (primitive element) of a flattened netlist.
+
+	`terminals` are the role labels of the terminals (source and drain of a fet are both `sd`, they are interchangeable) and `nets` the names of the connected nets.
+	"""
+
+	def __init__(self, name: str, label: str, terminals: tuple[str, ...], nets: list[str]):
+		self.name = name
+		self.label = label
+		self.terminals = terminals
+		self.nets = nets
+
+@lru_cache(maxsize=1024)
+def _parse_definitions(text: str) -> tuple[dict, tuple]:
+	"""Splits SPICE text into its subcircuit definitions {lower case name: (pins, parameters, statements)} and the statements outside of subcircuits."""
+	definitions = dict()
+	top_statements = []
+	stack = []
+	for statement in iter_spice_statements(text.splitlines()):
+		tokens = statement.split()
+		keyword = tokens[0].lower()
+		if keyword == '.subckt':
+			pins = tuple(token for token in tokens[2:] if '=' not in token)
+			parameters = dict(token.lower().split('=', 1) for token in tokens[2:] if '=' in token)
+			stack.append((tokens[1].lower(), pins, parameters, []))
+		elif keyword == '.ends' and stack:
+			name, pins, parameters, statements = stack.pop()
+			definitions[name] = (pins, parameters, tuple(statements))
+		elif stack:
+			stack[-1][3].append(statement)
+		else:
+			top_statements.append(statement)
+	return definitions, tuple(top_statements)
+
+def __resolve(text: str, parameters: dict):
+	"""Value of a parameter assignment: a number, a parameter of the enclosing subcircuit or the (unevaluated) expression."""
+	text = text.strip("{}'\"").lower()
+	if text in parameters:
+		return parameters[text]
+	try:
+		return parse_spice_value(text)
+	except ValueError:
+		return text
+
+def __format_value(value) -> str:
+	return f"{value:.6g}" if isinstance(value, float) else str(value)
+
+def __flatten_statements(definitions: dict, statements: tuple, parameters: dict, net_of: Callable[[str], str], path: str, devices: list[FlatDevice], depth: int):
+	for statement in statements:
+		tokens = statement.split()
+		kind = tokens[0][0].lower()
+		if kind == '.':
+			continue
+		positional = [token for token in tokens[1:] if '=' not in token]
+		named = {key.lower(): __resolve(value, parameters) for key, value in (token.split('=', 1) for token in tokens[1:] if '=' in token)}
+
+		if kind in _element_terminals:
+			count = _element_terminals[kind]
+			nodes, rest = positional[:count], positional[count:]
+			model = ''
+			if rest:
+				value = __resolve(rest[0], parameters)
+				model = __format_value(value) if kind in 'rcl' else rest[0].lower()
+			fet = kind == 'm'
+		else:
+			nodes, model = positional[:-1], positional[-1].lower() if positional else ''
+			if model in definitions and depth < 64:
+				# subcircuit defined in the same source, flatten it with the instance parameters
+				pins, defaults, body = definitions[model]
+				child_nets = {pin: net_of(node) for pin, node in zip(pins, nodes)}
+				child_parameters = {key: __resolve(value, parameters) for key, value in defaults.items()}
+				child_parameters.update(named)
+				child_path = f"{path}{tokens[0]}/"
+				__flatten_statements(definitions, body, child_parameters, lambda node, child_nets=child_nets, child_path=child_path: child_nets.get(node) or f"{child_path}{node}", child_path, devices, depth + 1)
+				continue
+			fet = 'fet' in model and len(nodes) == 4
+
+		terminals = ('sd', 'g', 'sd', 'b') if fet and len(nodes) == 4 else tuple(f"t{i}" for i in range(len(nodes)))
+		if kind in 'rcl' and len(nodes) == 2:
+			# two terminal passives are symmetric
+			terminals = ('t', 't')
+		label_parameters = ','.join(f"{key}={__format_value(named[key])}" for key in DEVICE_LABEL_PARAMETERS if key in named)
+		devices.append(FlatDevice(f"{path}{tokens[0]}", f"{kind}:{model}:{label_parameters}", terminals, [net_of(node) for node in nodes]))
+
+def __flatten(netlist: Netlist, net_of: Callable[[str], str], path: str, overrides: dict, devices: list[FlatDevice], depth: int = 0):
+	if netlist.source_netlist != "":
+		definitions, top_statements = _parse_definitions(netlist.source_netlist.format(**netlist.generate_source_netlist_params()))
+		name = netlist.circuit_name.lower()
+		if name not in definitions and len(definitions) > 0:
+			name = list(definitions)[-1]
+		if name in definitions:
+			pins, defaults, statements = definitions[name]
+			pin_nets = {pin: net_of(node) for pin, node in zip(pins, netlist.nodes)}
+			parameters = {key: __resolve(value, {}) for key, value in defaults.items()}
+			parameters.update(overrides)
+			__flatten_statements(definitions, statements, parameters, lambda node: pin_nets.get(node) or net_of(node), path, devices, depth)
+		else:
+			__flatten_statements(definitions, top_statements, dict(overrides), net_of, path, devices, depth)
+		return
+
+	for i, (child, connections) in enumerate(zip(netlist.sub_netlists, netlist.netlist_connections)):
+		instance = child.generate_instance(str(i), connections).split()
+		child_overrides = {key.lower(): __resolve(value, {}) for key, value in (token.split('=', 1) for token in instance if '=' in token)}
+		child_path = f"{path}X{i}/"
+		child_nets = {node: net_of(connection) for node, connection in zip(child.nodes, connections)}
+		__flatten(child, lambda node, child_nets=child_nets, child_path=child_path: child_nets.get(node) or f"{child_path}{node}", child_path, child_overrides, devices, depth + 1)
+
+def flatten_netlist(netlist: Netlist) -> list[FlatDevice]:
+	"""Flattens the hierarchy of `netlist` into its devices.
+
+	Nets of the top-level nodes and global nodes keep their names, internal nets are named by their hierarchical path (e.g. `X1/X0/wire0`).
+	Device parameters given as expressions of subcircuit parameters (e.g. `l={l}`) are resolved from the instance and subcircuit parameters.
+	"""
+	global_nodes = netlist.get_global_nodes_list()
+	devices = []
+	__flatten(netlist, lambda node: node, '', {}, devices)
+	if global_nodes:
+		# global nodes are the same net at every level of the hierarchy
+		for device in devices:
+			device.nets = [net.rsplit('/', 1)[-1] if net.rsplit('/', 1)[-1] in global_nodes else net for net in device.nets]
+	return devices
+
+def __bipartite(netlist: Netlist) -> tuple[list[str], list[list[tuple[str, int]]], list[FlatDevice], list[str]]:
+	"""Node labels and labelled adjacency of the device/net graph, devices first then nets."""
+	devices = flatten_netlist(netlist)
+	pins = set(netlist.nodes)
+	net_index = dict()
+	for device in devices:
+		for net in device.nets:
+			net_index.setdefault(net, len(devices) + len(net_index))
+	nets = list(net_index)
+
+	labels = [device.label for device in devices] + [f"pin:{net}" if net in pins else "net" for net in nets]
+	adjacency = [[] for _ in labels]
+	for i, device in enumerate(devices):
+		for terminal, net in zip(device.terminals, device.nets):
+			adjacency[i].append((terminal, net_index[net]))
+			adjacency[net_index[net]].append((terminal, i))
+	return labels, adjacency, devices, nets
+
+def canonical_hash(netlist: Netlist, iterations: Optional[int] = None) -> str:
+	"""Weisfeiler-Lehman hash of the flattened device/net graph of `netlist`.
+
+	Netlists with the same devices (model, l, w, m) connected the same way have the same hash, independently of the hierarchy, instance and internal net names. Top-level nodes are labelled by name.
+	Equal hashes do not prove isomorphism (WL can not tell some regular graphs apart), different hashes prove the netlists differ.
+	`iterations` = number of refinement rounds, by default rounds run until the label partition is stable.
+	"""
+	labels, adjacency, _, _ = __bipartite(netlist)
+	labels = [sha1(label.encode()).hexdigest()[:16] for label in labels]
+	rounds = len(labels) if iterations is None else iterations
+	classes = len(set(labels))
+	for _ in range(rounds):
+		labels = [
+			sha1(f"{labels[node]}|{','.join(sorted(f'{terminal}:{labels[other]}' for terminal, other in neighbors))}".encode()).hexdigest()[:16]
+			for node, neighbors in enumerate(adjacency)
+		]
+		refined = len(set(labels))
+		if iterations is None and refined == classes:
+			break
+		classes = refined
+	return sha1(','.join(sorted(labels)).encode()).hexdigest()
+
+def to_graph(netlist: Netlist):
+	"""Returns the flattened device/net bipartite graph of `netlist` as a networkx MultiGraph (requires networkx).
+
+	Device nodes are `('device', name)` with attributes `kind='device'`, `label` (model and l, w, m) and net nodes `('net', name)` with `kind='net'`, `label` (`pin:<name>` for top-level nodes, else `net`).
+	Edges have a `terminal` attribute (source and drain of fets are both `sd`).
+	"""
+	import networkx
+
+	labels, _, devices, nets = __bipartite(netlist)
+	graph = networkx.MultiGraph(name=netlist.circuit_name)
+	for device, label in zip(devices, labels):
+		graph.add_node(('device', device.name), kind='device', label=label)
+	for net, label in zip(nets, labels[len(devices):]):
+		graph.add_node(('net', net), kind='net', label=label)
+	for device in devices:
+		for terminal, net in zip(device.terminals, device.nets):
+			graph.add_edge(('device', device.name), ('net', net), terminal=terminal)
+	return graph
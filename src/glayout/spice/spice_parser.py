@@ -0,0 +1,360 @@
+from array import array
+from os import PathLike
+from typing import Iterable, Iterator, Optional, Union
+
+import re
+
+import numpy as np
+
+from .netlist import Netlist
+
+SI_SUFFIXES = {
+	't': 1e12,
+	'g': 1e9,
+	'meg': 1e6,
+	'k': 1e3,
+	'mil': 25.4e-6,
+	'm': 1e-3,
+	'u': 1e-6,
+	'n': 1e-9,
+	'p': 1e-12,
+	'f': 1e-15,
+	'a': 1e-18,
+}
+"""SPICE scale factors (case insensitive). Letters after the scale factor are units and are ignored, e.g. `1.5fF` is 1.5e-15."""
+
+_value_pattern = re.compile(r"^([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmunpfa])?[a-z]*$", re.IGNORECASE)
+_inline_comment_pattern = re.compile(r"\s[$;].*$")
+
+def parse_spice_value(token: str) -> float:
+	"""Converts a SPICE number (e.g. `10k`, `2.2MEG`, `1.5fF`, `3e-15`) to a float. Raises ValueError if `token` is not a number."""
+	match = _value_pattern.match(token.strip())
+	if match is None:
+		raise ValueError(f"{token!r} is not a SPICE number")
+	value = float(match.group(1))
+	if match.group(2):
+		value *= SI_SUFFIXES[match.group(2).lower()]
+	return value
+
+def iter_spice_statements(lines: Iterable[str]) -> Iterator[str]:
+	"""Yields the SPICE statements of `lines` one at a time.
+
+	`+` continuation lines are joined to the statement they continue. Comment lines (`*`) and inline comments (` $ ...`, ` ; ...`) are dropped.
+	"""
+	statement = None
+	for line in lines:
+		line = line.strip()
+		if not line or line[0] == '*':
+			continue
+		line = _inline_comment_pattern.sub('', line)
+		if line[0] == '+':
+			if statement is not None:
+				statement = f"{statement} {line[1:].strip()}"
+			continue
+		if statement is not None:
+			yield statement
+		statement = line
+	if statement is not None:
+		yield statement
+
+class RCNetwork:
+	"""Parasitic (R/C) elements of a subcircuit, stored as NumPy arrays.
+
+	Nodes are referred to by their index in `nodes`. `resistors`/`capacitors` are (N,2) arrays of node indices with the values (ohm/farad) in `resistances`/`capacitances`.
+	`node_resistance` is the lumped resistance merged into every node by `reduce` (zeros otherwise).
+	"""
+
+	def __init__(self, nodes: list[str], resistors: np.ndarray, resistances: np.ndarray, capacitors: np.ndarray, capacitances: np.ndarray, node_resistance: Optional[np.ndarray] = None, ground: Iterable[str] = ('0', 'gnd')):
+		self.nodes = nodes
+		self.resistors = resistors
+		self.resistances = resistances
+		self.capacitors = capacitors
+		self.capacitances = capacitances
+		self.node_resistance = np.zeros(len(nodes)) if node_resistance is None else node_resistance
+		self.ground = tuple(ground)
+
+	def __len__(self) -> int:
+		return len(self.resistances) + len(self.capacitances)
+
+	def total_resistance(self) -> float:
+		return float(self.resistances.sum() + self.node_resistance.sum())
+
+	def total_capacitance(self) -> float:
+		return float(self.capacitances.sum())
+
+	def ground_mask(self) -> np.ndarray:
+		"""Boolean array, True for the nodes that are ground."""
+		ground = {name.lower() for name in self.ground}
+		return np.array([node.lower() in ground for node in self.nodes], dtype=bool)
+
+	def net_groups(self, separator: Optional[str] = '.') -> tuple[list[str], np.ndarray]:
+		"""Groups the nodes into nets: extraction subnodes (e.g. `VOUT.n3`) belong to the net before the first `separator`.
+
+		Returns the net names and the net index of every node. With `separator=None` every node is its own net.
+		"""
+		if separator is None:
+			return list(self.nodes), np.arange(len(self.nodes))
+		if len(self.nodes) == 0:
+			return list(), np.zeros(0, dtype=np.int64)
+		nets, groups = np.unique([node.split(separator, 1)[0] for node in self.nodes], return_inverse=True)
+		return nets.tolist(), groups.reshape(-1)
+
+	def net_capacitance(self, separator: Optional[str] = '.') -> dict[str, float]:
+		"""Total capacitance attached to every net (coupling capacitors count for both nets, ground is left out)."""
+		nets, groups = self.net_groups(separator)
+		totals = np.zeros(len(nets))
+		if len(self.capacitances):
+			ends = groups[self.capacitors]
+			# capacitors with both ends on the same net do not load it
+			external = ends[:, 0] != ends[:, 1]
+			totals += np.bincount(ends[external, 0], weights=self.capacitances[external], minlength=len(nets))
+			totals += np.bincount(ends[external, 1], weights=self.capacitances[external], minlength=len(nets))
+		return self.__drop_ground(nets, groups, totals)
+
+	def net_resistance(self, separator: Optional[str] = '.') -> dict[str, float]:
+		"""Total resistance of the resistors inside every net (both ends on the net) plus the lumped `node_resistance`."""
+		nets, groups = self.net_groups(separator)
+		totals = np.bincount(groups, weights=self.node_resistance, minlength=len(nets)) if len(self.nodes) else np.zeros(len(nets))
+		if len(self.resistances):
+			ends = groups[self.resistors]
+			internal = ends[:, 0] == ends[:, 1]
+			totals += np.bincount(ends[internal, 0], weights=self.resistances[internal], minlength=len(nets))
+		return self.__drop_ground(nets, groups, totals)
+
+	def __drop_ground(self, nets: list[str], groups: np.ndarray, totals: np.ndarray) -> dict[str, float]:
+		ground_nets = set(groups[self.ground_mask()].tolist()) if len(self.nodes) else set()
+		return {net: float(total) for i, (net, total) in enumerate(zip(nets, totals)) if i not in ground_nets}
+
+	def reduce(self, separator: Optional[str] = '.') -> 'RCNetwork':
+		"""Returns the net level RC network: the subnodes of every net are merged into one node.
+
+		Resistors inside a net are lumped into `node_resistance`, resistors between nets are kept, parallel capacitors between the same two nets are summed and capacitors inside a net are dropped.
+		"""
+		nets, groups = self.net_groups(separator)
+		node_resistance = np.bincount(groups, weights=self.node_resistance, minlength=len(nets)) if len(self.nodes) else np.zeros(0)
+
+		resistors = groups[self.resistors] if len(self.resistances) else self.resistors
+		internal = resistors[:, 0] == resistors[:, 1]
+		if internal.any():
+			node_resistance = node_resistance + np.bincount(resistors[internal, 0], weights=self.resistances[internal], minlength=len(nets))
+
+		capacitors = np.sort(groups[self.capacitors], axis=1) if len(self.capacitances) else self.capacitors
+		external = capacitors[:, 0] != capacitors[:, 1]
+		pairs, pair_index = np.unique(capacitors[external], axis=0, return_inverse=True)
+		capacitances = np.bincount(pair_index.reshape(-1), weights=self.capacitances[external], minlength=len(pairs))
+
+		return RCNetwork(
+			nodes=nets,
+			resistors=resistors[~internal],
+			resistances=self.resistances[~internal],
+			capacitors=pairs.reshape(-1, 2).astype(np.int64),
+			capacitances=capacitances,
+			node_resistance=node_resistance,
+			ground=self.ground
+		)
+
+class _Scope:
+	"""Statements, R/C elements and instantiated subcircuits of one `.subckt` (or of the top level) while parsing."""
+
+	def __init__(self, name: str, pins: list[str], parameters: dict):
+		self.name = name
+		self.pins = pins
+		self.parameters = parameters
+		self.header = ''
+		self.body: list[str] = []
+		self.children: list[Netlist] = []
+		self.references: list[str] = []
+		self.node_ids: dict[str, int] = {}
+		self.resistor_nodes = array('q')
+		self.resistances = array('d')
+		self.capacitor_nodes = array('q')
+		self.capacitances = array('d')
+		self.skipped: list[str] = []
+
+	def node(self, name: str) -> int:
+		node_id = self.node_ids.get(name)
+		if node_id is None:
+			node_id = self.node_ids[name] = len(self.node_ids)
+		return node_id
+
+	def add_element(self, tokens: list[str]):
+		"""Records resistors and capacitors with a numeric value, other elements only go in the body."""
+		if len(tokens) < 4:
+			return
+		value = None
+		for token in tokens[3:]:
+			key, _, text = token.rpartition('=')
+			if key.lower() not in ('', 'r', 'c', 'value'):
+				continue
+			try:
+				value = parse_spice_value(text)
+				break
+			except ValueError:
+				continue
+		if value is None:
+			# e.g. a model based resistor (R1 a b model l=.. w=..)
+			self.skipped.append(tokens[0])
+			return
+		if tokens[0][0] in 'rR':
+			self.resistor_nodes.extend((self.node(tokens[1]), self.node(tokens[2])))
+			self.resistances.append(value)
+		else:
+			self.capacitor_nodes.extend((self.node(tokens[1]), self.node(tokens[2])))
+			self.capacitances.append(value)
+
+	def rc_network(self, ground: Iterable[str]) -> RCNetwork:
+		return RCNetwork(
+			nodes=list(self.node_ids),
+			resistors=np.frombuffer(self.resistor_nodes, dtype=np.int64).reshape(-1, 2),
+			resistances=np.frombuffer(self.resistances, dtype=np.float64),
+			capacitors=np.frombuffer(self.capacitor_nodes, dtype=np.int64).reshape(-1, 2),
+			capacitances=np.frombuffer(self.capacitances, dtype=np.float64),
+			ground=ground
+		)
+
+class ParsedSpice:
+	"""Result of `parse_spice`.
+
+	- `netlist`: the selected subcircuit (see `parse_spice`) as a Netlist
+	- `parasitics`: the RCNetwork of the selected subcircuit
+	- `subcircuits`: every `.subckt` of the file as a Netlist, by lower case name
+	- `rc_networks`: the RCNetwork of every subcircuit by lower case name, the top level statements are under `''`
+	- `skipped`: names of the R/C elements without a numeric value (not in the RC networks)
+	"""
+
+	def __init__(self, netlist: Optional[Netlist], parasitics: RCNetwork, subcircuits: dict[str, Netlist], rc_networks: dict[str, RCNetwork], skipped: list[str]):
+		self.netlist = netlist
+		self.parasitics = parasitics
+		self.subcircuits = subcircuits
+		self.rc_networks = rc_networks
+		self.skipped = skipped
+
+def __escape(text: str) -> str:
+	"""Escapes braces so SPICE text can be used as a Netlist source template."""
+	return text.replace('{', '{{').replace('}', '}}')
+
+def __split_parameters(tokens: list[str]) -> tuple[list[str], list[str]]:
+	"""Splits the tokens of a `.subckt` or instance statement into names and parameters, the parameters start at `PARAMS:` (case insensitive) or at the first `key=value`."""
+	for i, token in enumerate(tokens):
+		if '=' in token or token.lower() == 'params:':
+			return tokens[:i], tokens[i:]
+	return tokens, []
+
+def __parse_parameters(tokens: list[str]) -> dict:
+	parameters = dict()
+	for token in tokens:
+		if token.lower() == 'params:':
+			continue
+		key, _, text = token.partition('=')
+		try:
+			parameters[key] = parse_spice_value(text)
+		except ValueError:
+			parameters[key] = text
+	return parameters
+
+def __close_scope(scope: _Scope) -> Netlist:
+	source = '\n'.join(([scope.header] if scope.header else []) + scope.body + (['.ends {circuit_name}'] if scope.header else []))
+	netlist = Netlist(source_netlist=source, nodes=scope.pins, circuit_name=scope.name, parameters=scope.parameters)
+	netlist.add_netlists(scope.children)
+	return netlist
+
+def parse_spice(lines: Iterable[str], top: Optional[str] = None, top_name: str = 'top', ground: Iterable[str] = ('0', 'gnd')) -> ParsedSpice:
+	"""Parses SPICE (e.g. a PEX netlist) statement by statement, the input is consumed line by line and never read as a whole.
+
+	Handles `+` continuations, SI scale factors, nested `.subckt` definitions and subcircuit parameters (`.subckt name pins... [PARAMS:] key=value`).
+	Every subcircuit becomes a Netlist whose source is its SPICE text, the subcircuits it defines or instantiates (from the same file) are its sub-netlists, so `generate_netlist` writes a self contained netlist.
+	R/C elements with numeric values are collected into NumPy arrays (see RCNetwork) for per net totals and reduction.
+
+	Parameters:
+	- `lines`: an iterable of SPICE lines (e.g. an open file)
+	- `top`: name of the subcircuit to select. By default the top level statements are selected if there are any elements outside of subcircuits, else the last subcircuit defined at the top level.
+	- `top_name`: circuit name of the Netlist made of the top level statements
+	- `ground`: names of the ground nodes (case insensitive), excluded from the per net totals
+	"""
+	subcircuits: dict[str, Netlist] = dict()
+	rc_networks: dict[str, RCNetwork] = dict()
+	closed: list[_Scope] = []
+	skipped: list[str] = []
+	top_scope = _Scope(top_name, [], {})
+	stack = [top_scope]
+	last_subcircuit = None
+
+	for statement in iter_spice_statements(lines):
+		tokens = statement.split()
+		keyword = tokens[0].lower()
+		scope = stack[-1]
+
+		if keyword == '.subckt':
+			if len(tokens) < 2:
+				raise ValueError(f"invalid .subckt statement: {statement}")
+			pins, parameter_tokens = __split_parameters(tokens[2:])
+			parameters = __parse_parameters(parameter_tokens)
+			parameter_text = ' '.join(parameter_tokens)
+			child = _Scope(tokens[1], pins, parameters)
+			child.header = '.subckt {circuit_name} {nodes}' + (f" {__escape(parameter_text)}" if parameter_text else '')
+			stack.append(child)
+		elif keyword == '.ends':
+			if len(stack) == 1:
+				raise ValueError(f".ends without .subckt: {statement}")
+			stack.pop()
+			closed.append(scope)
+			netlist = __close_scope(scope)
+			subcircuits[scope.name.lower()] = netlist
+			rc_networks[scope.name.lower()] = scope.rc_network(ground)
+			skipped.extend(scope.skipped)
+			if len(stack) == 1:
+				last_subcircuit = scope.name.lower()
+			else:
+				stack[-1].children.append(netlist)
+		elif keyword == '.end':
+			break
+		else:
+			scope.body.append(__escape(statement))
+			if keyword[0] in 'rc':
+				scope.add_element(tokens)
+			elif keyword[0] == 'x':
+				# the subcircuit name is the last token before the parameters
+				names, _ = __split_parameters(tokens[1:])
+				if names:
+					scope.references.append(names[-1].lower())
+
+	if len(stack) > 1:
+		raise ValueError(f"missing .ends for subcircuit {stack[-1].name}")
+
+	# instantiated subcircuits can be defined after they are used, link them once everything is parsed
+	for scope in closed + [top_scope]:
+		netlist = subcircuits.get(scope.name.lower()) if scope is not top_scope else None
+		linked = {id(child) for child in scope.children}
+		missing = []
+		for name in dict.fromkeys(scope.references):
+			child = subcircuits.get(name)
+			if child is not None and child is not netlist and id(child) not in linked:
+				linked.add(id(child))
+				missing.append(child)
+		if netlist is not None:
+			netlist.add_netlists(missing)
+		else:
+			scope.children.extend(missing)
+
+	rc_networks[''] = top_scope.rc_network(ground)
+	skipped.extend(top_scope.skipped)
+	has_top_elements = any(statement[0] not in '.' for statement in top_scope.body)
+
+	if top is not None:
+		if top.lower() not in subcircuits:
+			raise ValueError(f"subcircuit {top} not found")
+		selected = top.lower()
+		netlist = subcircuits[selected]
+	elif has_top_elements or last_subcircuit is None:
+		selected = ''
+		netlist = __close_scope(top_scope)
+	else:
+		selected = last_subcircuit
+		netlist = subcircuits[selected]
+
+	return ParsedSpice(netlist, rc_networks[selected], subcircuits, rc_networks, skipped)
+
+def parse_spice_file(path: Union[str, PathLike], top: Optional[str] = None, ground: Iterable[str] = ('0', 'gnd')) -> ParsedSpice:
+	"""Parses a SPICE file (streamed line by line), see `parse_spice`."""
+	with open(path, 'r') as spice_file:
+		return parse_spice(spice_file, top=top, ground=ground)
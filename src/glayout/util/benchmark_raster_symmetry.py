@@ -0,0 +1,78 @@
+"""
+Benchmark for the raster symmetry scores.
+
+Scores fets of increasing size and an asymmetric two device layout with raster_symmetry_scores and
+with the reference that XORs the component with its mirror images (gdsfactory boolean, as
+calculate_symmetry_scores(method="exact") in physical_features.py). Reports the time of both and
+checks that every raster score is within its error bound of the reference score.
+
+usage: python benchmark_raster_symmetry.py [--pdk sky130|gf180] [--resolution 0.01] [--skip-reference]
+"""
+import argparse
+import time
+
+from gdsfactory.component import Component
+from gdsfactory.geometry.boolean import boolean
+
+from glayout.primitives.fet import nmos, pmos
+from glayout.util.raster_symmetry import raster_symmetry_scores
+
+# (name, fet, width, fingers, multipliers)
+CONFIGS = [
+	("nmos small", nmos, 1, 2, 1),
+	("nmos medium", nmos, 3, 8, 2),
+	("pmos medium", pmos, 3, 8, 2),
+	("nmos large", nmos, 5, 20, 4),
+]
+
+
+def reference_symmetry_scores(component: Component) -> tuple[float, float]:
+	"""1 - area of XOR(component, mirror image) / area, about the x=0 and y=0 axes"""
+	area = component.area()
+	if area == 0:
+		return (1.0, 1.0)
+	scores = list()
+	for mirror_line in (((0, -100), (0, 100)), ((-100, 0), (100, 0))):
+		copy = component.copy()
+		copy.unlock()
+		scores.append(1.0 - boolean(A=copy, B=copy.copy().mirror(*mirror_line), operation="xor").area() / area)
+	return tuple(scores)
+
+
+def two_device_layout(pdk) -> Component:
+	top = Component("asymmetric_pair")
+	top << nmos(pdk, width=5, fingers=8, multipliers=2)
+	ref = top << pmos(pdk, width=3, fingers=5)
+	ref.movex(14.305).movey(3.1)
+	return top
+
+
+def main():
+	parser = argparse.ArgumentParser(description="time raster symmetry scores against the gdsfactory boolean XOR")
+	parser.add_argument("--pdk", choices=["sky130", "gf180"], default="sky130")
+	parser.add_argument("--resolution", type=float, default=0.01, help="raster resolution (um) around non rectilinear edges")
+	parser.add_argument("--skip-reference", action="store_true", help="only time raster_symmetry_scores")
+	args = parser.parse_args()
+	if args.pdk == "sky130":
+		from glayout.pdk.sky130_mapped import sky130_mapped_pdk as pdk
+	else:
+		from glayout.pdk.gf180_mapped import gf180_mapped_pdk as pdk
+
+	components = [(name, fet(pdk, width=width, fingers=fingers, multipliers=multipliers)) for name, fet, width, fingers, multipliers in CONFIGS]
+	components.append(("asymmetric pair", two_device_layout(pdk)))
+	for name, component in components:
+		start = time.perf_counter()
+		scores = raster_symmetry_scores(component, resolution=args.resolution)
+		elapsed = time.perf_counter() - start
+		line = f"{name:16s}: raster {elapsed:7.3f} s, scores {scores['horizontal']:.6f}/{scores['vertical']:.6f} (bound {scores['error_bound']:.2e}, {len(scores['layers'])} layers)"
+		if not args.skip_reference:
+			start = time.perf_counter()
+			reference = reference_symmetry_scores(component)
+			elapsed_reference = time.perf_counter() - start
+			deviation = max(abs(scores["horizontal"] - reference[0]), abs(scores["vertical"] - reference[1]))
+			line += f", reference {elapsed_reference:7.3f} s ({elapsed_reference / elapsed:.0f}x), deviation {deviation:.1e} within bound {deviation <= scores['error_bound'] + 1e-9}"
+		print(line)
+
+
+if __name__ == "__main__":
+	main()
@@ -5,11 +5,13 @@ from gdsfactory.components.rectangle import rectangle
 from gdsfactory.port import Port
 from typing import Callable, Union, Optional, Iterable
 from decimal import Decimal
+import numpy as np
 from gdsfactory.functions import transformed
 from gdsfactory.functions import move as __gf_move
 from glayout.pdk.mappedpdk import MappedPDK
 from gdstk import rectangle as primitive_rectangle
 from .port_utils import add_ports_perimeter, rename_ports_by_list, parse_direction
+from .spatial_index import layer_bbox
 
 
 @validate_arguments
@@ -58,16 +60,16 @@ def move(custom_comp: Union[Port, ComponentReference, Component], offsetxy: tupl
 	returns the modified custom_comp
 	"""
 	if layer and isinstance(custom_comp, Component):
-		custom_comp_ext = custom_comp.extract(layers=[layer,])
+		layer_center = layer_bbox(custom_comp, layer).mean(axis=0)
 	elif layer and isinstance(custom_comp, ComponentReference):
 		raise NotImplementedError("layer not implemented for comp ref")
 	elif layer and isinstance(custom_comp,Port):
 		raise TypeError("move:layer option for Port does not exist")
 	else:
-		custom_comp_ext = custom_comp
+		layer_center = custom_comp.center
 	if destination is not None:
-		xoffset = destination[0] - custom_comp_ext.center[0] if destination[0] is not None else 0
-		yoffset = destination[1] - custom_comp_ext.center[1] if destination[1] is not None else 0
+		xoffset = destination[0] - layer_center[0] if destination[0] is not None else 0
+		yoffset = destination[1] - layer_center[1] if destination[1] is not None else 0
 	if isinstance(custom_comp, Port):
 		if destination is None:
 			custom_comp = custom_comp.move_copy(offsetxy)
@@ -130,14 +132,8 @@ def align_comp_to_port(
 	rtr_comp_ref = will return a component reference if set true, else return component
 	"""
 	# find center and bbox
-	if isinstance(custom_comp, ComponentReference):
-		comp_type = transformed(custom_comp)
-	else:
-		comp_type = custom_comp
-	if layer:
-		comp_type = comp_type.extract([layer])
-	cbbox = comp_type.bbox
-	ccenter = comp_type.center
+	cbbox = layer_bbox(custom_comp, layer) if layer else custom_comp.bbox
+	ccenter = ((cbbox[0][0] + cbbox[1][0]) / 2, (cbbox[0][1] + cbbox[1][1]) / 2)
 	# setup
 	xdim = abs(cbbox[1][0] - cbbox[0][0])
 	ydim = abs(cbbox[1][1] - cbbox[0][1])
@@ -201,6 +197,129 @@ def align_comp_to_port(
 		return transformed(comp_ref)
 
 
+# database units per um (gdsfactory 1nm grid), batch placement math is done in these integer units
+_DBU_PER_UM = 1000
+
+
+def __to_dbu(values) -> np.ndarray:
+	"""converts an array like of um values into an int64 array of database units"""
+	return np.rint(np.asarray(values, dtype=np.float64) * _DBU_PER_UM).astype(np.int64)
+
+
+def __as_ref(custom_comp: Union[Component, ComponentReference]) -> ComponentReference:
+	return custom_comp if isinstance(custom_comp, ComponentReference) else custom_comp.ref()
+
+
+def __alignment_signs(align_to: Port, alignment: Optional[tuple[Optional[str],Optional[str]]]) -> tuple[int,int,bool,bool]:
+	"""parses an align_comp_to_port style alignment into (xsign, ysign, xmove, ymove)
+	xsign is -1 for left, 0 for center, 1 for right (ysign: -1 bottom, 0 center, 1 top)
+	xmove/ymove are False if that dim should not be moved (alignment of None)
+	"""
+	if alignment is None:
+		orientation = round(align_to.orientation)
+		if orientation == 0:# facing east
+			return (1, 0, True, True)
+		elif orientation == 180:# facing west
+			return (-1, 0, True, True)
+		elif orientation == 270:# facing south
+			return (0, -1, True, True)
+		elif orientation == 90:# facing north
+			return (0, 1, True, True)
+		raise ValueError("port must be vertical or horizontal")
+	xalign = (alignment[0] or "none").lower().strip()
+	yalign = (alignment[1] or "none").lower().strip()
+	if "none" in xalign:
+		xsign, xmove = 0, False
+	elif xalign[0] in "lcr":
+		xsign, xmove = {"l": -1, "c": 0, "r": 1}[xalign[0]], True
+	else:
+		raise ValueError("please specify valid x alignment of l/r/c/None")
+	if "none" in yalign:
+		ysign, ymove = 0, False
+	elif yalign[0] in "bct":
+		ysign, ymove = {"b": -1, "c": 0, "t": 1}[yalign[0]], True
+	else:
+		raise ValueError("please specify valid y alignment of t/b/c/None")
+	return (xsign, ysign, xmove, ymove)
+
+
+def place_many(
+	custom_comps: list[Union[Component, ComponentReference]],
+	transforms: Union[list[tuple[float,float]], np.ndarray],
+	destination: bool = False
+) -> list[ComponentReference]:
+	"""moves many components/componentReferences in one pass
+	all offsets are computed at once in integer database units (so no Decimal conversions are needed)
+	args:
+	custom_comps = list of Component or ComponentReference (components are converted to references)
+	transforms = (N,2) array like of (x,y) offsets. If destination=True these are instead (x,y) destinations for the center of each comp
+	destination = interpret transforms as center destinations (same as the move function destination option)
+	returns list of ComponentReference (componentReferences passed in are modified, mutable)
+	"""
+	refs = [__as_ref(comp) for comp in custom_comps]
+	if len(refs) == 0:
+		return refs
+	transforms_dbu = __to_dbu(transforms).reshape(-1, 2)
+	if len(transforms_dbu) != len(refs):
+		raise ValueError("place_many: transforms and custom_comps must have the same length")
+	if destination:
+		bboxes = __to_dbu([ref.bbox for ref in refs])
+		# double everything so that the bbox center stays an integer
+		offsets2x = 2 * transforms_dbu - (bboxes[:, 0] + bboxes[:, 1])
+		offsets = offsets2x / (2 * _DBU_PER_UM)
+	else:
+		offsets = transforms_dbu / _DBU_PER_UM
+	for ref, offset in zip(refs, offsets.tolist()):
+		ref.move(tuple(offset))
+	return refs
+
+
+def align_many(
+	custom_comps: list[Union[Component, ComponentReference]],
+	align_to: list[Port],
+	alignments: Optional[list[Optional[tuple[Optional[str],Optional[str]]]]] = None,
+	layer: Optional[tuple[int,int]] = None
+) -> list[ComponentReference]:
+	"""batch version of align_comp_to_port, aligns custom_comps[i] to align_to[i] with alignments[i]
+	bboxes are read once per comp and all offsets are computed at once with integer math
+	args:
+	custom_comps = list of Component or ComponentReference to align
+	align_to = list of Port to align to (same length as custom_comps)
+	alignments = list of alignment tuples (see align_comp_to_port), a None entry (or alignments=None) uses the port orientation default
+	layer = extract this layer from each component and align to this layer.
+	returns list of ComponentReference (componentReferences passed in are modified, mutable)
+	"""
+	count = len(custom_comps)
+	if len(align_to) != count:
+		raise ValueError("align_many: align_to and custom_comps must have the same length")
+	alignments = [None] * count if alignments is None else list(alignments)
+	if len(alignments) != count:
+		raise ValueError("align_many: alignments and custom_comps must have the same length")
+	refs = [__as_ref(comp) for comp in custom_comps]
+	if count == 0:
+		return refs
+	# gather all geometry in integer database units
+	if layer:
+		bboxes = __to_dbu([layer_bbox(ref, layer) for ref in refs])
+	else:
+		bboxes = __to_dbu([ref.bbox for ref in refs])
+	port_centers = __to_dbu([port.center for port in align_to])
+	port_widths = __to_dbu([port.width for port in align_to])
+	is_EW = np.array([bool(round(port.orientation + 90) % 180) for port in align_to])
+	signs = np.array([__alignment_signs(port, alignment) for port, alignment in zip(align_to, alignments)], dtype=np.int64)
+	# all math below is done on 2x values so that centers stay integer
+	dims = bboxes[:, 1] - bboxes[:, 0]
+	movcenter2x = 2 * port_centers - (bboxes[:, 0] + bboxes[:, 1])
+	mov_lr2x = np.abs(np.where(is_EW, dims[:, 0], port_widths - dims[:, 0]))
+	mov_updown2x = np.abs(np.where(is_EW, port_widths - dims[:, 1], dims[:, 1]))
+	xmov2x = (movcenter2x[:, 0] + signs[:, 0] * mov_lr2x) * signs[:, 2]
+	ymov2x = (movcenter2x[:, 1] + signs[:, 1] * mov_updown2x) * signs[:, 3]
+	offsets = np.stack((xmov2x, ymov2x), axis=1) / (2 * _DBU_PER_UM)
+	for ref, offset in zip(refs, offsets.tolist()):
+		ref.move(tuple(offset))
+	return refs
+
+
 @validate_arguments
 def to_decimal(elements: Union[tuple,list,float,int,str]):
 	"""converts all elements of list like object into decimals
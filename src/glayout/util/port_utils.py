@@ -8,6 +8,7 @@ from pathlib import Path
 import pickle
 from PrettyPrint import PrettyPrintTree
 import math
+from .spatial_index import layer_bbox
 
 
 @validate_arguments
@@ -218,7 +219,7 @@ def add_ports_perimeter(custom_comp: Component, layer: tuple[int, int], prefix:
 	"""
 	if "_" not in prefix:
 		raise ValueError("you need underscore char in prefix")
-	compbbox = custom_comp.extract(layers=(layer,)).bbox
+	compbbox = layer_bbox(custom_comp, layer)
 	width = compbbox[1][0] - compbbox[0][0]
 	height = compbbox[1][1] - compbbox[0][1]
 	custom_comp.add_port(name=prefix+"W",width=height,orientation=180,center=(compbbox[0][0],compbbox[0][1]+height/2),layer=layer,port_type="electrical")
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from gdsfactory.component import Component
+
+from .spatial_index import _DBU_PER_UM
+
+# symmetry axes: name -> array axis flipped by the mirror (horizontal: x -> -x, vertical: y -> -y)
+_AXES = {"horizontal": 1, "vertical": 0}
+
+
+def _edges(polygons: list) -> tuple:
+	"""(start points, end points, polygon index) of the edges of all polygons"""
+	sizes = [len(polygon) for polygon in polygons]
+	starts = np.concatenate(polygons)
+	nexts = np.arange(len(starts)) + 1
+	nexts[np.cumsum(sizes) - 1] = np.cumsum([0] + sizes[:-1])
+	return starts, starts[nexts], np.repeat(np.arange(len(polygons)), sizes)
+
+
+def _slanted_edges(polygons: list) -> list:
+	"""(start, end) points of the non rectilinear edges of polygons"""
+	starts, ends, _ = _edges(polygons)
+	slanted = (starts[:, 0] != ends[:, 0]) & (starts[:, 1] != ends[:, 1])
+	return list(zip(starts[slanted], ends[slanted]))
+
+
+class _Grid:
+	"""non uniform grid whose breakpoints are the polygon coordinates (database units) and their mirror images
+	every rectilinear polygon on the database grid is an exact union of cells
+	args:
+	polygons = list of (N,2) int64 arrays of points
+	step = optional max cell size (database units) over the extent of non rectilinear edges, bounds the cells they cross
+	"""
+
+	def __init__(self, polygons: list, step: Optional[int] = None):
+		points = np.concatenate(polygons)
+		xs, ys = np.unique(np.abs(points[:, 0])), np.unique(np.abs(points[:, 1]))
+		if step:
+			refined_x, refined_y = [xs], [ys]
+			for start, end in _slanted_edges(polygons):
+				(x0, y0), (x1, y1) = np.minimum(start, end), np.maximum(start, end)
+				refined_x.append(np.abs(np.arange(x0, x1, step)))
+				refined_y.append(np.abs(np.arange(y0, y1, step)))
+			xs, ys = np.unique(np.concatenate(refined_x)), np.unique(np.concatenate(refined_y))
+		# symmetric about 0, so reversing the cell order of an axis mirrors about that axis
+		self.xs = np.concatenate((-xs[::-1], xs[xs > 0] if xs[0] == 0 else xs))
+		self.ys = np.concatenate((-ys[::-1], ys[ys > 0] if ys[0] == 0 else ys))
+		self.widths, self.heights = np.diff(self.xs), np.diff(self.ys)
+		# cell centers (doubled to stay integer)
+		self.xcenters, self.ycenters = self.xs[:-1] + self.xs[1:], self.ys[:-1] + self.ys[1:]
+
+	@property
+	def shape(self) -> tuple:
+		return (len(self.heights), len(self.widths))
+
+	def area(self, mask: np.ndarray) -> int:
+		"""area (database units squared) of the cells set in mask"""
+		return int(self.heights @ (mask @ self.widths))
+
+	def rasterize(self, polygons: list) -> np.ndarray:
+		"""bool mask of the cells whose center is inside the union of polygons (even-odd per polygon)"""
+		rows, cols = self.shape
+		starts, ends, polygon_ids = _edges(polygons)
+		# edges crossing a row center: rows with ymin <= center < ymax
+		x1, y1, x2, y2 = 2 * starts[:, 0], 2 * starts[:, 1], 2 * ends[:, 0], 2 * ends[:, 1]
+		lo = np.searchsorted(self.ycenters, np.minimum(y1, y2), side="left")
+		hi = np.searchsorted(self.ycenters, np.maximum(y1, y2), side="left")
+		counts = np.where(y1 != y2, hi - lo, 0)
+		edge = np.repeat(np.arange(len(starts)), counts)
+		row = np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+		yc = self.ycenters[row]
+		x = x1[edge] + (yc - y1[edge]) * (x2[edge] - x1[edge]) / (y2[edge] - y1[edge])
+		# pair the crossings of each polygon and row into [xa, xb) spans, mark the cells whose center is inside
+		order = np.lexsort((x, row, polygon_ids[edge]))
+		row, x = row[order][0::2], x[order]
+		first_col = np.searchsorted(self.xcenters, x[0::2], side="left")
+		end_col = np.searchsorted(self.xcenters, x[1::2], side="left")
+		size = rows * (cols + 1)
+		diff = np.bincount(row * (cols + 1) + first_col, minlength=size) - np.bincount(row * (cols + 1) + end_col, minlength=size)
+		return np.cumsum(diff.reshape(rows, cols + 1)[:, :-1], axis=1) > 0
+
+	def error_bound(self, polygons: list) -> int:
+		"""upper bound (database units squared) on the area misclassified by rasterize:
+		the cells crossed by non rectilinear edges (rectilinear edges lie on cell borders)"""
+		bound = 0
+		for (xa, ya), (xb, yb) in _slanted_edges(polygons):
+			# column slabs spanned by the edge, and the rows covering the edge inside each slab
+			first, last = np.searchsorted(self.xs, min(xa, xb), side="left"), np.searchsorted(self.xs, max(xa, xb), side="left")
+			slab = self.xs[first:last + 1]
+			y = ya + (slab - xa) * (yb - ya) / (xb - xa)
+			low, high = np.minimum(y[:-1], y[1:]), np.maximum(y[:-1], y[1:])
+			y0 = self.ys[np.searchsorted(self.ys, low, side="right") - 1]
+			y1 = self.ys[np.searchsorted(self.ys, high, side="left")]
+			bound += int((np.diff(slab) * (y1 - y0)).sum())
+		return bound
+
+
+def _polygon_area(polygons: list) -> int:
+	"""sum of the (shoelace) areas of polygons in database units squared, overlaps counted once per polygon"""
+	starts, ends, polygon_ids = _edges(polygons)
+	cross = starts[:, 0] * ends[:, 1] - ends[:, 0] * starts[:, 1]
+	return int(np.abs(np.bincount(polygon_ids, weights=cross)).sum()) // 2
+
+
+def _asymmetry(polygons: list, step: Optional[int]) -> dict:
+	"""mirrored XOR area per axis and error bound of the union of polygons (database units squared)"""
+	grid = _Grid(polygons, step)
+	mask = grid.rasterize(polygons)
+	result = {axis: grid.area(mask ^ np.flip(mask, axis=flip)) for axis, flip in _AXES.items()}
+	# the XOR can be wrong where either the layout or its mirror image is
+	result["error_bound"] = 2 * grid.error_bound(polygons)
+	return result
+
+
+def raster_symmetry_scores(component: Component, resolution: Optional[float] = 0.01, by_layer: bool = True, workers: Optional[int] = None) -> dict:
+	"""mirror symmetry of a component about the x=0 (horizontal) and y=0 (vertical) axes, score = 1 - XOR(layout, mirror) area / area
+	same definition as XORing the component with its mirror image over all layers (gdsfactory boolean), but the union
+	of the layers is rasterized on a grid whose cells are bounded by the polygon coordinates, so the result is exact
+	for rectilinear layouts on the 1nm grid. Non rectilinear edges are resolved to the cells they cross.
+	args:
+	component = layout to score, area is the sum of its polygon areas (component.area())
+	resolution = max cell size (um) over the extent of non rectilinear edges, smaller tightens error_bound (None: no refinement)
+	by_layer = also score every layer separately (area = polygon area of the layer)
+	workers = threads used for the layers (default: one per layer up to the cpu count)
+	returns dict with keys horizontal, vertical, error_bound (max deviation of each score from the exact boolean score)
+	and layers ({layer: dict with the same keys}, if by_layer)
+	"""
+	polygons_by_layer = {
+		layer: [np.rint(np.asarray(polygon) * _DBU_PER_UM).astype(np.int64) for polygon in polygons]
+		for layer, polygons in component.get_polygons(by_spec=True).items() if len(polygons)
+	}
+	step = max(1, int(round(resolution * _DBU_PER_UM))) if resolution else None
+
+	def scores(xor: dict, area: int) -> dict:
+		if area == 0:
+			return {"horizontal": 1.0, "vertical": 1.0, "error_bound": 0.0}
+		return {"horizontal": 1.0 - xor["horizontal"] / area, "vertical": 1.0 - xor["vertical"] / area, "error_bound": xor["error_bound"] / area}
+
+	all_polygons = [polygon for polygons in polygons_by_layer.values() for polygon in polygons]
+	jobs = {None: all_polygons}
+	if by_layer:
+		jobs.update(polygons_by_layer)
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		futures = {layer: executor.submit(_asymmetry, polygons, step) for layer, polygons in jobs.items() if polygons}
+	results = {layer: future.result() for layer, future in futures.items()}
+	total = scores(results[None], _polygon_area(all_polygons)) if all_polygons else scores({}, 0)
+	if by_layer:
+		total["layers"] = {layer: scores(results[layer], _polygon_area(polygons_by_layer[layer])) for layer in polygons_by_layer}
+	return total
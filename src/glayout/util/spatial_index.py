@@ -0,0 +1,242 @@
+import heapq
+import weakref
+from math import ceil, sqrt
+from typing import Optional, Union
+
+import numpy as np
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+
+# database units per um (gdsfactory 1nm grid), all boxes in the index are integers in these units
+_DBU_PER_UM = 1000
+
+
+def _to_dbu_boxes(polygons: list) -> np.ndarray:
+	"""returns (N,4) int64 array of xmin,ymin,xmax,ymax (database units) for a list of polygons (arrays of points)"""
+	if len(polygons) == 0:
+		return np.zeros((0, 4), dtype=np.int64)
+	boxes = np.array([(*np.min(polygon, axis=0), *np.max(polygon, axis=0)) for polygon in polygons], dtype=np.float64)
+	return np.rint(boxes * _DBU_PER_UM).astype(np.int64)
+
+
+class LayerIndex:
+	"""static R-tree over integer boxes (single layer)
+	leaves are Sort-Tile-Recursive (STR) packed, upper levels group consecutive nodes (in leaf order)
+	node i of a level covers entries [i*fanout, (i+1)*fanout) of the level below
+	args:
+	boxes = (N,4) int array of xmin,ymin,xmax,ymax
+	fanout = max number of children per node
+	"""
+
+	def __init__(self, boxes: np.ndarray, fanout: int = 16):
+		if fanout < 2:
+			raise ValueError("LayerIndex fanout must be at least 2")
+		self.fanout = fanout
+		boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+		self.boxes = boxes
+		self.order = self.__str_order(boxes, fanout)
+		self.levels = [boxes[self.order]]
+		while len(self.levels[-1]) > fanout:
+			below = self.levels[-1]
+			pad = (-len(below)) % fanout
+			grouped = np.concatenate((below, np.repeat(below[-1:], pad, axis=0))).reshape(-1, fanout, 4)
+			self.levels.append(np.concatenate((grouped[:, :, :2].min(axis=1), grouped[:, :, 2:].max(axis=1)), axis=1))
+
+	@staticmethod
+	def __str_order(boxes: np.ndarray, fanout: int) -> np.ndarray:
+		"""returns the STR ordering of boxes: sort into vertical slices by x center, then by y center in each slice"""
+		count = len(boxes)
+		if count == 0:
+			return np.zeros(0, dtype=np.int64)
+		centers2x = boxes[:, :2] + boxes[:, 2:]
+		slice_size = fanout * ceil(sqrt(ceil(count / fanout)))
+		by_x = np.argsort(centers2x[:, 0], kind="stable")
+		slice_num = np.empty(count, dtype=np.int64)
+		slice_num[by_x] = np.arange(count) // slice_size
+		return np.lexsort((centers2x[:, 1], slice_num))
+
+	def __len__(self) -> int:
+		return len(self.order)
+
+	def __children(self, nodes: np.ndarray, num_below: int) -> np.ndarray:
+		"""returns indices (in the level below) of all children of nodes"""
+		starts = nodes * self.fanout
+		counts = np.minimum(self.fanout, num_below - starts)
+		offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+		return np.repeat(starts, counts) + offsets
+
+	def query(self, window: Union[tuple, np.ndarray], touching: bool = True) -> np.ndarray:
+		"""returns ids (positions in the original boxes array) of boxes that overlap window (xmin,ymin,xmax,ymax)
+		touching = also return boxes that only share an edge or corner with window"""
+		if len(self) == 0:
+			return np.zeros(0, dtype=np.int64)
+		xmin, ymin, xmax, ymax = window
+		candidates = np.arange(len(self.levels[-1]))
+		for depth in range(len(self.levels) - 1, -1, -1):
+			boxes = self.levels[depth][candidates]
+			if touching:
+				hits = (boxes[:, 0] <= xmax) & (boxes[:, 2] >= xmin) & (boxes[:, 1] <= ymax) & (boxes[:, 3] >= ymin)
+			else:
+				hits = (boxes[:, 0] < xmax) & (boxes[:, 2] > xmin) & (boxes[:, 1] < ymax) & (boxes[:, 3] > ymin)
+			candidates = candidates[hits]
+			if depth:
+				candidates = self.__children(candidates, len(self.levels[depth - 1]))
+		return self.order[candidates]
+
+	def nearest(self, point: tuple[float,float], k: int = 1) -> list[tuple[int,float]]:
+		"""returns up to k (id, distance) pairs of the boxes closest to point (best first search)
+		distance is 0 for boxes that contain point"""
+		if len(self) == 0:
+			return list()
+		px, py = point
+		def distances(boxes: np.ndarray) -> np.ndarray:
+			dx = np.maximum(np.maximum(boxes[:, 0] - px, px - boxes[:, 2]), 0)
+			dy = np.maximum(np.maximum(boxes[:, 1] - py, py - boxes[:, 3]), 0)
+			return np.hypot(dx, dy)
+		top = len(self.levels) - 1
+		heap = [(dist, top, node) for node, dist in enumerate(distances(self.levels[top]).tolist())]
+		heapq.heapify(heap)
+		found = list()
+		while heap and len(found) < k:
+			dist, depth, node = heapq.heappop(heap)
+			if depth == 0:
+				found.append((int(self.order[node]), dist))
+				continue
+			children = self.__children(np.array([node]), len(self.levels[depth - 1]))
+			for child, child_dist in zip(children.tolist(), distances(self.levels[depth - 1][children]).tolist()):
+				heapq.heappush(heap, (child_dist, depth - 1, child))
+		return found
+
+	@property
+	def bbox(self) -> Optional[np.ndarray]:
+		"""(xmin,ymin,xmax,ymax) of all boxes or None if empty"""
+		if len(self) == 0:
+			return None
+		top = self.levels[-1]
+		return np.concatenate((top[:, :2].min(axis=0), top[:, 2:].max(axis=0)))
+
+
+class SpatialIndex:
+	"""per layer R-tree over the (flattened) polygons of a Component, each layer is indexed on first use
+	coordinates passed to and returned from this class are in um, internally boxes are integer database units
+	use get_spatial_index(comp) to get the index attached to a component
+	"""
+
+	def __init__(self, comp: Component, fanout: int = 16):
+		self.comp = comp
+		self.fanout = fanout
+		self._layers: dict = dict()
+
+	def __layer(self, layer: tuple[int,int]) -> tuple[list, LayerIndex]:
+		layer = tuple(layer)
+		if layer not in self._layers:
+			polygons = self.comp.get_polygons(by_spec=layer)
+			self._layers[layer] = (polygons, LayerIndex(_to_dbu_boxes(polygons), self.fanout))
+		return self._layers[layer]
+
+	def polygons(self, layer: tuple[int,int]) -> list:
+		"""all polygons (arrays of points) on layer, ids returned by query/nearest index into this list"""
+		return self.__layer(layer)[0]
+
+	def boxes(self, layer: tuple[int,int]) -> np.ndarray:
+		"""(N,4) array of polygon bboxes (xmin,ymin,xmax,ymax) in um on layer, row i is the bbox of polygon id i"""
+		return self.__layer(layer)[1].boxes / _DBU_PER_UM
+
+	def query(self, layer: tuple[int,int], window: Union[tuple, np.ndarray], touching: bool = True) -> np.ndarray:
+		"""returns ids of polygons on layer whose bbox overlaps window
+		window = ((xmin,ymin),(xmax,ymax)) or (xmin,ymin,xmax,ymax) in um"""
+		window = np.rint(np.asarray(window, dtype=np.float64).reshape(4) * _DBU_PER_UM).astype(np.int64)
+		return np.sort(self.__layer(layer)[1].query(window, touching=touching))
+
+	def query_polygons(self, layer: tuple[int,int], window: Union[tuple, np.ndarray], touching: bool = True) -> list:
+		"""returns polygons on layer whose bbox overlaps window"""
+		polygons = self.polygons(layer)
+		return [polygons[i] for i in self.query(layer, window, touching=touching)]
+
+	def nearest(self, layer: tuple[int,int], point: tuple[float,float], k: int = 1) -> list[tuple[int,float]]:
+		"""returns up to k (id, distance in um) pairs of the polygons on layer with bbox closest to point"""
+		point = (point[0] * _DBU_PER_UM, point[1] * _DBU_PER_UM)
+		return [(pid, dist / _DBU_PER_UM) for pid, dist in self.__layer(layer)[1].nearest(point, k=k)]
+
+	def connected(self, layer: tuple[int,int], point: tuple[float,float]) -> np.ndarray:
+		"""returns sorted ids of polygons on layer whose bbox touches point or touches the bbox of a connected polygon
+		i.e. the single layer geometry of the net at a port"""
+		layer_index = self.__layer(layer)[1]
+		connected = np.zeros(len(layer_index), dtype=bool)
+		frontier = list(self.query(layer, (*point, *point)))
+		while frontier:
+			pid = frontier.pop()
+			if connected[pid]:
+				continue
+			connected[pid] = True
+			frontier.extend(pid2 for pid2 in layer_index.query(layer_index.boxes[pid]) if not connected[pid2])
+		return np.flatnonzero(connected)
+
+	def layer_bbox(self, layer: tuple[int,int]) -> Optional[np.ndarray]:
+		"""returns ((xmin,ymin),(xmax,ymax)) in um of everything on layer, or None if the layer is empty"""
+		bbox = self.__layer(layer)[1].bbox
+		return None if bbox is None else (bbox / _DBU_PER_UM).reshape(2, 2)
+
+
+# indexes attached to components, (geometry_version, SpatialIndex) entries die with the component
+_attached_indexes = weakref.WeakKeyDictionary()
+
+
+def _geometry_version(comp: Component) -> tuple:
+	"""fingerprint of the geometry in comp: a hash of the points and layers of its own polygons and paths
+	(so adding, removing, replacing or editing them in place is detected) and the placement of its references
+	****NOTE: only the top level is fingerprinted, references are compared by the identity of their child component.
+	****mutating a child component in place is not detected, call invalidate_spatial_index in that case"""
+	return (
+		hash(tuple((polygon.layer, polygon.datatype, polygon.points.tobytes()) for polygon in comp.polygons)),
+		hash(tuple((path.layers, path.datatypes, path.spine().tobytes(), np.asarray(path.widths()).tobytes()) for path in comp.paths)),
+		tuple(
+			(id(ref.parent), tuple(ref.origin), ref.rotation, ref.x_reflection, ref.magnification)
+			for ref in comp.references
+		),
+	)
+
+
+def get_spatial_index(comp: Component) -> SpatialIndex:
+	"""returns the SpatialIndex attached to comp, the index is (re)built lazily if comp geometry changed"""
+	version = _geometry_version(comp)
+	entry = _attached_indexes.get(comp)
+	if entry is None or entry[0] != version:
+		entry = (version, SpatialIndex(comp))
+		_attached_indexes[comp] = entry
+	return entry[1]
+
+
+def invalidate_spatial_index(comp: Component) -> None:
+	"""drops the SpatialIndex attached to comp (it is rebuilt on next use)"""
+	_attached_indexes.pop(comp, None)
+
+
+def layer_bbox(custom_comp: Union[Component, ComponentReference], layer: tuple[int,int]) -> np.ndarray:
+	"""returns the bbox ((xmin,ymin),(xmax,ymax)) of layer in custom_comp using the spatial index
+	faster alternative to custom_comp.extract(layers=[layer]).bbox, like extract returns ((0,0),(0,0)) if there is nothing on layer
+	for a ComponentReference the index of the parent component is used and the bbox is transformed
+	"""
+	if isinstance(custom_comp, Component):
+		bbox = get_spatial_index(custom_comp).layer_bbox(layer)
+		return np.zeros((2, 2)) if bbox is None else bbox
+	bbox = get_spatial_index(custom_comp.parent).layer_bbox(layer)
+	if bbox is None:
+		return np.zeros((2, 2))
+	corners = np.array([bbox[0], (bbox[1][0], bbox[0][1]), bbox[1], (bbox[0][0], bbox[1][1])], dtype=np.float64)
+	if custom_comp.x_reflection:
+		corners[:, 1] = -corners[:, 1]
+	corners = corners * (custom_comp.magnification or 1)
+	if custom_comp.rotation:
+		angle = np.deg2rad(custom_comp.rotation)
+		rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+		corners = corners @ rotation.T
+	corners = corners + np.asarray(custom_comp.origin, dtype=np.float64)
+	# remove float noise from the transform (geometry is on the database unit grid)
+	return np.round(np.array([corners.min(axis=0), corners.max(axis=0)]), 6)
+
+
+def layer_dims(custom_comp: Union[Component, ComponentReference], layer: tuple[int,int]) -> tuple[float,float]:
+	"""returns the (width, height) of layer in custom_comp, same as evaluate_bbox(custom_comp.extract(layers=[layer]))"""
+	bbox = layer_bbox(custom_comp, layer)
+	return tuple(np.round(bbox[1] - bbox[0], 6).tolist())
@@ -0,0 +1,167 @@
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+# timer the stage() spans of this process are recorded in (None: stage() does nothing)
+_active = None
+
+# metrics of a span, summed per stage name by StageTimer.stages
+SPAN_METRICS = ("wall_s", "cpu_s", "child_cpu_s", "child_max_rss_kb", "written_bytes")
+
+
+def _written_bytes() -> Optional[int]:
+	"""bytes written by this process and its finished (waited for) children, None without /proc/self/io"""
+	try:
+		with open("/proc/self/io") as f:
+			for line in f:
+				if line.startswith("wchar:"):
+					return int(line.split()[1])
+	except OSError:
+		pass
+	return None
+
+
+class StageTimer:
+	"""spans (stages) of one unit of work, e.g. a dataset sample
+	a span records wall and cpu time of this process, cpu time of the child processes that finished during
+	the span, their peak rss (getrusage(RUSAGE_CHILDREN) only has the peak of all children so far, so it
+	is recorded when a child of the span raised it, else None) and the bytes written by the process and
+	those children (wchar of /proc/self/io, any file system including tmpfs; not recorded elsewhere)
+	spans may run in several threads at once (they record their thread as tid); their process metrics then
+	include the work of the other threads
+	"""
+
+	def __init__(self):
+		self.spans = list()
+		self.pid = os.getpid()
+		self._tid = threading.get_native_id()
+		# open spans per thread, spans of other threads nest in the open spans of the creating thread
+		self._depths = {self._tid: 0}
+
+	@contextmanager
+	def span(self, name: str):
+		"""record the enclosed code as span name (spans nest, parents come before their children)"""
+		tid = threading.get_native_id()
+		outermost = tid not in self._depths
+		depth = self._depths[self._tid] if outermost else self._depths[tid]
+		record = {"name": name, "depth": depth, "start": time.time(), "tid": tid}
+		self.spans.append(record)
+		written = _written_bytes()
+		children = resource.getrusage(resource.RUSAGE_CHILDREN)
+		wall, cpu = time.perf_counter(), time.process_time()
+		self._depths[tid] = depth + 1
+		try:
+			yield record
+		finally:
+			if outermost:
+				del self._depths[tid]
+			else:
+				self._depths[tid] = depth
+			after = resource.getrusage(resource.RUSAGE_CHILDREN)
+			record["wall_s"] = time.perf_counter() - wall
+			record["cpu_s"] = time.process_time() - cpu
+			record["child_cpu_s"] = (after.ru_utime + after.ru_stime) - (children.ru_utime + children.ru_stime)
+			record["child_max_rss_kb"] = after.ru_maxrss if after.ru_maxrss > children.ru_maxrss else None
+			if written is not None:
+				record["written_bytes"] = _written_bytes() - written
+
+	def stages(self) -> dict:
+		"""{name: {metric: value}} of the finished spans, summed over spans with the same name (peak rss: max)"""
+		totals = dict()
+		for record in self.spans:
+			if "wall_s" not in record:
+				continue
+			total = totals.setdefault(record["name"], dict())
+			for metric in SPAN_METRICS:
+				value = record.get(metric)
+				if value is None:
+					continue
+				if metric == "child_max_rss_kb":
+					total[metric] = max(total.get(metric, 0), value)
+				else:
+					total[metric] = total.get(metric, 0) + value
+		return totals
+
+
+@contextmanager
+def activate(timer: StageTimer):
+	"""record the stage() spans of this process in timer while the context is open"""
+	global _active
+	previous, _active = _active, timer
+	try:
+		yield timer
+	finally:
+		_active = previous
+
+
+@contextmanager
+def stage(name: str):
+	"""span name of the active timer, does nothing when no timer is active"""
+	if _active is None:
+		yield None
+		return
+	with _active.span(name) as record:
+		yield record
+
+
+def stage_percentiles(records: Iterable[dict], percentiles: tuple = (50, 90, 99)) -> dict:
+	"""percentiles of the stage metrics over result records (dicts with a stages field as StageTimer.stages)
+	returns {stage: {metric: {"p50": .., "p90": .., "p99": .., "max": .., "total": .., "count": ..}}}
+	"""
+	values = dict()
+	for record in records:
+		for name, metrics in (record.get("stages") or {}).items():
+			for metric, value in metrics.items():
+				values.setdefault(name, dict()).setdefault(metric, list()).append(value)
+	summary = dict()
+	for name, metrics in values.items():
+		summary[name] = dict()
+		for metric, samples in metrics.items():
+			samples = np.asarray(samples, dtype=float)
+			summary[name][metric] = {
+				**{f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(samples, percentiles))},
+				"max": float(samples.max()),
+				"total": float(samples.sum()),
+				"count": len(samples),
+			}
+	return summary
+
+
+def write_chrome_trace(records: Iterable[dict], path: Union[str, Path]) -> Path:
+	"""write the spans of result records (spans and worker_pid fields) as a Chrome trace (chrome://tracing, Perfetto)
+	one complete event per span, on the row of the worker process (and thread) that ran it; the file is streamed
+	"""
+	path = Path(path)
+	tmp = path.with_name(path.name + ".tmp")
+	workers = set()
+	with open(tmp, "w") as f:
+		f.write('{"displayTimeUnit": "ms", "traceEvents": [')
+		first = True
+		for record in records:
+			pid = record.get("worker_pid", 0)
+			events = list()
+			if pid not in workers:
+				workers.add(pid)
+				events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": pid, "args": {"name": f"worker {pid}"}})
+			for span in record.get("spans") or ():
+				if "wall_s" not in span:
+					continue
+				args = {metric: span[metric] for metric in SPAN_METRICS if span.get(metric) is not None}
+				args["sample_id"] = record.get("sample_id")
+				events.append({
+					"name": span["name"], "ph": "X", "pid": pid, "tid": span.get("tid", pid),
+					"ts": span["start"] * 1e6, "dur": span["wall_s"] * 1e6, "args": args,
+				})
+			for event in events:
+				f.write(("\n" if first else ",\n") + json.dumps(event))
+				first = False
+		f.write("\n]}\n")
+	os.replace(tmp, path)
+	return path
@@ -0,0 +1,44 @@
+import re
+
+import pytest
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.placement.common_centroid import common_centroid_pattern, pattern_to_string
+from glayout.placement.two_transistor_interdigitized import interdigitized_row_pattern, two_nfet_interdigitized
+from glayout.placement.two_transistor_place import two_transistor_place
+from glayout.primitives.fet import nmos
+
+
+def placed_row(component) -> str:
+    """device letters of an interdigitized row from left to right"""
+    devices = {match.group(1) for name in component.ports for match in [re.match(r"^([AB]_\d+)_plusdoped_W$", name)] if match}
+    return "".join(device[0].lower() for device in sorted(devices, key=lambda device: component.ports[device + "_plusdoped_W"].center[0]))
+
+
+def test_interdigitized_row_pattern():
+    assert interdigitized_row_pattern(3) == "ababab"
+    assert interdigitized_row_pattern(2, "ABBA") == "abba"
+    assert interdigitized_row_pattern(3, "auto") == pattern_to_string(common_centroid_pattern([3, 3], rows=1))
+    with pytest.raises(ValueError):
+        interdigitized_row_pattern(2, "aaab")
+
+
+@pytest.mark.parametrize("numcols, pattern", [(2, None), (2, "abba"), (3, "auto")])
+def test_interdigitized_placement_follows_pattern(numcols, pattern):
+    component = two_nfet_interdigitized(sky130_mapped_pdk, numcols, pattern=pattern, width=2, fingers=2)
+    assert placed_row(component) == interdigitized_row_pattern(numcols, pattern)
+
+
+def labeled_nmos(label: str, **kwargs):
+    device = nmos(**kwargs)
+    device.info["label"] = label
+    return device
+
+
+def test_two_transistor_place_more_than_two_devices():
+    pattern = pattern_to_string(common_centroid_pattern([2, 2, 2], rows=2))
+    devices = [(labeled_nmos, {"label": label, "pdk": sky130_mapped_pdk, "width": width}) for label, width in zip("abc", (1, 2, 3))]
+    component = two_transistor_place(sky130_mapped_pdk, pattern, devices[0], devices[1], other_devices=devices[2:])
+    # references are placed row by row (row 0 at the bottom)
+    assert [ref.parent.info["label"] for ref in component.references] == list(pattern.replace(" ", ""))
+    assert len({ref.origin[1] for ref in component.references}) == len(pattern.split())
@@ -0,0 +1,41 @@
+import pytest
+
+from glayout.spice import Netlist
+
+def leaf() -> Netlist:
+	return Netlist(circuit_name='res', nodes=['A', 'B'], source_netlist='.subckt {circuit_name} {nodes} r={r}\nR1 A B {r}\n.ends {circuit_name}', parameters={'r': 1})
+
+def test_shared_definition_follows_in_place_edits():
+	netlist = leaf()
+	first = Netlist(circuit_name='top1', nodes=['X', 'Y'])
+	first.connect_netlist(netlist, [('A', 'X'), ('B', 'Y')])
+
+	netlist.nodes.append('C')
+	netlist.parameters['r'] = 2
+	second = Netlist(circuit_name='top2', nodes=['X', 'Y', 'Z'])
+	second.connect_netlist(netlist, [('A', 'X'), ('B', 'Y'), ('C', 'Z')])
+
+	assert first.sub_netlists[0].nodes == ['A', 'B']
+	assert second.sub_netlists[0].nodes == ['A', 'B', 'C']
+	assert second.sub_netlists[0].parameters == {'r': 2}
+	assert 'r=2' in second.generate_netlist()
+	assert 'r=1' in first.generate_netlist()
+
+def test_in_place_edit_of_a_sub_netlist_invalidates_the_parent():
+	child = leaf()
+	top = Netlist(circuit_name='top', nodes=['X', 'Y'])
+	top.add_netlists([child])
+	top.connect_node(child, [('A', 'X'), ('B', 'Y')])
+	before = top.structural_hash()
+
+	child.parameters['r'] = 5
+	assert top.structural_hash() != before
+	assert 'r=5' in top.generate_netlist()
+
+def test_shared_definition_is_read_only():
+	definition = leaf().shared()
+	with pytest.raises(ValueError):
+		definition.nodes.append('C')
+	with pytest.raises(ValueError):
+		definition.parameters['r'] = 3
+	assert Netlist.from_dict(definition.to_dict()).generate_netlist() == definition.generate_netlist()
@@ -0,0 +1,38 @@
+from gdsfactory.component import Component
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos
+from glayout.routing.route_cache import cached_route
+from glayout.routing.route_nets import route_nets
+from glayout.routing.straight_route import straight_route
+
+
+def two_nmos() -> tuple:
+	top = Component()
+	left = top << nmos(sky130_mapped_pdk, width=2, fingers=2)
+	right = top << nmos(sky130_mapped_pdk, width=2, fingers=2)
+	right.movex(10)
+	return top, left, right
+
+
+def test_straight_route_reports_drawn_length_and_vias():
+	_, left, right = two_nmos()
+	edge1, edge2 = left.ports["multiplier_0_source_E"], right.ports["multiplier_0_source_W"]
+	route = straight_route(sky130_mapped_pdk, edge1, edge2, glayer1="met3")
+	assert route.info["wirelength"] == abs(edge2.center[0] - edge1.center[0])
+	# met2 port -> met3 route -> met2 port
+	assert route.info["via_count"] == 2
+	assert cached_route(straight_route, sky130_mapped_pdk, edge1, edge2, glayer1="met3").info == route.info
+
+
+def test_route_nets_reports_committed_routes():
+	top, left, right = two_nmos()
+	nets = [
+		(left.ports["multiplier_0_drain_N"], right.ports["multiplier_0_drain_N"]),
+		(left.ports["multiplier_0_gate_S"], right.ports["multiplier_0_gate_S"]),
+	]
+	info = route_nets(sky130_mapped_pdk, top, nets).parent.info
+	committed = [ref.parent.info for ref in top.references[-1].parent.references]
+	assert info["wirelength"] == round(sum(route["wirelength"] for route in committed), 6)
+	assert info["via_count"] == sum(route["via_count"] for route in committed)
+	assert "planned_wirelength" in info and "planned_via_count" in info
@@ -0,0 +1,21 @@
+from glayout.spice.spice_parser import parse_spice
+
+def test_subckt_params_keyword_is_not_a_pin():
+	parsed = parse_spice([
+		'.subckt res_div a b PARAMS: w=2 l=0.5u',
+		'R1 a b 1k',
+		'.ends',
+		'.subckt top in out',
+		'X1 in out res_div PARAMS: w=3',
+		'.ends',
+	])
+	res_div = parsed.subcircuits['res_div']
+	assert res_div.nodes == ['a', 'b']
+	assert res_div.parameters == {'w': 2.0, 'l': 0.5e-6}
+	assert parsed.subcircuits['top'].sub_netlists == [res_div]
+
+def test_subckt_parameters_without_params_keyword():
+	parsed = parse_spice(['.subckt cap p n c=1f', 'C1 p n {c}', '.ends', 'x1 1 0 cap c=2f'], top_name='tb')
+	assert parsed.subcircuits['cap'].nodes == ['p', 'n']
+	assert parsed.subcircuits['cap'].parameters == {'c': 1e-15}
+	assert parsed.netlist.sub_netlists == [parsed.subcircuits['cap']]